@@ -1,6 +1,7 @@
 import json
 import math
 import os
+import sys
 import threading
 import time
 import tkinter as tk
@@ -8,11 +9,32 @@ from datetime import datetime
 from datetime import time as dt_time
 from tkinter import Canvas
 
-import cv2
-import numpy as np
-import pyttsx3
 from customtkinter import *
 
+# Exercise definitions (see trackers/exercise_definitions.py). The GUI only needs their names and
+# display fields, read straight from the JSON files so the window opens without the NumPy stack
+EXERCISES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trackers", "exercises")
+AUTO_EXERCISE = "auto"  # Same value as trackers.exercise_definitions.AUTO_EXERCISE
+
+
+def load_exercise_cards(directory=EXERCISES_DIR):
+    """Display fields (id, category, color, description) of every exercise definition, in display order."""
+    cards = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        cards.append({
+            "id": data["id"].lower(),
+            "order": int(data.get("order", 0)),
+            "category": data.get("category", ""),
+            "color": data.get("color", "primary"),
+            "description": data.get("description", ""),
+        })
+    cards.sort(key=lambda card: (card["order"], card["id"]))
+    return cards
+
 # Global lock for TTS to prevent run loop errors
 tts_lock = threading.Lock()
 
@@ -270,6 +292,7 @@ class VirtualTrainerApp(CTk):
         """Thread-safe text-to-speech"""
         with tts_lock:
             try:
+                import pyttsx3  # Imported on first use: loading the speech driver is slow
                 engine = pyttsx3.init()
                 engine.setProperty('rate', 150)
                 engine.say(text)
@@ -405,7 +428,9 @@ class VirtualTrainerApp(CTk):
         workout_page = self.frames.get("WorkoutPage")
         if workout_page and hasattr(workout_page, 'cap'):
             workout_page.stop_camera()
-        cv2.destroyAllWindows()
+        # OpenCV is only loaded once the camera has been started
+        if "cv2" in sys.modules:
+            sys.modules["cv2"].destroyAllWindows()
         self.destroy()
 
 # ---- home page -----
@@ -517,10 +542,17 @@ class WorkoutPage(CTkFrame):
         CTkLabel(exercise_frame, text="Exercise:", font=("Arial", 16),
                     text_color=THEME_TEXT).pack(side="left", padx=(0, 10))
 
-        self.exercise_var = StringVar(value="pushup")
-        CTkOptionMenu(exercise_frame, values=["pushup", "squat", "bicep_curl", "general"],
+        # "auto" (recognized from the movement), then one entry per definition in trackers/exercises/
+        exercise_ids = [AUTO_EXERCISE] + [card["id"] for card in load_exercise_cards()]
+        self.exercise_var = StringVar(value=AUTO_EXERCISE)
+        CTkOptionMenu(exercise_frame, values=exercise_ids,
                         variable=self.exercise_var, width=150,height=25).pack(side="left")
 
+        # Current inference mode (model complexity / frame skipping), set by the update loop
+        self.mode_label = CTkLabel(exercise_frame, text="", font=("Arial", 12),
+                                    text_color="#94a3b8")
+        self.mode_label.pack(side="left", padx=(20, 0))
+
         # -------- Timer Label --------
         self.timer_label = CTkLabel(overlay, text="Time: 00:00", font=("Arial", 16),
                                     text_color=THEME_PRIMARY)
@@ -580,6 +612,10 @@ class WorkoutPage(CTkFrame):
     def stop_camera(self):
         self.start_time = None
 
+    def update_mode_label(self, mode_text):
+        if self.mode_label.cget("text") != mode_text:
+            self.mode_label.configure(text=mode_text)
+
     def update_gui_labels(self, reps, posture_score, feedback, text_color):
         self.reps_label.configure(text=f"Reps: {reps}/{self.target_reps}")
         self.progress_bar.set(min(reps/self.target_reps, 1.0))
@@ -628,7 +664,8 @@ class WorkoutPage(CTkFrame):
                 return
 
             try:
-                # Initialize TTS engine
+                # Initialize TTS engine (imported on first use: loading the speech driver is slow)
+                import pyttsx3
                 engine = pyttsx3.init()
             
                 # Optional: Configure voice properties (speed, volume)
@@ -903,11 +940,11 @@ class ExercisesPage(CTkFrame):
         CTkLabel(self, text="💪 Exercise Library", font=("Arial", 48, "bold"),
                     text_color=THEME_PRIMARY).pack(pady=80)
 
+        # Built from trackers/exercises/; "primary"/"secondary" refer to the theme colors
+        theme_colors = {"primary": THEME_PRIMARY, "secondary": THEME_SECONDARY}
         exercises = [
-            ("squat", "🦵 Lower Body", THEME_PRIMARY, "Targets quads, hamstrings"),
-            ("pushup", "💪 Chest", THEME_SECONDARY, "Targets chest, shoulders, triceps"),
-            ("bicep_curl", "💪 Arms", "#00d4ff", "Targets biceps"),
-            ("general", "✨ General", "#c084fc", "Freestyle workout tracking")
+            (card["id"], card["category"], theme_colors.get(card["color"], card["color"]), card["description"])
+            for card in load_exercise_cards()
         ]
 
         grid_frame = CTkFrame(self, fg_color="transparent")
@@ -0,0 +1,173 @@
+"""
+Pose Backend Benchmark
+Runs several pose backends over the same recorded clips and compares their
+latency, throughput and the agreement of the downstream joint angles and rep
+counts with a reference backend (the first one given).
+
+Backends are written as name[:key=value,...], for example:
+    python backend_benchmark.py clips/ --exercise squat \\
+        --backend mediapipe --backend mediapipe:model_complexity=0 \\
+        --backend onnx:model_path=models/pose_landmark_lite.onnx
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from batch_analysis import collect_video_files
+from core_AI.angle_utils import AngleCalculator
+from core_AI.pose_backends import create_backend
+from trackers.workout_detector import WorkoutDetector
+
+ANGLE_NAMES = ("KNEE_ANGLE", "ELBOW_ANGLE", "HIP_ANGLE", "SHOULDER_ANGLE")
+
+
+def parse_backend_spec(spec: str) -> tuple[str, dict]:
+    """
+    Parses "name[:key=value,...]" into a backend name and constructor options.
+    Values are read as JSON when possible (numbers, booleans), otherwise as strings.
+    """
+    name, _, option_text = spec.partition(":")
+    options = {}
+    for item in filter(None, option_text.split(",")):
+        key, _, value = item.partition("=")
+        try:
+            options[key] = json.loads(value)
+        except ValueError:
+            options[key] = value
+    return name, options
+
+
+def run_backend(spec: str, video_path: str, workout_type: str) -> dict:
+    """
+    Runs one backend over every frame of a clip.
+
+    Returns:
+        dict: Latencies (ms), a (T, 4) angle matrix (NaN where no pose was found) and the rep count.
+    """
+    name, options = parse_backend_spec(spec)
+    backend = create_backend(name, **options)
+    angle_calc = AngleCalculator()
+    detector = WorkoutDetector(workout_type)
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video file: {video_path}")
+
+    latencies = []
+    angle_rows = []
+    try:
+        while True:
+            success, frame = cap.read()
+            if not success:
+                break
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+            # Only the model call is timed; decoding is the same for every backend
+            start = time.perf_counter()
+            landmarks = backend.process(rgb)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+
+            if landmarks is None:
+                angle_rows.append([np.nan] * len(ANGLE_NAMES))
+                continue
+            angles, confidence = angle_calc.essential_angles(landmarks)
+            detector.detectReps(angles, confidence)
+            angle_rows.append([angles[name] for name in ANGLE_NAMES])
+    finally:
+        cap.release()
+        backend.close()
+
+    return {
+        "latencies": np.array(latencies),
+        "angles": np.array(angle_rows, dtype=np.float64).reshape(-1, len(ANGLE_NAMES)),
+        "reps": detector.rep_count,
+    }
+
+
+def compare(run: dict, reference: dict) -> dict:
+    """Agreement of a run with the reference run on the same clip."""
+    both = ~np.isnan(run["angles"]).any(axis=1) & ~np.isnan(reference["angles"]).any(axis=1)
+    detected = ~np.isnan(run["angles"]).any(axis=1)
+    reference_detected = ~np.isnan(reference["angles"]).any(axis=1)
+    errors = np.abs(run["angles"][both] - reference["angles"][both])
+    return {
+        "detectionAgreement": round(float(np.mean(detected == reference_detected)), 3) if len(detected) else None,
+        "angleMAE": {name: round(float(errors[:, i].mean()), 2) if len(errors) else None
+                     for i, name in enumerate(ANGLE_NAMES)},
+        "repDiff": run["reps"] - reference["reps"],
+    }
+
+
+def summarize(run: dict) -> dict:
+    latencies = run["latencies"]
+    if not len(latencies):
+        return {"frames": 0}
+    total_s = latencies.sum() / 1000.0
+    return {
+        "frames": int(len(latencies)),
+        "latencyMean": round(float(latencies.mean()), 2),
+        "latencyP50": round(float(np.percentile(latencies, 50)), 2),
+        "latencyP95": round(float(np.percentile(latencies, 95)), 2),
+        "fps": round(len(latencies) / total_s, 1) if total_s > 0 else None,
+        "reps": run["reps"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pose backends on recorded clips.")
+    parser.add_argument("paths", nargs="+", help="Video files or directories of videos")
+    parser.add_argument("--backend", action="append", dest="backends",
+                        help="Backend spec name[:key=value,...]; repeat for each backend (first = reference)")
+    parser.add_argument("--exercise", default="general", help="Exercise type used for rep counting")
+    args = parser.parse_args()
+
+    backends = args.backends or ["mediapipe"]
+    video_paths = collect_video_files(args.paths)
+    if not video_paths:
+        print("No video files found.")
+        return
+
+    totals = {spec: {"latencies": [], "repErrors": 0, "angleErrors": []} for spec in backends}
+    for video_path in video_paths:
+        # Only the first backend is the reference; if it fails on a clip, the others are not compared
+        reference = None
+        for position, spec in enumerate(backends):
+            try:
+                run = run_backend(spec, video_path, args.exercise)
+            except Exception as e:
+                print(json.dumps({"file": video_path, "backend": spec, "error": str(e)}), flush=True)
+                continue
+
+            result = {"file": video_path, "backend": spec, **summarize(run)}
+            if position == 0:
+                reference = run
+            elif reference is None:
+                result["reference"] = None  # The reference backend failed on this clip
+            else:
+                agreement = compare(run, reference)
+                result.update(agreement)
+                totals[spec]["repErrors"] += abs(agreement["repDiff"])
+                totals[spec]["angleErrors"].extend(v for v in agreement["angleMAE"].values() if v is not None)
+            totals[spec]["latencies"].append(run["latencies"])
+            print(json.dumps(result), flush=True)
+
+    # Overall comparison table
+    print(f"\n{'backend':<45} {'mean ms':>8} {'p95 ms':>8} {'fps':>7} {'angle MAE':>10} {'rep err':>8}")
+    for spec in backends:
+        if not totals[spec]["latencies"]:
+            continue
+        latencies = np.concatenate(totals[spec]["latencies"])
+        angle_errors = totals[spec]["angleErrors"]
+        if spec == backends[0]:
+            mae = "ref"
+        else:
+            mae = f"{np.mean(angle_errors):.2f}" if angle_errors else "n/a"
+        print(f"{spec:<45} {latencies.mean():>8.2f} {np.percentile(latencies, 95):>8.2f} "
+              f"{1000.0 / latencies.mean():>7.1f} {mae:>10} {totals[spec]['repErrors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Batch Analysis Module
+Runs pose estimation, angle calculation and rep/posture detection over recorded
+video files without opening the GUI. Files are processed as fast as the CPU
+allows (no real-time pacing) and spread across a process pool.
+
+Landmark recordings (.vflm) skip pose estimation: their reps are counted in
+a single vectorized pass (see trackers/rep_counter.py), which makes re-scoring
+an archive after a threshold change cheap. Recordings of well-performed sets
+can also be turned into the reference reps that rep shapes are scored against
+(see trackers/rep_templates.py).
+
+Usage:
+    python batch_analysis.py recordings/ --exercise squat --workers 4
+    python batch_analysis.py good_squats/ --exercise squat --save-templates trackers/rep_templates.npz
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+RECORDING_EXTENSIONS = (".vflm",)
+
+
+def collect_video_files(paths: list) -> list:
+    """
+    Expands a list of files and directories into a sorted list of video files
+    (and landmark recordings).
+
+    Args:
+        paths (list): Video files and/or directories containing video files.
+
+    Returns:
+        list: Paths of every video or recording file found.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in names:
+                    if name.lower().endswith(VIDEO_EXTENSIONS + RECORDING_EXTENSIONS):
+                        files.append(os.path.join(root, name))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"Skipping missing path: {path}")
+    return sorted(files)
+
+
+def analyze_video(video_path: str, workout_type: str = "general", flip: bool = False, side: str = "best") -> dict:
+    """
+    Analyzes every frame of a single recorded video.
+
+    Args:
+        video_path (str): Path of the video file.
+        workout_type (str): Exercise performed in the video (e.g., "pushup", "squat").
+        flip (bool): Mirror frames like the live webcam view does.
+        side (str): Body side selection for the angles (see angle_utils.SIDE_MODES).
+
+    Returns:
+        dict: Rep count, posture scores and throughput for the file.
+    """
+    # Imported here so each worker process loads its own OpenCV/MediaPipe instance
+    import cv2
+
+    from core_AI.ai_processor import CameraProcessor
+    from core_AI.angle_utils import AngleCalculator
+    from trackers.workout_detector import WorkoutDetector
+
+    camera = CameraProcessor(video_path=video_path, flip=flip, rgb_output=True)
+    angle_calc = AngleCalculator(side=side)
+    detector = WorkoutDetector(workout_type)
+
+    frames = 0
+    frames_with_pose = 0
+    posture_total = 0
+    posture_min = None
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        while True:
+            frame, landmarks = camera.get_processed_frame()
+            if frame is None:
+                break
+            frames += 1
+            if not landmarks:
+                continue
+
+            frames_with_pose += 1
+            angles, confidence = angle_calc.essential_angles(camera.landmark_array, camera.world_landmark_array)
+            timestamp = camera.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            detector.detectReps(angles, confidence, timestamp)
+            score, _ = detector.detectPosture(angles, confidence)
+            posture_total += score
+            posture_min = score if posture_min is None else min(posture_min, score)
+    finally:
+        camera.release_camera()
+
+    elapsed = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+
+    return {
+        "file": video_path,
+        "workoutType": detector.workout_type,
+        "reps": detector.rep_count,
+        "frames": frames,
+        "framesWithPose": frames_with_pose,
+        "postureMean": round(posture_total / frames_with_pose, 1) if frames_with_pose else None,
+        "postureMin": posture_min,
+        "elapsed": round(elapsed, 3),
+        "cpuTime": round(cpu_time, 3),
+        "fps": round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def analyze_recording(recording_path: str, workout_type: str = "general", side: str = "best") -> dict:
+    """
+    Counts the reps of a landmark recording with the batch rep counter.
+
+    Args:
+        recording_path (str): Path of the .vflm file.
+        workout_type (str): Exercise performed in the recording.
+        side (str): Body side selection for the angles (see angle_utils.SIDE_MODES).
+
+    Returns:
+        dict: Rep count, rep boundaries (seconds) and throughput for the file.
+    """
+    import numpy as np
+
+    from core_AI.angle_utils import AngleCalculator
+    from core_AI.landmark_recorder import LandmarkRecording
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    recording = LandmarkRecording(recording_path)
+    result = recording.count_reps(AngleCalculator(side=side), workout_type)
+    timestamps = recording.timestamps
+    elapsed = time.perf_counter() - wall_start
+
+    return {
+        "file": recording_path,
+        "workoutType": workout_type,
+        "reps": result.count,
+        "repEnds": [round(float(timestamps[frame] - timestamps[0]), 2) for frame in result.ends],
+        "frames": len(recording),
+        "framesWithPose": int((~np.isnan(recording.landmarks[:, 0, 0])).sum()),
+        "elapsed": round(elapsed, 3),
+        "cpuTime": round(time.process_time() - cpu_start, 3),
+        "fps": round(len(recording) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def analyze_file(path: str, workout_type: str = "general", flip: bool = False, side: str = "best") -> dict:
+    """Dispatches a file to analyze_recording() or analyze_video() by its extension."""
+    if path.lower().endswith(RECORDING_EXTENSIONS):
+        return analyze_recording(path, workout_type, side)
+    return analyze_video(path, workout_type, flip, side)
+
+
+def build_template_library(recording_paths: list, workout_type: str, output: str, side: str = "best") -> dict:
+    """
+    Adds every complete rep of the given landmark recordings to a reference rep library
+    (the existing library at `output` is extended, not replaced).
+
+    Args:
+        recording_paths (list): Landmark recordings (.vflm) of well-performed sets.
+        workout_type (str): Exercise performed in the recordings.
+        output (str): Library file (.npz) to extend and write.
+        side (str): Body side selection for the angles (see angle_utils.SIDE_MODES).
+
+    Returns:
+        dict: Reps added per file and the library size.
+    """
+    from core_AI.angle_utils import AngleCalculator
+    from core_AI.landmark_recorder import LandmarkRecording
+    from trackers.rep_templates import RepTemplateLibrary
+
+    library = RepTemplateLibrary.load(output)
+    angle_calc = AngleCalculator(side=side)
+    added = {}
+    for path in recording_paths:
+        angles, confidence = angle_calc.essential_batch(LandmarkRecording(path).landmarks)
+        added[path] = library.add_series(workout_type, angles, angle_calc.essential_keys, confidence)
+    library.save(output)
+    return {"added": added, "templates": library.count(workout_type), "output": output}
+
+
+def analyze_videos(video_paths: list, workout_type: str = "general", workers: int = None,
+                   flip: bool = False, on_result=None, side: str = "best") -> tuple[list, dict]:
+    """
+    Analyzes many videos in parallel, one file per worker process at a time.
+
+    Args:
+        video_paths (list): Video files to analyze.
+        workout_type (str): Exercise performed in the videos.
+        workers (int, optional): Number of worker processes (defaults to the CPU count).
+        flip (bool): Mirror frames like the live webcam view does.
+        on_result (callable, optional): Called with each file's result as soon as it finishes.
+        side (str): Body side selection for the angles (see angle_utils.SIDE_MODES).
+
+    Returns:
+        tuple[list, dict]: Per-file results and an aggregate throughput summary.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(video_paths) or 1))
+    results = []
+
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(analyze_file, path, workout_type, flip, side): path for path in video_paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"file": futures[future], "error": str(e)}
+            results.append(result)
+            if on_result:
+                on_result(result)
+    elapsed = time.perf_counter() - wall_start
+
+    total_frames = sum(r.get("frames", 0) for r in results)
+    summary = {
+        "files": len(video_paths),
+        "failed": sum(1 for r in results if "error" in r),
+        "workers": workers,
+        "frames": total_frames,
+        "elapsed": round(elapsed, 3),
+        "fps": round(total_frames / elapsed, 1) if elapsed > 0 else 0.0,
+        "fpsPerCore": round(total_frames / elapsed / workers, 1) if elapsed > 0 else 0.0,
+    }
+    return results, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze recorded workout videos without the GUI.")
+    parser.add_argument("paths", nargs="+", help="Video or landmark recording (.vflm) files, or directories of them")
+    parser.add_argument("--exercise", default="general", help="Exercise ID from trackers/exercises/ (pushup, squat, bicep_curl, general, ...)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--flip", action="store_true", help="Mirror frames like the live webcam view")
+    parser.add_argument("--side", default="best", choices=("left", "right", "best", "fuse"),
+                        help="Body side the angles are measured on (default: the more visible one)")
+    parser.add_argument("--save-templates", metavar="PATH",
+                        help="Add the reps of the landmark recordings to this reference rep library instead of analyzing")
+    args = parser.parse_args()
+
+    video_paths = collect_video_files(args.paths)
+    if not video_paths:
+        print("No video files found.")
+        return
+
+    if args.save_templates:
+        recordings = [path for path in video_paths if path.lower().endswith(RECORDING_EXTENSIONS)]
+        print(json.dumps(build_template_library(recordings, args.exercise, args.save_templates, args.side)))
+        return
+
+    # One JSON object per line: a line per file, then the summary
+    _, summary = analyze_videos(video_paths, args.exercise, args.workers, args.flip,
+                                on_result=lambda r: print(json.dumps(r), flush=True), side=args.side)
+    print(json.dumps({"summary": summary}))
+
+
+if __name__ == "__main__":
+    main()
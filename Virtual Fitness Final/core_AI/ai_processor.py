@@ -1,45 +1,295 @@
+import time
+
 import cv2
 import mediapipe as mp
+import numpy as np
+
+from core_AI.capture_profile import negotiate_capture
+from core_AI.frame_buffers import FrameBufferPool
+from core_AI.instrumentation import FrameProfiler
+from core_AI.latency_governor import LatencyGovernor
+from core_AI.landmark_predictor import LandmarkPredictor
+from core_AI.landmark_utils import array_to_landmarks
+from core_AI.pose_backends import MediaPipeBackend, PoseBackend, create_backend
+from core_AI.roi_tracker import RoiTracker
 
 
 class CameraProcessor:
     """
-    Handles initialization of the webcam and the MediaPipe Pose model.
+    Handles initialization of the webcam and the pose model (MediaPipe Pose by default).
     It provides a clean interface to fetch processed frames and pose landmarks.
     This class is the entry point for the AI Core module.
     """
 
-    def __init__(self, camera_index=0):
+    def __init__(self, camera_index=0, video_path=None, flip=True, rgb_output=False, buffer_slots=8,
+                 roi_tracking=False, inference_size=None, model_complexity=1, latency_budget_ms=None,
+                 inference_interval=1, predict_landmarks=True, backend="mediapipe", backend_options=None,
+                 recorder=None, profiler=None, capture_profile=None):
         """
         Initializes the video capture device and the MediaPipe Pose Solution.
 
         Args:
             camera_index (int, optional): The index of the webcam (0 is usually the default).
+            video_path (str, optional): A recorded video file to read instead of the webcam.
+            flip (bool, optional): Mirror frames horizontally (natural for a webcam facing the user).
+            rgb_output (bool, optional): Return frames in RGB instead of BGR. The frame is then converted
+                only once and the same array feeds both MediaPipe and the display (PIL expects RGB).
+            buffer_slots (int, optional): Initial number of reusable frame buffers; the pool grows
+                when every one of them holds a frame still leased by a pipeline stage (see FrameBufferPool).
+            roi_tracking (bool, optional): Run the pose model on a padded crop around the previous
+                frame's landmarks instead of the full frame (falls back to the full frame when lost).
+            inference_size (int, optional): Longest side of the pose model input in pixels; larger
+                frames/crops are downsized to it. Defaults to 320 when roi_tracking is enabled.
+            model_complexity (int, optional): Initial MediaPipe model complexity (0, 1 or 2).
+            latency_budget_ms (float, optional): If set, a LatencyGovernor adapts the model complexity
+                and skips inference on some frames to stay within this per-frame budget.
+            inference_interval (int, optional): Run the pose model on every Nth frame only (ignored when
+                the governor is enabled, which picks the interval itself).
+            predict_landmarks (bool, optional): On frames without inference, extrapolate the landmarks
+                with a LandmarkPredictor instead of repeating the last ones.
+            backend (str or PoseBackend, optional): Pose model to use ("mediapipe", "onnx", or an instance).
+            backend_options (dict, optional): Keyword arguments for the backend (e.g. {"model_path": ...}).
+            recorder (LandmarkRecorder, optional): Receives the landmarks of every inference frame.
+            profiler (FrameProfiler, optional): Receives the "capture" and "pose" stage latencies.
+            capture_profile (CaptureProfile, optional): Webcam mode to negotiate (FOURCC, resolution,
+                FPS, driver buffer size); the result is kept in capture_report. Ignored for video files.
         """
-        # Initialize the webcam capture object
-        self.cap = cv2.VideoCapture(camera_index)
-        if not self.cap.isOpened():
-            # Raise an error if the camera cannot be accessed
-            raise IOError("Cannot open webcam or camera index is wrong.")
+        self.video_path = video_path
+        self.flip = flip
+        self.rgb_output = rgb_output
+        self.recorder = recorder
+        self.profiler = profiler or FrameProfiler(enabled=False)
+
+        # Reused output arrays for capture, flip and color conversion
+        self.buffers = FrameBufferPool(buffer_slots)
+        self._frame_shape = None
+        self._inference_buffer = None  # RGB copy for MediaPipe when frames are kept in BGR
+
+        # Optional cropping/downscaling of the pose model input
+        self.roi_tracker = None
+        if roi_tracking or inference_size:
+            self.roi_tracker = RoiTracker(working_size=inference_size or 320, track=roi_tracking)
+
+        if video_path is not None:
+            # Initialize a file-backed capture object (offline / batch analysis)
+            self.cap = cv2.VideoCapture(video_path)
+            if not self.cap.isOpened():
+                raise IOError(f"Cannot open video file: {video_path}")
+        else:
+            # Initialize the webcam capture object
+            self.cap = cv2.VideoCapture(camera_index)
+            if not self.cap.isOpened():
+                # Raise an error if the camera cannot be accessed
+                raise IOError("Cannot open webcam or camera index is wrong.")
+
+        # Effective webcam settings and measured read timing (see core_AI/capture_profile.py)
+        self.capture_report = None
+        if capture_profile is not None and video_path is None:
+            self.capture_report = negotiate_capture(self.cap, capture_profile)
 
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_pose = mp.solutions.pose
 
-        # Initialize the MediaPipe Pose model with specific settings for performance
-        self.pose = self.mp_pose.Pose(
-            # static_image_mode=False: Optimizes for video processing (faster)
-            static_image_mode=False,
-            # model_complexity=1: Uses the lightweight model for better real-time performance
-            model_complexity=1,
-            # smooth_landmarks=True: Reduces jitter in landmark detection
-            smooth_landmarks=True,
-            # enable_segmentation=False: We don't need background segmentation, so we disable it
-            enable_segmentation=False
-        )
+        # Pose estimation model (MediaPipe by default, see core_AI/pose_backends.py)
+        if isinstance(backend, PoseBackend):
+            self.backend = backend
+        else:
+            options = dict(backend_options or {})
+            if backend == MediaPipeBackend.name:
+                options.setdefault("model_complexity", model_complexity)
+            self.backend = create_backend(backend, **options)
+
+        # Optional latency-budget governor (adapts model complexity and frame skipping)
+        self.governor = None
+        if latency_budget_ms:
+            self.governor = LatencyGovernor(target_ms=latency_budget_ms,
+                                            start_level=LatencyGovernor.level_for(model_complexity))
+        self._frame_index = 0
+        self._last_landmarks = None
+        # (33, 4) array behind the landmarks last returned by process_frame() (None without a pose);
+        # cheaper to compute angles from than the MediaPipe landmark list
+        self.landmark_array = None
+        # Matching (33, 4) world landmarks (meters, origin between the hips) if the backend provides them;
+        # predicted like the image landmarks on frames without inference, so 2D and 3D angles stay in step
+        # Both arrays are new objects every frame: callers may keep them
+        self.world_landmark_array = None
+
+        # Fills in frames without inference (frame skipping) with predicted landmarks
+        self.inference_interval = max(1, inference_interval)
+        self.predictor = None
+        self.world_predictor = None
+        if predict_landmarks and (self.governor is not None or self.inference_interval > 1):
+            self.predictor = LandmarkPredictor()
+            self.world_predictor = LandmarkPredictor()
+
+    @property
+    def model_complexity(self):
+        return self.backend.model_complexity
+
+    def set_model_complexity(self, model_complexity):
+        """
+        Switches the pose model size (0 = lite, 1 = full, 2 = heavy) if the backend supports it.
+
+        Args:
+            model_complexity (int): The model complexity to use from now on.
+        """
+        self.backend.set_model_complexity(model_complexity)
+
+    def get_performance_mode(self):
+        """
+        Describes the current inference settings (shown on the Workout page).
+
+        Returns:
+            str: e.g. "Model 1, every frame (21 ms)", or the backend name if it has no model sizes.
+        """
+        if self.governor is not None:
+            return self.governor.describe()
+        if self.model_complexity is None:
+            return self.backend.name
+        return f"Model {self.model_complexity}, every frame"
+
+    def warm_up(self):
+        """
+        Runs the pose model once on a blank frame, so model loading and graph
+        initialization happen now instead of on the first frame the user sees.
+        """
+        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
+        if self.roi_tracker is not None:
+            # The model only ever sees crops downsized to the working size
+            scale = self.roi_tracker.working_size / max(width, height)
+            if scale < 1:
+                width, height = int(width * scale), int(height * scale)
+        self.backend.process(np.zeros((height, width, 3), dtype=np.uint8))
+
+    def read_frame(self):
+        """
+        Reads a single frame from the camera (or video file) and mirrors it if enabled.
+
+        Returns:
+            np.array: The frame (BGR format, or RGB if rgb_output is set), or None if reading failed.
+        """
+        slot = self.buffers.next_slot()
+
+        # Read a frame from the video stream, straight into a reused buffer once the size is known
+        raw = None
+        if self._frame_shape is not None:
+            raw = self.buffers.get(slot, "raw", self._frame_shape)
+        with self.profiler.stage("capture"):
+            success, image = self.cap.read(raw)
+        if not success:
+            # Return None if reading the frame failed (stream ended)
+            return None
+        if image is not raw:
+            # First frame (or the resolution changed): remember the size so later reads reuse buffers
+            self._frame_shape = image.shape
+
+        if self.rgb_output:
+            # The only color conversion of the frame: shared by MediaPipe and the display
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self.buffers.get(slot, "rgb", image.shape))
+
+        if self.flip:
+            image = cv2.flip(image, 1, dst=self.buffers.get(slot, "flipped", image.shape))
+        return image
+
+    def process_frame(self, image):
+        """
+        Runs the pose model on an already captured frame.
+
+        Args:
+            image (np.array): A frame as returned by read_frame().
+
+        Returns:
+            tuple: (image, landmarks).
+                   image (np.array): The same frame, in the format returned by read_frame().
+                   landmarks (mp.solution.pose.PoseLandmark): The detected pose landmarks, or None.
+        """
+        # Frame skipping: predict the landmarks on frames inference does not run on
+        interval = self.inference_interval
+        if self.governor is not None:
+            self.governor.tick()
+            interval = self.governor.inference_interval
+        skip_inference = self._frame_index % interval != 0
+        self._frame_index += 1
+        if skip_inference:
+            return image, self._predict_landmarks()
+
+        #  Pose Processing Steps
+        # 1. Select Input: the whole frame, or a downsized crop around the athlete (ROI tracking)
+        model_input, roi = image, None
+        if self.roi_tracker is not None:
+            model_input, roi = self.roi_tracker.prepare(image)
+        # 2. Convert to RGB: pose models require RGB input (already done by read_frame in rgb_output mode)
+        if self.rgb_output:
+            rgb_image = model_input
+        else:
+            if self._inference_buffer is None or self._inference_buffer.shape != model_input.shape:
+                self._inference_buffer = np.empty_like(model_input)
+            rgb_image = cv2.cvtColor(model_input, cv2.COLOR_BGR2RGB, dst=self._inference_buffer)
+        # 3. Process Pose: Run the backend model (the original BGR frame is never modified)
+        start = time.perf_counter_ns()
+        landmark_array = self.backend.process(rgb_image)
+        elapsed_ns = time.perf_counter_ns() - start
+        self.profiler.record("pose", elapsed_ns)
+        if self.governor is not None and self.governor.record(elapsed_ns / 1e6):
+            self.set_model_complexity(self.governor.model_complexity)
+
+        # 4. Map landmarks found in the crop back to full-frame coordinates and move the ROI
+        if self.roi_tracker is not None:
+            if landmark_array is not None:
+                if roi != (0, 0, image.shape[1], image.shape[0]):
+                    self.roi_tracker.to_full_frame(landmark_array, roi, image.shape)
+                self.roi_tracker.update(landmark_array, image.shape)
+            else:
+                # Tracking lost: fall back to the full frame
+                self.roi_tracker.reset()
+
+        # 5. Record what the pose model saw (full-frame coordinates)
+        if self.recorder is not None:
+            self.recorder.append(landmark_array, time.time(), self.backend.last_world_landmarks)
+
+        # 6. Feed the motion model used to fill in skipped frames
+        world_landmark_array = self.backend.last_world_landmarks
+        if self.predictor is not None:
+            now = time.monotonic()
+            if landmark_array is not None:
+                self.predictor.update(landmark_array, now)
+            else:
+                self.predictor.reset()
+            if world_landmark_array is not None:
+                self.world_predictor.update(world_landmark_array, now)
+            else:
+                self.world_predictor.reset()
+
+        # Return the processed image and the landmarks if detected
+        self.landmark_array = landmark_array
+        self.world_landmark_array = world_landmark_array
+        if landmark_array is None:
+            self._last_landmarks = None
+            return image, None
+
+        self._last_landmarks = array_to_landmarks(landmark_array)
+        return image, self._last_landmarks
+
+    def _predict_landmarks(self):
+        """Landmarks for a frame without inference: extrapolated if possible, else the last ones."""
+        if self.predictor is None or self._last_landmarks is None:
+            return self._last_landmarks
+        now = time.monotonic()
+        predicted = self.predictor.predict(now)
+        if predicted is None:
+            return self._last_landmarks
+        # Copies: the predictors reuse their output arrays on the next prediction
+        self.landmark_array = predicted.copy()
+        world_predicted = self.world_predictor.predict(now)
+        # Without world landmarks to predict, angles fall back to 2D rather than mixing frames
+        self.world_landmark_array = None if world_predicted is None else world_predicted.copy()
+        # A fresh landmark list per frame, so a frame still being drawn is never modified
+        return array_to_landmarks(self.landmark_array)
 
     def get_processed_frame(self):
         """
-        Reads a frame from the camera, processes it using MediaPipe, and returns
+        Reads a frame from the camera, processes it with the pose model, and returns
         the image and the detected pose landmarks.
 
         Returns:
@@ -47,32 +297,32 @@ class CameraProcessor:
                    image (np.array): The processed frame (BGR format).
                    landmarks (mp.solution.pose.PoseLandmark): The detected pose landmarks, or None.
         """
-        # Read a frame from the video stream
-        success, image = self.cap.read()
-        if not success:
-            # Return None if reading the frame failed (stream ended)
+        image = self.read_frame()
+        if image is None:
             return None, None
 
-        image = cv2.flip(image, 1)
+        return self.process_frame(image)
 
-        #  MediaPipe Processing Steps
-        # 1. Prepare Image: Set image to read-only for performance
-        image.flags.writeable = False
-        # 2. Convert to RGB: MediaPipe requires RGB input
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        # 3. Process Pose: Run the detection model
-        results = self.pose.process(image)
+    def draw_landmarks(self, image, landmarks):
+        """
+        Draws the pose skeleton on top of a frame (in place).
 
-        # 4. Finalize Image: Set image back to writeable
-        image.flags.writeable = True
-        # 5. Convert back to BGR: OpenCV uses BGR for display
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        Args:
+            image (np.array): The frame to draw on (in the format returned by read_frame()).
+            landmarks (mp.solution.pose.PoseLandmark): The landmarks to draw.
+        """
+        # Colors are defined in BGR; reverse them so the skeleton looks the same on RGB frames
+        landmark_color = (245, 117, 66)
+        connection_color = (245, 66, 230)
+        if self.rgb_output:
+            landmark_color = landmark_color[::-1]
+            connection_color = connection_color[::-1]
 
-        # Return the processed image and the landmarks if detected
-        if results.pose_landmarks:
-            return image, results.pose_landmarks
-        else:
-            return image, None
+        self.mp_drawing.draw_landmarks(
+            image, landmarks, self.mp_pose.POSE_CONNECTIONS,
+            self.mp_drawing.DrawingSpec(color=landmark_color, thickness=2, circle_radius=2),
+            self.mp_drawing.DrawingSpec(color=connection_color, thickness=2, circle_radius=2)
+        )
 
     def release_camera(self):
         """
@@ -80,3 +330,4 @@ class CameraProcessor:
         Crucial to avoid camera access errors in future runs.
         """
         self.cap.release()
+        self.backend.close()
@@ -0,0 +1,197 @@
+"""
+Angle Filters Module
+Stateful temporal filters that smooth all joint angles of a stream at once.
+
+They sit between AngleCalculator and WorkoutDetector: jitter around a rep
+threshold (e.g. an elbow hovering at 160 degrees) would otherwise toggle the
+detector's state. Every filter is driven by frame timestamps, so the amount of
+smoothing stays the same when the frame rate drops or frames are skipped.
+"""
+import math
+
+import numpy as np
+
+
+def _smoothing_factor(cutoff_hz, dt: float):
+    """Exponential smoothing factor of a first-order low-pass filter for a time step dt (seconds)."""
+    tau = 1.0 / (2.0 * math.pi * cutoff_hz)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class AngleFilterBank:
+    """
+    Base class of the angle filters: filters a vector of angles per frame.
+
+    filter() works on arrays (e.g. AngleCalculator.compute() output),
+    filter_dict() on the dicts returned by get_essential_angles().
+    """
+    name = "base"
+
+    def __init__(self, max_gap: float = 0.5):
+        """
+        Args:
+            max_gap (float): After a gap longer than this (seconds) the filter restarts from the new value.
+        """
+        self.max_gap = max_gap
+        self._last_time = None
+        self._keys = None
+
+    def filter(self, values: np.ndarray, timestamp: float) -> np.ndarray:
+        """
+        Filters one frame.
+
+        Args:
+            values (np.ndarray): (J,) angles in degrees.
+            timestamp (float): Frame time in seconds (any monotonic clock).
+
+        Returns:
+            np.ndarray: (J,) filtered angles (a new array).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not np.isfinite(values).all():
+            # A frame without a usable pose: start over from the next good one
+            self.reset()
+            return values.copy()
+
+        dt = None if self._last_time is None else timestamp - self._last_time
+        if dt is None or dt > self.max_gap or dt < 0:
+            self._start(values)
+            self._last_time = timestamp
+            return values.copy()
+        if dt == 0:
+            # Same timestamp twice (e.g. a repeated frame): nothing new to integrate
+            return self._output()
+        self._last_time = timestamp
+        return self._step(values, dt)
+
+    def filter_dict(self, angles: dict, timestamp: float) -> dict:
+        """filter() for a {name: angle} dict; the key order is fixed by the first call."""
+        if self._keys is None or len(self._keys) != len(angles):
+            self._keys = tuple(angles)
+            self.reset()
+        values = np.fromiter((angles[key] for key in self._keys), dtype=np.float64, count=len(self._keys))
+        return dict(zip(self._keys, self.filter(values, timestamp).tolist()))
+
+    def reset(self):
+        """Forgets the filter state (e.g. when the tracked person or exercise changes)."""
+        self._last_time = None
+
+    # Implemented by subclasses ===================================================================
+    def _start(self, values: np.ndarray):
+        raise NotImplementedError
+
+    def _step(self, values: np.ndarray, dt: float) -> np.ndarray:
+        raise NotImplementedError
+
+    def _output(self) -> np.ndarray:
+        raise NotImplementedError
+
+
+class OneEuroFilterBank(AngleFilterBank):
+    """
+    One-Euro filter (Casiez et al., 2012) for every angle of the vector.
+
+    A low-pass filter whose cutoff rises with the angle's speed: strong
+    smoothing while a joint is still (no jitter around thresholds), little lag
+    while it moves quickly.
+    """
+    name = "one_euro"
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.05, derivative_cutoff: float = 1.0,
+                 max_gap: float = 0.5):
+        """
+        Args:
+            min_cutoff (float): Cutoff frequency (Hz) when the joint is still; lower = smoother.
+            beta (float): Cutoff increase per degree/second of speed; higher = less lag on fast moves.
+            derivative_cutoff (float): Cutoff frequency (Hz) of the speed estimate.
+            max_gap (float): See AngleFilterBank.
+        """
+        super().__init__(max_gap)
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.derivative_cutoff = derivative_cutoff
+        self._value = None
+        self._speed = None
+
+    def _start(self, values):
+        self._value = values.copy()
+        self._speed = np.zeros_like(values)
+
+    def _step(self, values, dt):
+        # Smoothed speed, then a speed-dependent cutoff for the angles themselves
+        speed = (values - self._value) / dt
+        self._speed += _smoothing_factor(self.derivative_cutoff, dt) * (speed - self._speed)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._speed)
+        self._value += _smoothing_factor(cutoff, dt) * (values - self._value)
+        return self._value.copy()
+
+    def _output(self):
+        return self._value.copy()
+
+    def reset(self):
+        super().reset()
+        self._value = None
+        self._speed = None
+
+
+class LowPassFilterBank(AngleFilterBank):
+    """
+    IIR low-pass filter: `order` cascaded first-order sections with the same
+    cutoff. Higher orders reject jitter more sharply at the cost of more lag.
+    """
+    name = "low_pass"
+
+    def __init__(self, cutoff_hz: float = 4.0, order: int = 1, max_gap: float = 0.5):
+        """
+        Args:
+            cutoff_hz (float): Cutoff frequency of each section (Hz).
+            order (int): Number of cascaded first-order sections.
+            max_gap (float): See AngleFilterBank.
+        """
+        super().__init__(max_gap)
+        self.cutoff_hz = cutoff_hz
+        self.order = max(1, order)
+        self._stages = None  # (order, J) output of each section
+
+    def _start(self, values):
+        self._stages = np.tile(values, (self.order, 1))
+
+    def _step(self, values, dt):
+        alpha = _smoothing_factor(self.cutoff_hz, dt)
+        signal = values
+        for stage in self._stages:
+            stage += alpha * (signal - stage)
+            signal = stage
+        return signal.copy()
+
+    def _output(self):
+        return self._stages[-1].copy()
+
+    def reset(self):
+        super().reset()
+        self._stages = None
+
+
+# Registry used by create_angle_filter() and the command line options
+ANGLE_FILTERS = {
+    OneEuroFilterBank.name: OneEuroFilterBank,
+    LowPassFilterBank.name: LowPassFilterBank,
+}
+
+
+def create_angle_filter(name: str = "one_euro", **options):
+    """
+    Builds an angle filter by name.
+
+    Args:
+        name (str): A key of ANGLE_FILTERS (e.g. "one_euro", "low_pass"), or "none".
+        **options: Keyword arguments for the filter's constructor.
+
+    Returns:
+        AngleFilterBank: The filter, or None for "none".
+    """
+    if not name or name == "none":
+        return None
+    if name not in ANGLE_FILTERS:
+        raise ValueError(f"Unknown angle filter: {name} (available: none, {', '.join(ANGLE_FILTERS)})")
+    return ANGLE_FILTERS[name](**options)
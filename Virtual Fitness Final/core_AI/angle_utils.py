@@ -1,6 +1,140 @@
 import numpy as np
 import math
 
+from core_AI.landmark_utils import NUM_LANDMARKS, landmarks_to_array
+
+# Joint angles as (name, (A, B, C)) MediaPipe Pose landmark indices, B being the vertex (the joint)
+JOINT_TRIPLETS = (
+    ("LEFT_ELBOW_ANGLE", (11, 13, 15)),     # Shoulder - Elbow - Wrist
+    ("LEFT_KNEE_ANGLE", (23, 25, 27)),      # Hip - Knee - Ankle
+    ("LEFT_HIP_ANGLE", (11, 23, 25)),       # Shoulder - Hip - Knee
+    ("LEFT_SHOULDER_ANGLE", (13, 11, 23)),  # Elbow - Shoulder - Hip
+    ("RIGHT_ELBOW_ANGLE", (12, 14, 16)),
+    ("RIGHT_KNEE_ANGLE", (24, 26, 28)),
+    ("RIGHT_HIP_ANGLE", (12, 24, 26)),
+    ("RIGHT_SHOULDER_ANGLE", (14, 12, 24)),
+)
+
+# Keys of get_essential_angles() and the (left, right) joint angles each one reads
+ESSENTIAL_ANGLES = {
+    "KNEE_ANGLE": ("LEFT_KNEE_ANGLE", "RIGHT_KNEE_ANGLE"),
+    "ELBOW_ANGLE": ("LEFT_ELBOW_ANGLE", "RIGHT_ELBOW_ANGLE"),
+    "HIP_ANGLE": ("LEFT_HIP_ANGLE", "RIGHT_HIP_ANGLE"),
+    "SHOULDER_ANGLE": ("LEFT_SHOULDER_ANGLE", "RIGHT_SHOULDER_ANGLE"),
+}
+
+# How get_essential_angles() picks the body side:
+#   "left" / "right": always that side ("left" is the historical behavior)
+#   "best": per frame, the side whose joints are more visible (facing either way works)
+#   "fuse": per joint, left and right angles averaged with their visibilities as weights
+SIDE_MODES = ("left", "right", "best", "fuse")
+
+
+def joint_angles(points: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Angles (in degrees, 0 to 180) of many joints at once.
+
+    Uses atan2(|BA x BC|, BA . BC), the unsigned angle between the two limb
+    vectors. This is the same value as the difference of two atan2 calls folded
+    into [0, 180] (calculate_angle), in a single vectorized expression.
+
+    Args:
+        points (np.ndarray): (..., 33, D) landmark coordinates, D = 2 (x, y) or 3 (x, y, z);
+            leading dimensions (e.g. frames) are kept.
+        indices (np.ndarray): (J, 3) integer array of (A, B, C) landmark indices.
+
+    Returns:
+        np.ndarray: (..., J) angles (NaN where a landmark is NaN).
+    """
+    # One gather for all joints: (..., J, 3, D), then both limb vectors at once: (..., J, 2, D)
+    joints = points[..., indices, :]
+    limbs = joints[..., ::2, :] - joints[..., 1:2, :]
+    ba, bc = limbs[..., 0, :], limbs[..., 1, :]
+    dot = (ba * bc).sum(axis=-1)
+    if points.shape[-1] == 2:
+        cross = np.abs(ba[..., 0] * bc[..., 1] - ba[..., 1] * bc[..., 0])
+    else:
+        cross = np.linalg.norm(np.cross(ba, bc), axis=-1)
+    return np.degrees(np.arctan2(cross, dot))
+
+
+def joint_visibility(landmarks: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Visibility of each joint: the lowest visibility of its three landmarks.
+
+    Args:
+        landmarks (np.ndarray): (..., 33, 4) landmarks (x, y, z, visibility).
+        indices (np.ndarray): (J, 3) integer array of (A, B, C) landmark indices.
+
+    Returns:
+        np.ndarray: (..., J) visibilities in [0, 1].
+    """
+    return landmarks[..., 3][..., indices].min(axis=-1)
+
+
+def select_sides(angles: np.ndarray, visibility: np.ndarray, left_columns: np.ndarray,
+                 right_columns: np.ndarray, mode: str = "best") -> tuple:
+    """
+    Reduces left/right joint angles to one value per joint (see SIDE_MODES).
+
+    Args:
+        angles (np.ndarray): (..., J) joint angles.
+        visibility (np.ndarray): (..., J) joint visibilities (see joint_visibility).
+        left_columns, right_columns (np.ndarray): (K,) columns of the left and right joints of each pair.
+        mode (str): One of SIDE_MODES.
+
+    Returns:
+        tuple: ((..., K) angles, (...,) confidence in [0, 1], the visibility of what was used).
+    """
+    left_angles, right_angles = angles[..., left_columns], angles[..., right_columns]
+    left_visibility, right_visibility = visibility[..., left_columns], visibility[..., right_columns]
+
+    if mode == "left":
+        return left_angles, left_visibility.mean(axis=-1)
+    if mode == "right":
+        return right_angles, right_visibility.mean(axis=-1)
+    if mode == "best":
+        # One side for all joints, so the angles of a frame stay consistent with each other
+        left_score = left_visibility.mean(axis=-1)
+        right_score = right_visibility.mean(axis=-1)
+        use_right = right_score > left_score
+        return (np.where(use_right[..., None], right_angles, left_angles),
+                np.where(use_right, right_score, left_score))
+    if mode == "fuse":
+        total = left_visibility + right_visibility
+        left_weight = np.divide(left_visibility, total, out=np.full_like(total, 0.5), where=total > 0)
+        fused = left_weight * left_angles + (1.0 - left_weight) * right_angles
+        return fused, np.maximum(left_visibility, right_visibility).mean(axis=-1)
+    raise ValueError(f"Unknown side mode: {mode} (available: {', '.join(SIDE_MODES)})")
+
+
+def batch_joint_angles(points: np.ndarray, indices: np.ndarray, dims: int = 2,
+                       chunk_size: int = 8192, out: np.ndarray = None) -> np.ndarray:
+    """
+    Joint angles for a whole time series, e.g. a recorded session.
+
+    Frames are processed in chunks, so the temporaries stay bounded (a few MB
+    per chunk) however long the series is; `points` may be a memory-mapped
+    recording (see LandmarkRecording.landmarks), which is then read chunk by chunk.
+
+    Args:
+        points (np.ndarray): (T, 33, F) landmarks with F >= dims (e.g. (T, 33, 4) x, y, z, visibility).
+        indices (np.ndarray): (J, 3) integer array of (A, B, C) landmark indices.
+        dims (int): 2 for x/y angles, 3 for x/y/z.
+        chunk_size (int): Frames per vectorized pass.
+        out (np.ndarray, optional): (T, J) array to write into.
+
+    Returns:
+        np.ndarray: (T, J) float32 angles in degrees (NaN for frames without a pose).
+    """
+    indices = np.asarray(indices, dtype=np.intp)
+    if out is None:
+        out = np.empty((len(points), len(indices)), dtype=np.float32)
+    for start in range(0, len(points), chunk_size):
+        chunk = np.asarray(points[start:start + chunk_size, :, :dims], dtype=np.float64)
+        out[start:start + len(chunk)] = joint_angles(chunk, indices)
+    return out
+
 
 class AngleCalculator:
     """
@@ -8,8 +142,109 @@ class AngleCalculator:
     MediaPipe landmark coordinates.
 
     This class provides core geometrical logic for the AI Core module.
+    All configured joints are computed together by one vectorized call on a
+    (33, 2) coordinate array (see joint_angles); compute() returns them as a
+    compact array whose columns are named by `names` / `index`. Selected joints
+    can be computed in 3D from MediaPipe world landmarks instead (angles_3d).
+    A calculator reuses an internal buffer, so use one per thread.
     """
 
+    def __init__(self, triplets: tuple = JOINT_TRIPLETS, angles_3d=(), side: str = "left"):
+        """
+        Args:
+            triplets (tuple): (name, (A, B, C)) joint definitions; defaults to both body sides.
+            angles_3d (bool or iterable): Joints to compute in 3D from world landmarks whenever they
+                are given (True = every joint). 3D angles do not depend on the camera angle; the
+                other joints use image x/y as before.
+            side (str): How get_essential_angles() picks the body side, one of SIDE_MODES.
+        """
+        self.triplets = triplets
+        self.names = tuple(name for name, _ in triplets)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self._indices = np.array([joint for _, joint in triplets], dtype=np.intp)
+
+        # Left/right columns of each get_essential_angles() key
+        if side not in SIDE_MODES:
+            raise ValueError(f"Unknown side mode: {side} (available: {', '.join(SIDE_MODES)})")
+        self.side = side
+        pairs = [(key, left, right) for key, (left, right) in ESSENTIAL_ANGLES.items()
+                 if left in self.index and (right in self.index or side == "left")]
+        self._essential_keys = tuple(key for key, _, _ in pairs)
+        self._left_columns = np.array([self.index[left] for _, left, _ in pairs], dtype=np.intp)
+        self._right_columns = np.array([self.index.get(right, self.index[left]) for _, left, right in pairs],
+                                       dtype=np.intp)
+
+        # Per-joint choice of 2D (image) or 3D (world) coordinates
+        if angles_3d is True:
+            angles_3d = self.names
+        unknown = set(angles_3d) - set(self.names)
+        if unknown:
+            raise ValueError(f"Unknown joint angles: {', '.join(sorted(unknown))}")
+        self.uses_3d = np.array([name in angles_3d for name in self.names], dtype=bool)
+        self._columns_2d = np.flatnonzero(~self.uses_3d)
+        self._columns_3d = np.flatnonzero(self.uses_3d)
+        self._indices_2d = self._indices[self._columns_2d]
+        self._indices_3d = self._indices[self._columns_3d]
+
+        # Landmark lists are copied here once per frame instead of once per joint
+        self._landmark_buffer = np.empty((NUM_LANDMARKS, 4), dtype=np.float64)
+        self._world_buffer = np.empty((NUM_LANDMARKS, 4), dtype=np.float64)
+
+    @staticmethod
+    def _as_array(landmarks, buffer: np.ndarray) -> np.ndarray:
+        """A (33, 4) array from a landmark array or a MediaPipe landmark list (copied into buffer)."""
+        if isinstance(landmarks, np.ndarray):
+            return landmarks
+        return landmarks_to_array(landmarks, out=buffer)
+
+    def compute(self, landmarks, world_landmarks=None) -> np.ndarray:
+        """
+        Calculates every configured joint angle in one pass.
+
+        Args:
+            landmarks: (33, 4) landmark array (see landmark_utils), or a MediaPipe landmark list.
+            world_landmarks (optional): The matching world landmarks (array or list); the joints
+                selected with angles_3d fall back to 2D when they are missing.
+
+        Returns:
+            np.ndarray: (J,) angles in degrees, in the order of `names`.
+        """
+        points = self._as_array(landmarks, self._landmark_buffer)
+        if world_landmarks is None or not len(self._columns_3d):
+            return joint_angles(points[:, :2], self._indices)
+
+        world = self._as_array(world_landmarks, self._world_buffer)
+        angles = np.empty(len(self.names))
+        angles[self._columns_2d] = joint_angles(points[:, :2], self._indices_2d)
+        angles[self._columns_3d] = joint_angles(world[:, :3], self._indices_3d)
+        return angles
+
+    def compute_batch(self, landmarks: np.ndarray, world_landmarks: np.ndarray = None,
+                      chunk_size: int = 8192) -> np.ndarray:
+        """
+        Calculates every configured joint angle for a whole time series (see batch_joint_angles).
+
+        Args:
+            landmarks (np.ndarray): (T, 33, 4) landmark array, e.g. LandmarkRecording.landmarks.
+            world_landmarks (np.ndarray, optional): (T, 33, 4) world landmarks for the angles_3d joints.
+            chunk_size (int): Frames per vectorized pass.
+
+        Returns:
+            np.ndarray: (T, J) angles in degrees, columns in the order of `names`.
+        """
+        if world_landmarks is None or not len(self._columns_3d):
+            return batch_joint_angles(landmarks, self._indices, chunk_size=chunk_size)
+
+        angles = np.empty((len(landmarks), len(self.names)), dtype=np.float32)
+        angles[:, self._columns_2d] = batch_joint_angles(landmarks, self._indices_2d, dims=2, chunk_size=chunk_size)
+        angles[:, self._columns_3d] = batch_joint_angles(world_landmarks, self._indices_3d, dims=3,
+                                                         chunk_size=chunk_size)
+        return angles
+
+    def as_dict(self, angles: np.ndarray) -> dict:
+        """Maps an array returned by compute() to {joint name: angle}."""
+        return dict(zip(self.names, angles.tolist()))
+
     def calculate_angle(self, a, b, c):
         """
         Calculates the angle (in degrees) between three 2D points (A, B, C),
@@ -42,57 +277,64 @@ class AngleCalculator:
             angle = 360 - angle
         return angle
 
-    def get_essential_angles(self, landmarks_list):
+    def essential_angles(self, landmarks, world_landmarks=None) -> tuple:
+        """
+        The essential angles of one frame, from the side(s) chosen by `side`, and how
+        confident they are (the visibility of the joints they were measured on).
+
+        Args:
+            landmarks: (33, 4) landmark array, or a MediaPipe landmark list.
+            world_landmarks (optional): World landmarks, used for the joints selected with angles_3d.
+
+        Returns:
+            tuple: (dict of angles like get_essential_angles(), confidence in [0, 1]).
+        """
+        points = self._as_array(landmarks, self._landmark_buffer)
+        angles = self.compute(points, world_landmarks)
+        visibility = joint_visibility(points, self._indices)
+        selected, confidence = select_sides(angles, visibility, self._left_columns, self._right_columns, self.side)
+        return dict(zip(self._essential_keys, selected.tolist())), float(confidence)
+
+    def essential_batch(self, landmarks: np.ndarray, world_landmarks: np.ndarray = None,
+                        chunk_size: int = 8192) -> tuple:
+        """
+        essential_angles() for a whole time series.
+
+        Args:
+            landmarks (np.ndarray): (T, 33, 4) landmark array (NaN rows for frames without a pose).
+            world_landmarks (np.ndarray, optional): (T, 33, 4) world landmarks for the angles_3d joints.
+            chunk_size (int): Frames per vectorized pass.
+
+        Returns:
+            tuple: ((T, K) angles with columns in the order of essential_keys, (T,) confidence).
+        """
+        angles = self.compute_batch(landmarks, world_landmarks, chunk_size=chunk_size)
+        selected = np.empty((len(angles), len(self._essential_keys)), dtype=np.float32)
+        confidence = np.empty(len(angles), dtype=np.float32)
+        for start in range(0, len(angles), chunk_size):
+            end = start + chunk_size
+            visibility = joint_visibility(np.asarray(landmarks[start:end], dtype=np.float32), self._indices)
+            selected[start:end], confidence[start:end] = select_sides(
+                angles[start:end], visibility, self._left_columns, self._right_columns, self.side)
+        return selected, confidence
+
+    @property
+    def essential_keys(self) -> tuple:
+        """Keys of get_essential_angles(), in the column order of essential_batch()."""
+        return self._essential_keys
+
+    def get_essential_angles(self, landmarks_list, world_landmarks=None):
         """
         Calculates the four essential angles (Elbow, Knee, Hip, Shoulder)
         for tracking side view exercises like Squats, Lunges, or Pushups.
+        The body side they are measured on depends on `side` (left by default).
 
         Args:
-            landmarks_list (list).
+            landmarks_list (list or np.ndarray): MediaPipe landmarks, or a (33, 4) landmark array.
+            world_landmarks (optional): World landmarks, used for the joints selected with angles_3d.
 
         Returns:
             dict: A dictionary containing the four calculated angles (float).
         """
-        #   Landmark Indices (Standard MediaPipe Pose Model)
-        LEFT_SHOULDER = 11
-        LEFT_HIP = 23
-        LEFT_ELBOW = 13
-        LEFT_WRIST = 15
-        LEFT_KNEE = 25
-        LEFT_ANKLE = 27
-
-        # 1. ELBOW_ANGLE: Angle at the elbow joint (Shoulder - Elbow - Wrist)
-        elbow_angle = self.calculate_angle(
-            landmarks_list[LEFT_SHOULDER],  # A
-            landmarks_list[LEFT_ELBOW],  # B (Vertex)
-            landmarks_list[LEFT_WRIST]  # C
-        )
-
-        # 2. KNEE_ANGLE: Angle at the knee joint (Hip - Knee - Ankle)
-        knee_angle = self.calculate_angle(
-            landmarks_list[LEFT_HIP],  # A
-            landmarks_list[LEFT_KNEE],  # B (Vertex)
-            landmarks_list[LEFT_ANKLE]  # C
-        )
-
-        # 3. HIP_ANGLE: Angle at the hip joint (Shoulder - Hip - Knee)
-        hip_angle = self.calculate_angle(
-            landmarks_list[LEFT_SHOULDER],  # A
-            landmarks_list[LEFT_HIP],  # B (Vertex)
-            landmarks_list[LEFT_KNEE]  # C
-        )
-
-        # 4. SHOULDER_ANGLE: Angle at the shoulder joint (Elbow - Shoulder - Hip)
-        shoulder_angle = self.calculate_angle(
-            landmarks_list[LEFT_ELBOW],  # A
-            landmarks_list[LEFT_SHOULDER],  # B (Vertex)
-            landmarks_list[LEFT_HIP]  # C
-        )
-
         # Return the collected angles for the tracker/logic modules
-        return {
-            'KNEE_ANGLE': knee_angle,
-            'ELBOW_ANGLE': elbow_angle,
-            'HIP_ANGLE': hip_angle,
-            'SHOULDER_ANGLE': shoulder_angle
-        }
+        return self.essential_angles(landmarks_list, world_landmarks)[0]
@@ -0,0 +1,169 @@
+"""
+Capture Profile Module
+Negotiates the webcam mode (FOURCC, resolution, FPS, driver buffer size)
+instead of relying on driver defaults.
+
+Many USB webcams open as uncompressed YUYV, which the USB bandwidth limits to
+a low frame rate at 720p, and keep several frames queued in the driver, so
+every read returns a frame that is already a few frames old. Requesting MJPG
+and a one-frame buffer fixes both on most devices. Drivers silently ignore
+settings they do not support, so the effective values are always read back.
+"""
+import time
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import cv2
+
+# Fallback resolutions tried (in order) when the requested one is not accepted
+DEFAULT_FALLBACK_SIZES = ((1280, 720), (960, 540), (640, 480))
+
+
+def decode_fourcc(value: float) -> str:
+    """Converts a CAP_PROP_FOURCC value to its four-character code (e.g. "MJPG")."""
+    code = int(value)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+
+@dataclass
+class CaptureProfile:
+    """Requested capture settings; None leaves a setting at the driver default."""
+    width: Optional[int] = 1280
+    height: Optional[int] = 720
+    fps: Optional[float] = 30
+    fourcc: Optional[str] = "MJPG"
+    buffer_size: Optional[int] = 1
+
+    @classmethod
+    def parse(cls, text: str) -> "CaptureProfile":
+        """
+        Parses "WIDTHxHEIGHT[@FPS][:FOURCC]", e.g. "1280x720@30" or "640x480@60:YUYV".
+        """
+        mode, _, fourcc = text.partition(":")
+        size, _, fps = mode.partition("@")
+        width, _, height = size.lower().partition("x")
+        return cls(width=int(width), height=int(height), fps=float(fps) if fps else None,
+                   fourcc=fourcc or cls.fourcc)
+
+
+@dataclass
+class CaptureReport:
+    """Settings the device actually accepted, and how long reads take with them."""
+    requested: CaptureProfile
+    width: int
+    height: int
+    fps: float                   # As reported by the driver (0 if unknown)
+    fourcc: str                  # Empty if the backend does not report it
+    buffer_size: Optional[int]   # None if the backend does not support CAP_PROP_BUFFERSIZE
+    read_ms: float = 0.0         # Mean time a read blocked waiting for a frame
+    frame_interval_ms: float = 0.0  # Mean time between consecutive frames (1000 / measured FPS)
+
+    @property
+    def measured_fps(self) -> float:
+        return 1000.0 / self.frame_interval_ms if self.frame_interval_ms > 0 else 0.0
+
+    def describe(self) -> str:
+        """One-line summary, e.g. "1280x720 MJPG @ 30 fps (measured 29.8), buffer 1, read 31.2 ms"."""
+        buffer_text = "default" if self.buffer_size is None else self.buffer_size
+        return (f"{self.width}x{self.height} {self.fourcc or '?'} @ {self.fps:g} fps "
+                f"(measured {self.measured_fps:.1f}), buffer {buffer_text}, read {self.read_ms:.1f} ms")
+
+
+def apply_profile(cap, profile: CaptureProfile):
+    """
+    Sends a profile to an open capture. The order matters: most drivers only
+    offer high FPS at a given size once the compressed format is selected, and
+    reset the frame rate when the size changes.
+    """
+    if profile.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile.fourcc))
+    if profile.width and profile.height:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile.height)
+    if profile.fps:
+        cap.set(cv2.CAP_PROP_FPS, profile.fps)
+    if profile.buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, profile.buffer_size)
+
+
+def read_settings(cap, requested: CaptureProfile) -> CaptureReport:
+    """Reads back the settings the device is actually using."""
+    buffer_size = int(cap.get(cv2.CAP_PROP_BUFFERSIZE))
+    return CaptureReport(
+        requested=requested,
+        width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        fps=float(cap.get(cv2.CAP_PROP_FPS)),
+        fourcc=decode_fourcc(cap.get(cv2.CAP_PROP_FOURCC)),
+        buffer_size=buffer_size if buffer_size > 0 else None,
+    )
+
+
+def measure_capture_latency(cap, frames: int = 15, warmup: int = 5) -> tuple:
+    """
+    Times cap.grab() (the blocking part of cap.read()) on a live capture.
+
+    The warmup reads drain whatever the driver had queued; after that, with a
+    one-frame buffer each read waits for the next frame from the sensor, so the
+    frame interval should match the nominal FPS.
+
+    Returns:
+        tuple: (mean read time in ms, mean frame interval in ms), or (0.0, 0.0) if reads fail.
+    """
+    for _ in range(warmup):
+        if not cap.grab():
+            return 0.0, 0.0
+
+    read_total = 0.0
+    read_count = 0
+    first = last = None
+    for _ in range(frames):
+        start = time.perf_counter()
+        if not cap.grab():
+            break
+        last = time.perf_counter()
+        read_total += last - start
+        read_count += 1
+        if first is None:
+            first = last
+
+    if not read_count:
+        return 0.0, 0.0
+    interval = (last - first) / (read_count - 1) if read_count > 1 else 0.0
+    return read_total / read_count * 1000.0, interval * 1000.0
+
+
+def negotiate_capture(cap, profile: CaptureProfile, fallback_sizes: tuple = DEFAULT_FALLBACK_SIZES,
+                      probe_frames: int = 15) -> CaptureReport:
+    """
+    Applies a profile to an open webcam, falling back to smaller resolutions
+    (same FPS and FOURCC) when the device does not accept the requested one,
+    then measures how reads behave in the selected mode.
+
+    Args:
+        cap (cv2.VideoCapture): An open webcam capture.
+        profile (CaptureProfile): The preferred settings.
+        fallback_sizes (tuple): (width, height) pairs to try after the requested size.
+        probe_frames (int): Number of frames read to measure capture latency (0 = skip).
+
+    Returns:
+        CaptureReport: The effective settings and the measured read timing.
+    """
+    candidates = [profile]
+    if profile.width and profile.height:
+        candidates += [replace(profile, width=width, height=height) for width, height in fallback_sizes
+                       if width * height < profile.width * profile.height]
+
+    for candidate in candidates:
+        apply_profile(cap, candidate)
+        report = read_settings(cap, profile)
+        if not candidate.width or (report.width, report.height) == (candidate.width, candidate.height):
+            break
+    else:
+        # No exact match: go back to the requested profile and keep whatever size the driver picks
+        apply_profile(cap, profile)
+        report = read_settings(cap, profile)
+
+    if probe_frames:
+        report.read_ms, report.frame_interval_ms = measure_capture_latency(cap, probe_frames)
+    return report
@@ -0,0 +1,84 @@
+"""
+FrameBufferPool Module
+A ring of preallocated frame buffers that OpenCV writes into through its dst=
+arguments, so the per-frame capture/flip/color-conversion path does not
+allocate new full-frame arrays.
+"""
+import threading
+
+import numpy as np
+
+
+class FrameBufferPool:
+    """
+    Hands out named frame buffers from a fixed ring of slots.
+
+    Each call to next_slot() moves to the next slot; buffers in a slot are reused
+    the next time the ring wraps around to it. A frame handed to other threads
+    (e.g. the FramePipeline stages) is leased until they are done with it:
+    next_slot() skips leased slots, and adds a slot when all of them are leased,
+    so a frame is never overwritten while it is still being processed or drawn.
+    """
+
+    def __init__(self, slots: int = 8):
+        """
+        Args:
+            slots (int): Initial number of frames that can be alive at the same time.
+        """
+        self.slots = max(1, slots)
+        self._buffers = [{} for _ in range(self.slots)]
+        self._index = -1
+        self._leased = set()
+        self._lock = threading.Lock()  # Slots are leased by the capture thread and released by others
+
+    def next_slot(self) -> int:
+        """Advances the ring and returns the index of the slot to use for the next frame."""
+        with self._lock:
+            for _ in range(self.slots):
+                self._index = (self._index + 1) % self.slots
+                if self._index not in self._leased:
+                    return self._index
+            # Every frame is still in use: grow the ring instead of overwriting one
+            self._buffers.append({})
+            self._index = self.slots
+            self.slots += 1
+            return self._index
+
+    def lease(self) -> int:
+        """Keeps the slot of the last frame (the one next_slot() returned) from being reused; returns it."""
+        with self._lock:
+            self._leased.add(self._index)
+            return self._index
+
+    def release(self, slot: int):
+        """Makes a leased slot reusable again."""
+        with self._lock:
+            self._leased.discard(slot)
+
+    def get(self, slot: int, name: str, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        """
+        Returns the buffer called `name` in `slot`, allocating it only on first
+        use or when the frame size changes.
+
+        Args:
+            slot (int): Slot index returned by next_slot().
+            name (str): Buffer role within the slot (e.g. "raw", "rgb").
+            shape (tuple): Required array shape.
+            dtype: Required array dtype.
+
+        Returns:
+            np.ndarray: A writable array with the requested shape and dtype.
+        """
+        buffers = self._buffers[slot]
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            buffers[name] = buffer
+        return buffer
+
+    def clear(self):
+        """Releases every buffer (they are reallocated lazily on next use)."""
+        with self._lock:
+            self._buffers = [{} for _ in range(self.slots)]
+            self._index = -1
+            self._leased.clear()
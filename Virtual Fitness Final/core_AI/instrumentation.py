@@ -0,0 +1,216 @@
+"""
+Instrumentation Module
+Low-overhead per-stage latency measurement for the frame loop.
+
+Durations are taken with time.perf_counter_ns() (monotonic, high resolution)
+and counted into fixed histogram buckets, so recording a sample is a bisect
+and an increment: no per-frame allocations and constant memory however long
+the app runs.
+"""
+import bisect
+import json
+import os
+import time
+
+# Upper bucket edges in milliseconds; one extra bucket counts everything above the last edge
+BUCKET_EDGES_MS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 12, 16, 20, 25, 33, 40, 50, 66, 100, 150, 250, 500, 1000)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Not locked: every stage is expected to be recorded from a single thread.
+    Readers (overlay, dump) may see a sample half-counted, which is harmless
+    for diagnostics.
+    """
+
+    def __init__(self, edges_ms: tuple = BUCKET_EDGES_MS):
+        self.edges_ms = edges_ms
+        self._edges_ns = [int(edge * 1e6) for edge in edges_ms]
+        self.counts = [0] * (len(edges_ms) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, duration_ns: int):
+        """Counts one sample."""
+        self.counts[bisect.bisect_left(self._edges_ns, duration_ns)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ns / self.count / 1e6 if self.count else 0.0
+
+    def percentile_ms(self, percent: float) -> float:
+        """Approximate percentile: the upper edge of the bucket that contains it (at most the max)."""
+        max_ms = self.max_ns / 1e6
+        if not self.count:
+            return 0.0
+        target = self.count * percent / 100.0
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.edges_ms[index], max_ms) if index < len(self.edges_ms) else max_ms
+        return max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "meanMs": round(self.mean_ms, 3),
+            "p50Ms": self.percentile_ms(50),
+            "p95Ms": self.percentile_ms(95),
+            "p99Ms": self.percentile_ms(99),
+            "maxMs": round(self.max_ns / 1e6, 3),
+            "bucketEdgesMs": list(self.edges_ms),
+            "counts": list(self.counts),
+        }
+
+
+class _StageTimer:
+    """Reusable context manager that times a block into one histogram."""
+    __slots__ = ("histogram", "_start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.add(time.perf_counter_ns() - self._start)
+        return False
+
+
+class _NullTimer:
+    """Stand-in used while profiling is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class FrameProfiler:
+    """
+    Collects one LatencyHistogram per named stage of the frame loop.
+
+    Usage:
+        profiler = FrameProfiler()
+        with profiler.stage("pose"):
+            landmarks = backend.process(image)
+        profiler.record_since("end_to_end", capture_ns)  # capture-to-display latency
+        profiler.dump("storage/perf/perf.json")
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled (bool): When False, stage() and record_since() do nothing.
+        """
+        self.enabled = enabled
+        self.show_overlay = False  # Toggled by the GUI
+        self.histograms = {}
+        self._timers = {}
+        self.started_at = time.time()
+
+    @staticmethod
+    def now_ns() -> int:
+        """Timestamp in the profiler's clock, for record_since()."""
+        return time.perf_counter_ns()
+
+    def _histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    def stage(self, name: str):
+        """Returns a context manager that times the enclosed block as stage `name`."""
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _StageTimer(self._histogram(name))
+        return timer
+
+    def record(self, name: str, duration_ns: int):
+        """Records a duration measured by the caller as stage `name`."""
+        if self.enabled:
+            self._histogram(name).add(duration_ns)
+
+    def record_since(self, name: str, start_ns: int):
+        """Records the time elapsed since `start_ns` (from now_ns()) as stage `name`."""
+        if self.enabled:
+            self._histogram(name).add(time.perf_counter_ns() - start_ns)
+
+    def summary_lines(self) -> list:
+        """One line per stage (mean / p95 / max in ms), for the on-screen overlay."""
+        lines = [f"{'stage':<12}{'mean':>7}{'p95':>7}{'max':>7}"]
+        for name, histogram in self.histograms.items():
+            lines.append(f"{name:<12}{histogram.mean_ms:>7.1f}{histogram.percentile_ms(95):>7.1f}"
+                         f"{histogram.max_ns / 1e6:>7.1f}")
+        return lines
+
+    def to_dict(self) -> dict:
+        return {
+            "startedAt": self.started_at,
+            "duration": round(time.time() - self.started_at, 3),
+            "stages": {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+        }
+
+    def dump(self, path: str):
+        """Writes all histograms to a JSON file (creating its directory if needed)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class StartupTimeline:
+    """
+    Milestones of application startup, in seconds since the timeline was created.
+
+    Usage:
+        startup = StartupTimeline()  # as early as possible
+        ...
+        startup.mark("window shown")  # prints "[startup] +0.412 s  window shown"
+    """
+
+    def __init__(self, verbose: bool = True):
+        """
+        Args:
+            verbose (bool): Print every milestone as it is reached.
+        """
+        self.verbose = verbose
+        self.marks = []  # (name, seconds since start); appended from the Tk and warmup threads
+        self._start = time.perf_counter()
+
+    def mark(self, name: str) -> float:
+        """Records a milestone and returns its time since start in seconds."""
+        elapsed = time.perf_counter() - self._start
+        self.marks.append((name, elapsed))
+        if self.verbose:
+            print(f"[startup] +{elapsed:.3f} s  {name}")
+        return elapsed
+
+    def report(self) -> str:
+        """The whole timeline, one milestone per line with the time spent since the previous one."""
+        lines = []
+        previous = 0.0
+        for name, elapsed in self.marks:
+            lines.append(f"{elapsed:8.3f} s  (+{elapsed - previous:.3f})  {name}")
+            previous = elapsed
+        return "\n".join(lines)
@@ -0,0 +1,124 @@
+"""
+LandmarkPredictor Module
+Constant-velocity Kalman filter over all 33 pose landmarks, vectorized with
+NumPy. It is updated on frames where the pose model runs and extrapolates
+landmark positions for the frames in between, so angles and the skeleton
+overlay keep moving at camera rate while inference runs less often.
+"""
+import numpy as np
+
+from core_AI.landmark_utils import NUM_LANDMARKS
+
+
+class LandmarkPredictor:
+    """
+    Tracks position and velocity of every landmark coordinate (x, y, z).
+
+    Each of the 33 x 3 coordinates is an independent 2-state (position, velocity)
+    Kalman filter; all of them are stored in (33, 3) arrays and updated together.
+    Measurement noise grows as landmark visibility drops, so occluded landmarks
+    lean on the motion model instead of on noisy detections.
+    """
+
+    def __init__(self, process_noise: float = 10.0, measurement_noise: float = 2.5e-5,
+                 max_prediction_s: float = 0.5):
+        """
+        Args:
+            process_noise (float): Acceleration noise density (normalized units^2 / s^3); higher follows fast moves sooner.
+            measurement_noise (float): Variance of a fully visible landmark measurement (normalized units^2).
+            max_prediction_s (float): Do not extrapolate further than this past the last measurement.
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.max_prediction_s = max_prediction_s
+
+        shape = (NUM_LANDMARKS, 3)
+        self.position = np.zeros(shape)
+        self.velocity = np.zeros(shape)
+        # Covariance [[p00, p01], [p01, p11]] of each coordinate's (position, velocity) state
+        self._p00 = np.zeros(shape)
+        self._p01 = np.zeros(shape)
+        self._p11 = np.zeros(shape)
+        self._visibility = np.zeros(NUM_LANDMARKS)
+        self._output = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+
+        self.last_timestamp = None
+
+    @property
+    def initialized(self) -> bool:
+        return self.last_timestamp is not None
+
+    def update(self, landmarks: np.ndarray, timestamp: float) -> np.ndarray:
+        """
+        Feeds a measured landmark array into the filter.
+
+        Args:
+            landmarks (np.ndarray): (33, 4) array with columns (x, y, z, visibility).
+            timestamp (float): Time of the frame in seconds (monotonic clock).
+
+        Returns:
+            np.ndarray: The filtered (33, 4) landmark array (reused between calls).
+        """
+        measured = landmarks[:, :3]
+        visibility = landmarks[:, 3]
+        self._visibility[:] = visibility
+
+        if not self.initialized:
+            self.position[:] = measured
+            self.velocity[:] = 0.0
+            self._p00[:] = self.measurement_noise
+            self._p01[:] = 0.0
+            self._p11[:] = 1.0  # Unknown initial velocity
+            self.last_timestamp = timestamp
+            return self._write_output(self.position)
+
+        dt = max(timestamp - self.last_timestamp, 1e-3)
+        q = self.process_noise
+
+        # Predict: x = F x, P = F P F^T + Q (constant velocity, white acceleration noise)
+        self.position += self.velocity * dt
+        p00 = self._p00 + 2.0 * dt * self._p01 + dt * dt * self._p11 + q * dt ** 3 / 3.0
+        p01 = self._p01 + dt * self._p11 + q * dt ** 2 / 2.0
+        p11 = self._p11 + q * dt
+
+        # Update with the measured positions (noise scaled by 1 / visibility)
+        r = (self.measurement_noise / np.clip(visibility, 0.05, 1.0))[:, None]
+        s = p00 + r
+        k0 = p00 / s
+        k1 = p01 / s
+        innovation = measured - self.position
+        self.position += k0 * innovation
+        self.velocity += k1 * innovation
+        self._p00 = (1.0 - k0) * p00
+        self._p01 = (1.0 - k0) * p01
+        self._p11 = p11 - k1 * p01
+
+        self.last_timestamp = timestamp
+        return self._write_output(self.position)
+
+    def predict(self, timestamp: float):
+        """
+        Extrapolates the landmarks to a later time without changing the filter state.
+
+        Args:
+            timestamp (float): Time of the frame to predict, in seconds (monotonic clock).
+
+        Returns:
+            np.ndarray: Predicted (33, 4) landmark array (reused between calls), or None
+                        if the filter has no recent measurement.
+        """
+        if not self.initialized:
+            return None
+        dt = timestamp - self.last_timestamp
+        if dt > self.max_prediction_s:
+            return None
+        return self._write_output(self.position + self.velocity * max(dt, 0.0))
+
+    def reset(self):
+        """Forgets the tracked person (e.g. when the pose is lost)."""
+        self.last_timestamp = None
+
+    def _write_output(self, position: np.ndarray) -> np.ndarray:
+        self._output[:, :3] = position
+        self._output[:, 3] = self._visibility
+        return self._output
@@ -0,0 +1,235 @@
+"""
+Landmark Recorder Module
+Persists what the pose model saw as a compact binary file of fixed-size
+records (timestamp + 33 x 4 landmarks, optionally + 33 x 4 world landmarks)
+and replays it through a memory map.
+
+File layout:
+    header  (16 bytes): magic "VFLM", format version, landmark count,
+                        field count, bytes per landmark value (2 or 4) and
+                        flags (FLAG_WORLD_LANDMARKS: records have a world block)
+    records (repeated): float64 timestamp, then 33 x 4 landmark values
+                        (x, y, z, visibility; NaN when no pose was found),
+                        then with FLAG_WORLD_LANDMARKS 33 x 4 world landmark
+                        values (meters; NaN when the backend gave none)
+
+Version 1 files have no flags (the bytes were padding) and are still read.
+"""
+import os
+import struct
+
+import numpy as np
+
+from core_AI.landmark_utils import NUM_LANDMARKS
+
+MAGIC = b"VFLM"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sHHHHH2x")  # magic, version, landmarks, fields, value bytes, flags, padding
+HEADER_SIZE = _HEADER.size
+_VALUE_TYPES = {2: "<f2", 4: "<f4"}
+FLAG_WORLD_LANDMARKS = 1  # Records carry world landmarks (for 3D angles, see AngleCalculator angles_3d)
+
+
+def record_dtype(value_bytes: int = 2, num_landmarks: int = NUM_LANDMARKS, world_landmarks: bool = False) -> np.dtype:
+    """Returns the NumPy dtype of one record."""
+    fields = [("timestamp", "<f8"), ("landmarks", _VALUE_TYPES[value_bytes], (num_landmarks, 4))]
+    if world_landmarks:
+        fields.append(("world_landmarks", _VALUE_TYPES[value_bytes], (num_landmarks, 4)))
+    return np.dtype(fields)
+
+
+class LandmarkRecorder:
+    """
+    Appends per-frame landmarks to a recording file.
+
+    Records are collected in a preallocated array and written in blocks, so
+    append() does not touch the disk on every frame. float16 values (the
+    default) keep about 0.05% precision on normalized coordinates, well below
+    the pose model's own jitter, at half the size of float32.
+    """
+
+    def __init__(self, path: str, precision: str = "float16", buffer_frames: int = 256,
+                 world_landmarks: bool = False):
+        """
+        Args:
+            path (str): File to create (overwritten if it exists).
+            precision (str): "float16" or "float32" landmark values.
+            buffer_frames (int): Number of records buffered in memory between writes.
+            world_landmarks (bool): Also store world landmarks, so replays can compute 3D angles.
+        """
+        value_bytes = {"float16": 2, "float32": 4}[precision]
+        self.path = path
+        self.world_landmarks = world_landmarks
+        self.dtype = record_dtype(value_bytes, world_landmarks=world_landmarks)
+        self._buffer = np.empty(buffer_frames, dtype=self.dtype)
+        self._count = 0
+        self.frames_written = 0
+
+        flags = FLAG_WORLD_LANDMARKS if world_landmarks else 0
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, NUM_LANDMARKS, 4, value_bytes, flags))
+
+    def append(self, landmarks, timestamp: float, world_landmarks=None):
+        """
+        Adds one frame.
+
+        Args:
+            landmarks (np.ndarray): (33, 4) landmark array, or None if no pose was found.
+            timestamp (float): Frame time in seconds (e.g. time.time()).
+            world_landmarks (np.ndarray, optional): (33, 4) world landmarks; ignored unless
+                the recorder stores them.
+        """
+        record = self._buffer[self._count]
+        record["timestamp"] = timestamp
+        if landmarks is None:
+            record["landmarks"] = np.nan
+        else:
+            record["landmarks"] = landmarks
+        if self.world_landmarks:
+            record["world_landmarks"] = np.nan if landmarks is None or world_landmarks is None else world_landmarks
+        self._count += 1
+        if self._count == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        """Writes buffered records to disk."""
+        if self._count:
+            self._buffer[:self._count].tofile(self._file)
+            self.frames_written += self._count
+            self._count = 0
+        self._file.flush()
+
+    def close(self):
+        """Flushes and closes the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    """
+    Read-only view of a recording file. Records are memory-mapped, so opening
+    is instant and frames are only read from disk when accessed.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): A file written by LandmarkRecorder.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"Not a landmark recording (file too short): {path}")
+        magic, version, num_landmarks, num_fields, value_bytes, flags = _HEADER.unpack(header)
+        if magic != MAGIC or num_fields != 4 or value_bytes not in _VALUE_TYPES:
+            raise ValueError(f"Not a landmark recording: {path}")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version {version}: {path}")
+
+        self.has_world_landmarks = version >= 2 and bool(flags & FLAG_WORLD_LANDMARKS)
+        self.dtype = record_dtype(value_bytes, num_landmarks, self.has_world_landmarks)
+        # Whole records only: a file cut short mid-write (e.g. a crash) ends in a partial record
+        count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=self.dtype)  # memmap cannot map zero bytes
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """(T,) frame timestamps (memory-mapped)."""
+        return self.records["timestamp"]
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """(T, 33, 4) landmark values (memory-mapped, NaN where no pose was found)."""
+        return self.records["landmarks"]
+
+    @property
+    def world_landmarks(self):
+        """(T, 33, 4) world landmark values (memory-mapped), or None if the recording has none."""
+        if not self.has_world_landmarks:
+            return None
+        return self.records["world_landmarks"]
+
+    def __getitem__(self, index):
+        """
+        Returns:
+            tuple: (timestamp, landmarks, world_landmarks) where landmarks is a float32 (33, 4)
+            array or None, and world_landmarks likewise (None when not recorded).
+        """
+        record = self.records[index]
+        timestamp = float(record["timestamp"])
+        landmarks = record["landmarks"]
+        if np.isnan(landmarks[0, 0]):
+            return timestamp, None, None
+        world_landmarks = None
+        if self.has_world_landmarks and not np.isnan(record["world_landmarks"][0, 0]):
+            world_landmarks = record["world_landmarks"].astype(np.float32)
+        return timestamp, landmarks.astype(np.float32), world_landmarks
+
+    def __iter__(self):
+        """Yields (timestamp, landmarks, world_landmarks) frame by frame, reading lazily from the memory map."""
+        for index in range(len(self.records)):
+            yield self[index]
+
+    def joint_angles(self, angle_calc, chunk_size: int = 8192) -> np.ndarray:
+        """
+        Angles of every recorded frame in one batch pass (see AngleCalculator.compute_batch).
+
+        Returns:
+            np.ndarray: (T, J) angles, columns named by angle_calc.names (NaN where no pose was found).
+        """
+        return angle_calc.compute_batch(self.landmarks, self.world_landmarks, chunk_size=chunk_size)
+
+    def count_reps(self, angle_calc, workout_type: str, min_confidence: float = 0.5):
+        """
+        Counts the reps of the whole recording in numpy passes, without a
+        WorkoutDetector (see trackers/rep_counter.py). Same count as replay()
+        without an angle filter.
+
+        Returns:
+            RepCount: The count and the frame indices where each rep started and ended.
+        """
+        from trackers.rep_counter import count_reps
+
+        angles, confidence = angle_calc.essential_batch(self.landmarks, self.world_landmarks)
+        return count_reps(angles, workout_type, angle_calc.essential_keys, confidence, min_confidence)
+
+    def replay(self, angle_calc, detector, angle_filter=None):
+        """
+        Feeds every recorded frame into an AngleCalculator and a WorkoutDetector.
+        The angles of the whole recording are computed up front in one batch pass;
+        only the detector runs frame by frame.
+
+        Args:
+            angle_calc (AngleCalculator): Computes the angles of each frame.
+            detector (WorkoutDetector): Receives the angles (its state is updated in place).
+            angle_filter (AngleFilterBank, optional): Smooths the angles, driven by the recorded timestamps.
+
+        Returns:
+            WorkoutDetector: The same detector, after the whole recording.
+        """
+        angles, confidence = angle_calc.essential_batch(self.landmarks, self.world_landmarks)
+        has_pose = ~np.isnan(angles).any(axis=1)
+        keys = angle_calc.essential_keys
+        timestamps = self.timestamps[has_pose].tolist()
+        for row, frame_confidence, timestamp in zip(angles[has_pose].tolist(), confidence[has_pose].tolist(),
+                                                     timestamps):
+            frame_angles = dict(zip(keys, row))
+            if angle_filter is not None and frame_confidence >= detector.min_confidence:
+                frame_angles = angle_filter.filter_dict(frame_angles, timestamp)
+            detector.detectReps(frame_angles, frame_confidence, timestamp)
+            detector.detectPosture(frame_angles, frame_confidence)
+        return detector
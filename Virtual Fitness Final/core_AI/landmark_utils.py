@@ -0,0 +1,52 @@
+"""
+Landmark Utilities
+Conversions between MediaPipe landmark lists and compact NumPy arrays.
+
+Every landmark array in the AI Core module has shape (33, 4) with the columns
+(x, y, z, visibility), using MediaPipe's normalized image coordinates.
+"""
+import numpy as np
+
+NUM_LANDMARKS = 33
+LANDMARK_FIELDS = ("x", "y", "z", "visibility")
+
+
+def landmarks_to_array(landmarks, out: np.ndarray = None) -> np.ndarray:
+    """
+    Copies MediaPipe landmarks into a (33, 4) float32 array.
+
+    Args:
+        landmarks: A NormalizedLandmarkList (results.pose_landmarks) or a list of landmarks.
+        out (np.ndarray, optional): Array to write into instead of allocating a new one.
+
+    Returns:
+        np.ndarray: Array of shape (33, 4) with columns (x, y, z, visibility).
+    """
+    landmark_list = getattr(landmarks, "landmark", landmarks)
+    if out is None:
+        out = np.empty((len(landmark_list), 4), dtype=np.float32)
+    for i, lm in enumerate(landmark_list):
+        out[i, 0] = lm.x
+        out[i, 1] = lm.y
+        out[i, 2] = lm.z
+        out[i, 3] = lm.visibility
+    return out
+
+
+def array_to_landmarks(array: np.ndarray):
+    """
+    Builds a MediaPipe NormalizedLandmarkList from a (33, 4) array, so landmarks
+    from any source can be drawn with mp.solutions.drawing_utils.
+
+    Args:
+        array (np.ndarray): Array of shape (33, 4) with columns (x, y, z, visibility).
+
+    Returns:
+        NormalizedLandmarkList: The landmarks as a MediaPipe message.
+    """
+    from mediapipe.framework.formats import landmark_pb2
+
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility in array.tolist():
+        landmarks.landmark.add(x=x, y=y, z=z, visibility=visibility)
+    return landmarks
@@ -0,0 +1,121 @@
+"""
+LatencyGovernor Module
+Keeps pose inference within a per-frame latency budget by switching the
+MediaPipe model complexity and running inference only every Nth frame.
+"""
+import collections
+
+# Performance levels as (model_complexity, inference_interval), from most to least expensive
+DEFAULT_LEVELS = (
+    (2, 1),
+    (1, 1),
+    (0, 1),
+    (0, 2),
+    (0, 3),
+)
+
+
+class LatencyGovernor:
+    """
+    Chooses a performance level from the rolling mean of measured inference latency.
+
+    The per-frame cost of a level is the mean inference latency divided by its
+    inference interval. The governor steps down (cheaper) as soon as that cost is
+    over the budget, but only steps up when the next level is predicted to fit
+    comfortably under it. After every switch the rolling window is refilled
+    before deciding again, and an upgrade that has to be undone doubles the wait
+    before the next upgrade attempt, so the governor settles instead of thrashing.
+    """
+
+    def __init__(self, target_ms: float = 33.0, levels: tuple = DEFAULT_LEVELS, start_level: int = 1,
+                 window: int = 30, upgrade_ratio: float = 0.6, cooldown_frames: int = 60):
+        """
+        Args:
+            target_ms (float): Latency budget per camera frame in milliseconds (33 ms = 30 fps).
+            levels (tuple): Available (model_complexity, inference_interval) pairs, most expensive first.
+            start_level (int): Index of the level to start with.
+            window (int): Number of inference samples in the rolling mean.
+            upgrade_ratio (float): Step up only if the next level's predicted cost is below target_ms * upgrade_ratio.
+            cooldown_frames (int): Minimum number of frames between an upgrade and the previous switch.
+        """
+        self.target_ms = target_ms
+        self.levels = levels
+        self.level = min(max(0, start_level), len(levels) - 1)
+        self.upgrade_ratio = upgrade_ratio
+        self.cooldown_frames = cooldown_frames
+
+        self.samples = collections.deque(maxlen=window)
+        self.frames_since_change = 0
+        self._upgrade_backoff = 1        # Multiplier of cooldown_frames for the next upgrade
+        self._last_change_was_upgrade = False
+
+    @staticmethod
+    def level_for(model_complexity: int, levels: tuple = DEFAULT_LEVELS) -> int:
+        """Returns the index of the first level that uses the given model complexity."""
+        for index, (complexity, _) in enumerate(levels):
+            if complexity == model_complexity:
+                return index
+        return 0
+
+    @property
+    def model_complexity(self) -> int:
+        return self.levels[self.level][0]
+
+    @property
+    def inference_interval(self) -> int:
+        return self.levels[self.level][1]
+
+    @property
+    def mean_latency_ms(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def tick(self):
+        """Counts a camera frame (whether or not inference ran on it)."""
+        self.frames_since_change += 1
+
+    def record(self, latency_ms: float) -> bool:
+        """
+        Adds an inference latency sample and re-evaluates the level.
+
+        Args:
+            latency_ms (float): Duration of one pose inference in milliseconds.
+
+        Returns:
+            bool: True if the level changed (the caller should apply the new settings).
+        """
+        self.samples.append(latency_ms)
+        if len(self.samples) < self.samples.maxlen:
+            return False
+
+        mean = self.mean_latency_ms
+        cost = mean / self.inference_interval
+
+        if cost > self.target_ms and self.level < len(self.levels) - 1:
+            if self._last_change_was_upgrade and self.frames_since_change < 4 * self.cooldown_frames:
+                # The last upgrade did not hold: wait longer before trying again
+                self._upgrade_backoff = min(self._upgrade_backoff * 2, 32)
+            self._change_level(self.level + 1, upgrade=False)
+            return True
+
+        if self.level > 0 and self.frames_since_change >= self.cooldown_frames * self._upgrade_backoff:
+            next_interval = self.levels[self.level - 1][1]
+            if mean / next_interval < self.target_ms * self.upgrade_ratio:
+                self._change_level(self.level - 1, upgrade=True)
+                return True
+
+        return False
+
+    def _change_level(self, level: int, upgrade: bool):
+        self.level = level
+        self.samples.clear()
+        self.frames_since_change = 0
+        self._last_change_was_upgrade = upgrade
+
+    def describe(self) -> str:
+        """Returns a short human-readable description of the current mode (for the GUI)."""
+        interval = self.inference_interval
+        every = "every frame" if interval == 1 else f"every {interval} frames"
+        text = f"Model {self.model_complexity}, {every}"
+        if self.samples:
+            text += f" ({self.mean_latency_ms:.0f} ms)"
+        return text
@@ -0,0 +1,237 @@
+"""
+FramePipeline Module
+Runs camera capture, pose inference and frame rendering in background workers
+so the Tk main loop only has to display finished results.
+
+Stages are connected by bounded latest-frame-wins queues: when a stage falls
+behind, old frames are dropped instead of piling up, so the display always
+shows the most recent result the pipeline could produce.
+"""
+import collections
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import cv2
+from PIL import Image
+
+
+class LatestFrameQueue:
+    """
+    A small thread-safe queue that never blocks the producer.
+    When the queue is full, put() discards the oldest item to make room.
+    """
+
+    def __init__(self, maxsize: int = 1, on_drop: Optional[Callable] = None):
+        """
+        Args:
+            maxsize (int): Maximum number of items kept (1 = only the latest frame).
+            on_drop (callable, optional): Called with every item discarded without being consumed
+                (replaced by a newer one, or cleared), e.g. to release its frame buffer.
+        """
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.dropped = 0  # Number of items discarded because a consumer was too slow
+        self._items = collections.deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+
+    def put(self, item):
+        """Adds an item, replacing the oldest one if the queue is full."""
+        discarded = None
+        with self._condition:
+            if len(self._items) == self.maxsize:
+                self.dropped += 1
+                discarded = self._items[0]
+            self._items.append(item)
+            self._condition.notify()
+        if discarded is not None and self.on_drop is not None:
+            self.on_drop(discarded)
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        Waits for the next item.
+
+        Returns:
+            The oldest queued item, or None if nothing arrived before the timeout.
+        """
+        with self._condition:
+            if not self._items:
+                self._condition.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def get_nowait(self):
+        """Returns the oldest queued item without waiting, or None if empty."""
+        with self._condition:
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def clear(self):
+        """Drops every queued item."""
+        with self._condition:
+            discarded = list(self._items)
+            self._items.clear()
+        if self.on_drop is not None:
+            for item in discarded:
+                self.on_drop(item)
+
+
+@dataclass
+class PipelineResult:
+    """A finished frame, ready to be shown by the GUI."""
+    frame_id: int
+    capture_ns: int           # time.perf_counter_ns() when the frame read started (FrameProfiler clock)
+    image: Any                # PIL.Image in RGB with the skeleton drawn on it
+    landmarks: Any = None     # MediaPipe pose landmarks, or None
+    angles: Optional[dict] = None  # AngleCalculator output, or None
+    confidence: float = 1.0   # Visibility of the joints the angles were measured on
+
+
+class FramePipeline:
+    """
+    Runs CameraProcessor in three worker threads: capture, inference and render.
+
+    A captured frame lives in one of the camera's reused buffers, which inference
+    reads and render draws on in place; its buffer slot is leased from capture
+    until render has converted it (or a queue drops it), so the capture thread
+    never overwrites a frame still in use, however far the later stages fall behind.
+
+    Usage:
+        pipeline = FramePipeline(camera, angle_calc)
+        pipeline.start()
+        ...
+        result = pipeline.get_latest()  # called from the Tk loop, never blocks
+        ...
+        pipeline.stop()
+    """
+
+    def __init__(self, camera, angle_calc=None, queue_size: int = 1):
+        """
+        Args:
+            camera (CameraProcessor): Source of frames and the pose model.
+            angle_calc (AngleCalculator, optional): If given, angles are computed in the inference worker.
+            queue_size (int): Capacity of each queue between stages.
+        """
+        self.camera = camera
+        self.angle_calc = angle_calc
+
+        # Capture and inference items end with the frame's buffer slot (see _release)
+        self.capture_queue = LatestFrameQueue(queue_size, on_drop=self._release)
+        self.inference_queue = LatestFrameQueue(queue_size, on_drop=self._release)
+        self.display_queue = LatestFrameQueue(queue_size)
+
+        self._stop_event = threading.Event()
+        self._run_event = threading.Event()  # Cleared while paused
+        self._threads = []
+        self._frame_counter = 0
+
+    # Lifecycle ====================================================================================
+    def start(self):
+        """Starts the worker threads (no-op if already running)."""
+        if self._threads:
+            return
+        self._stop_event.clear()
+        self._run_event.set()
+        for name, target in (("capture", self._capture_worker),
+                             ("inference", self._inference_worker),
+                             ("render", self._render_worker)):
+            thread = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 1.0):
+        """Stops the workers and waits for them to exit."""
+        self._stop_event.set()
+        self._run_event.set()  # Wake paused workers so they can see the stop flag
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        for queue in (self.capture_queue, self.inference_queue, self.display_queue):
+            queue.clear()
+
+    def pause(self):
+        """Stops reading the camera until resume() is called (e.g. when leaving the Workout page)."""
+        if self._run_event.is_set():
+            self._run_event.clear()
+            for queue in (self.capture_queue, self.inference_queue, self.display_queue):
+                queue.clear()
+
+    def resume(self):
+        """Resumes capture after pause()."""
+        self._run_event.set()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._threads) and not self._stop_event.is_set()
+
+    def get_latest(self) -> Optional[PipelineResult]:
+        """Returns the newest finished frame, or None if nothing new is ready."""
+        return self.display_queue.get_nowait()
+
+    # Workers ====================================================================================
+    def _release(self, item):
+        """Returns the buffer slot of a capture or inference item to the camera's pool."""
+        self.camera.buffers.release(item[-1])
+
+    def _capture_worker(self):
+        while not self._stop_event.is_set():
+            if not self._run_event.wait(timeout=0.1):
+                continue
+            # Stamped before the (blocking) read so "end_to_end" includes it, like the synchronous path
+            capture_ns = time.perf_counter_ns()
+            try:
+                frame = self.camera.read_frame()
+            except Exception as e:
+                print(f"Error in capture worker: {e}")
+                frame = None
+
+            if frame is None:
+                # Camera hiccup; back off briefly instead of spinning
+                time.sleep(0.01)
+                continue
+
+            self._frame_counter += 1
+            self.capture_queue.put((self._frame_counter, capture_ns, frame, self.camera.buffers.lease()))
+
+    def _inference_worker(self):
+        while not self._stop_event.is_set():
+            item = self.capture_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, capture_ns, frame, slot = item
+            angles = None
+            confidence = 1.0
+            try:
+                image, landmarks = self.camera.process_frame(frame)
+                if landmarks and self.angle_calc is not None:
+                    with self.camera.profiler.stage("angles"):
+                        angles, confidence = self.angle_calc.essential_angles(self.camera.landmark_array,
+                                                                              self.camera.world_landmark_array)
+            except Exception as e:
+                print(f"Error in inference worker: {e}")
+                self._release(item)
+                continue
+            self.inference_queue.put((frame_id, capture_ns, image, landmarks, angles, confidence, slot))
+
+    def _render_worker(self):
+        while not self._stop_event.is_set():
+            item = self.inference_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, capture_ns, image, landmarks, angles, confidence, slot = item
+            try:
+                if landmarks:
+                    with self.camera.profiler.stage("draw"):
+                        self.camera.draw_landmarks(image, landmarks)
+                if not self.camera.rgb_output:
+                    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                img = Image.fromarray(image)  # A copy (3-byte pixels are never shared with the array)
+            except Exception as e:
+                print(f"Error in render worker: {e}")
+                continue
+            finally:
+                self._release(item)
+            self.display_queue.put(PipelineResult(frame_id, capture_ns, img, landmarks, angles, confidence))
@@ -0,0 +1,207 @@
+"""
+Pose Backends Module
+Interchangeable pose-estimation models behind one small interface.
+
+Every backend takes an RGB image and returns a normalized (33, 4) landmark
+array (x, y, z, visibility) in MediaPipe's landmark order and coordinate
+convention, or None when no person is found. Backends that also estimate
+metric 3D "world" landmarks (meters, origin between the hips) leave them in
+last_world_landmarks, in the same (33, 4) layout. MediaPipe Pose is the default;
+other CPU backends can be added by subclassing PoseBackend and registering
+them in BACKENDS.
+"""
+import numpy as np
+
+from core_AI.landmark_utils import NUM_LANDMARKS, landmarks_to_array
+
+
+class PoseBackend:
+    """
+    Base class of all pose-estimation backends.
+    """
+    name = "base"
+    supports_model_complexity = False
+    # (33, 4) world landmarks of the last process() call, or None if the backend has none
+    last_world_landmarks = None
+
+    def process(self, rgb_image: np.ndarray):
+        """
+        Detects the pose in one frame.
+
+        Args:
+            rgb_image (np.ndarray): A contiguous RGB image (uint8).
+
+        Returns:
+            np.ndarray: (33, 4) landmark array in normalized image coordinates, or None.
+        """
+        raise NotImplementedError
+
+    def set_model_complexity(self, model_complexity: int):
+        """Switches model size if the backend supports it (no-op otherwise)."""
+
+    @property
+    def model_complexity(self):
+        return None
+
+    def close(self):
+        """Releases the model resources."""
+
+
+class MediaPipeBackend(PoseBackend):
+    """
+    MediaPipe Pose (BlazePose). Pose models are cached per model_complexity so
+    switching back and forth (see LatencyGovernor) does not reload them.
+    """
+    name = "mediapipe"
+    supports_model_complexity = True
+
+    def __init__(self, model_complexity: int = 1, smooth_landmarks: bool = True):
+        """
+        Args:
+            model_complexity (int): 0 = lite, 1 = full, 2 = heavy.
+            smooth_landmarks (bool): Let MediaPipe filter landmarks across frames.
+        """
+        import mediapipe as mp
+
+        self.mp_pose = mp.solutions.pose
+        self.smooth_landmarks = smooth_landmarks
+        self._pose_models = {}
+        self._model_complexity = None
+        self.pose = None
+        self.set_model_complexity(model_complexity)
+
+    def _create_pose(self, model_complexity):
+        # Initialize the MediaPipe Pose model with specific settings for performance
+        return self.mp_pose.Pose(
+            # static_image_mode=False: Optimizes for video processing (faster)
+            static_image_mode=False,
+            # model_complexity: 0 = lite, 1 = full, 2 = heavy (1 is the default real-time trade-off)
+            model_complexity=model_complexity,
+            # smooth_landmarks=True: Reduces jitter in landmark detection
+            smooth_landmarks=self.smooth_landmarks,
+            # enable_segmentation=False: We don't need background segmentation, so we disable it
+            enable_segmentation=False
+        )
+
+    def set_model_complexity(self, model_complexity: int):
+        if model_complexity == self._model_complexity:
+            return
+        if model_complexity not in self._pose_models:
+            self._pose_models[model_complexity] = self._create_pose(model_complexity)
+        self.pose = self._pose_models[model_complexity]
+        self._model_complexity = model_complexity
+
+    @property
+    def model_complexity(self):
+        return self._model_complexity
+
+    def process(self, rgb_image: np.ndarray):
+        # Read-only input lets MediaPipe use the array without copying it
+        rgb_image.flags.writeable = False
+        results = self.pose.process(rgb_image)
+        rgb_image.flags.writeable = True
+
+        self.last_world_landmarks = None
+        if not results.pose_landmarks:
+            return None
+        if results.pose_world_landmarks:
+            self.last_world_landmarks = landmarks_to_array(results.pose_world_landmarks)
+        return landmarks_to_array(results.pose_landmarks)
+
+    def close(self):
+        for pose in self._pose_models.values():
+            pose.close()
+        self._pose_models = {}
+
+
+class OnnxPoseBackend(PoseBackend):
+    """
+    Runs a BlazePose-style landmark model exported to ONNX with ONNX Runtime (CPU).
+
+    The model is expected to take one square RGB image (NHWC or NCHW, values in
+    [0, 1]) and return at least 33 x 5 values (x, y, z in input pixels, then
+    visibility and presence logits), which is the layout of MediaPipe's
+    pose_landmark_{lite,full,heavy} models. There is no person detector, so the
+    model sees the whole input; combine with ROI tracking for best results.
+    If the model also has MediaPipe's 39 x 3 world landmark output, it is
+    exposed as last_world_landmarks.
+    """
+    name = "onnx"
+
+    def __init__(self, model_path: str, presence_threshold: float = 0.5, providers=None):
+        """
+        Args:
+            model_path (str): Path of the .onnx landmark model.
+            presence_threshold (float): Below this mean presence score no pose is reported.
+            providers (list, optional): ONNX Runtime execution providers (defaults to CPU).
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The ONNX backend requires onnxruntime (pip install onnxruntime).") from e
+        import cv2
+
+        self._cv2 = cv2
+        self.session = ort.InferenceSession(model_path, providers=providers or ["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        shape = model_input.shape
+        # NCHW models have the channel axis second; NHWC last
+        self.channels_first = shape[1] == 3
+        size = shape[2] if self.channels_first else shape[1]
+        self.input_size = size if isinstance(size, int) else 256
+        self.presence_threshold = presence_threshold
+
+        # Optional world landmark output: 39 x 3 values (33 body landmarks + 6 auxiliary points)
+        self._world_output = None
+        for index, output in enumerate(self.session.get_outputs()):
+            if output.shape and output.shape[-1] == 39 * 3:
+                self._world_output = index
+
+    def process(self, rgb_image: np.ndarray):
+        size = self.input_size
+        tensor = self._cv2.resize(rgb_image, (size, size), interpolation=self._cv2.INTER_LINEAR)
+        tensor = tensor.astype(np.float32) * (1.0 / 255.0)
+        if self.channels_first:
+            tensor = tensor.transpose(2, 0, 1)
+        outputs = self.session.run(None, {self.input_name: tensor[None]})
+
+        raw = np.asarray(outputs[0], dtype=np.float32).reshape(-1)[:NUM_LANDMARKS * 5].reshape(NUM_LANDMARKS, 5)
+        presence = 1.0 / (1.0 + np.exp(-raw[:, 4]))
+        self.last_world_landmarks = None
+        if presence.mean() < self.presence_threshold:
+            return None
+
+        landmarks = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+        landmarks[:, :3] = raw[:, :3] / size
+        landmarks[:, 3] = 1.0 / (1.0 + np.exp(-raw[:, 3]))
+
+        if self._world_output is not None:
+            world = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+            world[:, :3] = np.asarray(outputs[self._world_output], dtype=np.float32).reshape(-1, 3)[:NUM_LANDMARKS]
+            world[:, 3] = landmarks[:, 3]
+            self.last_world_landmarks = world
+        return landmarks
+
+
+# Registry used by CameraProcessor(backend=...) and the benchmark command
+BACKENDS = {
+    MediaPipeBackend.name: MediaPipeBackend,
+    OnnxPoseBackend.name: OnnxPoseBackend,
+}
+
+
+def create_backend(name: str = "mediapipe", **options) -> PoseBackend:
+    """
+    Builds a backend by name.
+
+    Args:
+        name (str): A key of BACKENDS (e.g. "mediapipe", "onnx").
+        **options: Keyword arguments for the backend's constructor.
+
+    Returns:
+        PoseBackend: The initialized backend.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown pose backend: {name} (available: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**options)
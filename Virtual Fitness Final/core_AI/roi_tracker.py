@@ -0,0 +1,138 @@
+"""
+RoiTracker Module
+Shrinks the image handed to the pose model: crops to a padded box around the
+athlete found in the previous frame and downsizes the crop to a working
+resolution. Landmarks found in the crop are mapped back to full-frame
+coordinates so AngleCalculator and drawing never see the difference.
+"""
+import cv2
+import numpy as np
+
+
+class RoiTracker:
+    """
+    Tracks a region of interest (ROI) around the detected person between frames.
+
+    The ROI is only moved when the person gets close to its border (or it becomes
+    much larger than needed), so the pose model sees a stable crop instead of one
+    that shifts a little every frame. When tracking is lost the next frame is
+    processed at full size again.
+    """
+
+    def __init__(self, working_size: int = 320, padding: float = 0.25, track: bool = True,
+                 min_visibility: float = 0.5, min_visible_landmarks: int = 8):
+        """
+        Args:
+            working_size (int): Longest side (pixels) of the image given to the pose model.
+            padding (float): Margin added around the landmark bounding box, relative to its longest side.
+            track (bool): Crop around the previous landmarks; if False only downscaling is applied.
+            min_visibility (float): Landmarks below this visibility are ignored for the bounding box.
+            min_visible_landmarks (int): Fewer visible landmarks than this counts as tracking lost.
+        """
+        self.working_size = working_size
+        self.padding = padding
+        self.track = track
+        self.min_visibility = min_visibility
+        self.min_visible_landmarks = min_visible_landmarks
+
+        self.roi = None  # (x0, y0, x1, y1) in full-frame pixels, or None for the full frame
+
+    def prepare(self, image: np.ndarray) -> tuple:
+        """
+        Builds the pose model input for a frame.
+
+        Args:
+            image (np.ndarray): The full frame.
+
+        Returns:
+            tuple: (input_image, roi).
+                   input_image (np.ndarray): Cropped and downsized contiguous image.
+                   roi (tuple): The (x0, y0, x1, y1) box used, needed by to_full_frame().
+        """
+        height, width = image.shape[:2]
+        roi = self.roi if self.roi is not None else (0, 0, width, height)
+        x0, y0, x1, y1 = roi
+        crop = image[y0:y1, x0:x1]
+
+        crop_width, crop_height = x1 - x0, y1 - y0
+        scale = self.working_size / max(crop_width, crop_height) if self.working_size else 1.0
+        if scale < 1.0:
+            size = (max(1, round(crop_width * scale)), max(1, round(crop_height * scale)))
+            crop = cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+        else:
+            # The pose model needs a contiguous array; a crop is only a view
+            crop = np.ascontiguousarray(crop)
+        return crop, roi
+
+    @staticmethod
+    def to_full_frame(landmarks: np.ndarray, roi: tuple, frame_shape: tuple) -> np.ndarray:
+        """
+        Maps landmarks normalized to the ROI back to full-frame normalized coordinates (in place).
+
+        Args:
+            landmarks (np.ndarray): (33, 4) landmark array relative to the ROI.
+            roi (tuple): The (x0, y0, x1, y1) box returned by prepare().
+            frame_shape (tuple): Shape of the full frame.
+
+        Returns:
+            np.ndarray: The same array, now in full-frame coordinates.
+        """
+        height, width = frame_shape[:2]
+        x0, y0, x1, y1 = roi
+        scale_x = (x1 - x0) / width
+        scale_y = (y1 - y0) / height
+        landmarks[:, 0] = landmarks[:, 0] * scale_x + x0 / width
+        landmarks[:, 1] = landmarks[:, 1] * scale_y + y0 / height
+        # MediaPipe scales z like x
+        landmarks[:, 2] *= scale_x
+        return landmarks
+
+    def update(self, landmarks: np.ndarray, frame_shape: tuple):
+        """
+        Updates the ROI from full-frame landmarks of the current frame.
+
+        Args:
+            landmarks (np.ndarray): (33, 4) landmark array in full-frame coordinates, or None if no pose was found.
+            frame_shape (tuple): Shape of the full frame.
+        """
+        if not self.track:
+            return
+        if landmarks is None:
+            self.reset()
+            return
+
+        visible = landmarks[:, 3] >= self.min_visibility
+        if np.count_nonzero(visible) < self.min_visible_landmarks:
+            self.reset()
+            return
+
+        height, width = frame_shape[:2]
+        xs = landmarks[visible, 0] * width
+        ys = landmarks[visible, 1] * height
+        box_x0, box_x1 = xs.min(), xs.max()
+        box_y0, box_y1 = ys.min(), ys.max()
+
+        # Keep the current ROI while the person is comfortably inside it and it is not oversized
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            inside = box_x0 >= x0 and box_y0 >= y0 and box_x1 <= x1 and box_y1 <= y1
+            roi_area = (x1 - x0) * (y1 - y0)
+            box_area = max(1.0, (box_x1 - box_x0) * (box_y1 - box_y0))
+            if inside and roi_area <= 4.0 * box_area * (1 + 2 * self.padding) ** 2:
+                return
+
+        margin = self.padding * max(box_x1 - box_x0, box_y1 - box_y0)
+        x0 = max(0, int(box_x0 - margin))
+        y0 = max(0, int(box_y0 - margin))
+        x1 = min(width, int(np.ceil(box_x1 + margin)))
+        y1 = min(height, int(np.ceil(box_y1 + margin)))
+
+        if x1 - x0 < 2 or y1 - y0 < 2 or (x1 - x0) * (y1 - y0) >= 0.9 * width * height:
+            # Degenerate box, or the person fills the frame anyway
+            self.roi = None
+        else:
+            self.roi = (x0, y0, x1, y1)
+
+    def reset(self):
+        """Forgets the ROI so the next frame is processed at full size."""
+        self.roi = None
@@ -1,11 +1,15 @@
 import csv
 import os
 import io
+import json
+import sys
 
 class WorkoutDataManager:
     def __init__(self, storage_file="storage/data.csv"):
         self.storage_file = storage_file
-        self.fieldnames = ["id", "workoutType", "reps", "duration", "sessionEnded", "postureScores", "timestamp"]
+        # repRecords: JSON list of per-rep records (see trackers/rep_records.py)
+        self.fieldnames = ["id", "workoutType", "reps", "duration", "sessionEnded", "postureScores", "timestamp",
+                           "repRecords"]
         self.ensure_storage_exists()
 
     def ensure_storage_exists(self):
@@ -18,6 +22,29 @@ class WorkoutDataManager:
             with open(self.storage_file, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.DictWriter(f, fieldnames=self.fieldnames)
                 writer.writeheader()
+        else:
+            self.upgrade_header()
+
+    def upgrade_header(self):
+        """Rewrites a file created by an older version with the current columns (new ones left empty)."""
+        try:
+            with open(self.storage_file, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                header = reader.fieldnames or []
+                if all(name in header for name in self.fieldnames):
+                    return
+                rows = list(reader)
+        except Exception as e:
+            print(f"Could not check the storage header: {e}", file=sys.stderr)
+            return
+
+        with open(self.storage_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        # stderr: headless.py keeps stdout for its JSON lines
+        print(f"Storage upgraded with columns: {', '.join(n for n in self.fieldnames if n not in header)}",
+              file=sys.stderr)
 
     def load_sessions(self):
         """Loads all workout sessions from the CSV file."""
@@ -44,7 +71,9 @@ class WorkoutDataManager:
         
         # Handle list serialization for postureScores if needed
         if isinstance(row.get("postureScores"), list):
-             row["postureScores"] = ";".join(map(str, row["postureScores"]))
+             row["postureScores"] = ";".join("" if s is None else str(s) for s in row["postureScores"])
+        if isinstance(row.get("repRecords"), list):
+            row["repRecords"] = json.dumps(row["repRecords"], separators=(",", ":"))
 
         with open(self.storage_file, 'a', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=self.fieldnames)
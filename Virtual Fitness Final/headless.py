@@ -0,0 +1,234 @@
+"""
+Headless Entry Point
+Runs the full pipeline (camera or file -> pose -> angles -> WorkoutDetector ->
+WorkoutDataManager) without Tk, writing one JSON object per line to stdout.
+Meant for display-less kiosks and CI runners.
+
+Usage:
+    python headless.py --exercise squat                    # webcam 0
+    python headless.py --video clip.mp4 --exercise pushup  # recorded video
+    python headless.py --recording session.vflm            # landmark recording
+
+Events written to stdout:
+    {"event": "start", ...}
+    {"event": "capture", "width": 1280, "height": 720, "fourcc": "MJPG", "measuredFps": 29.9, ...}
+    {"event": "exercise", "exercise": "squat", "reps": 1, "time": 2.4}   # --exercise auto only
+    {"event": "frame", "frame": 12, "time": 0.4, "reps": 1, "postureScore": 92, "feedback": "...", "angles": {...}}
+    {"event": "rep", "reps": 2, "time": 5.1, "eccentric": 1.4, "concentric": 0.9, "postureMean": 88.0, "rom": {...}, ...}
+    {"event": "session_saved", "reps": 15, "duration": 48.0}
+    {"event": "end", "frames": 1450, "fps": 29.7, ...}
+"""
+import argparse
+import contextlib
+import json
+import signal
+import sys
+import time
+from datetime import datetime
+
+from core_AI.angle_filters import create_angle_filter
+from core_AI.angle_utils import AngleCalculator
+from core_AI.instrumentation import FrameProfiler
+from data_manager import WorkoutDataManager
+from trackers.exercise_classifier import ExerciseClassifier, switch_recognized_exercise
+from trackers.exercise_definitions import ANGLE_KEYS, AUTO_EXERCISE
+from trackers.rep_templates import DEFAULT_TEMPLATES_PATH, RepTemplateLibrary
+from trackers.workout_detector import WorkoutDetector
+
+
+def emit(event: str, **fields):
+    """Writes one JSON-lines event to stdout."""
+    sys.stdout.write(json.dumps({"event": event, **fields}) + "\n")
+    sys.stdout.flush()
+
+
+def iter_frames(args, profiler=None):
+    """
+    Yields (timestamp, landmarks, world_landmarks) for every frame of the selected source.
+    landmarks is a (33, 4) landmark array, or None when no pose was found; world_landmarks
+    is None when the source has none (e.g. recordings made without world landmarks).
+    """
+    if args.recording:
+        from core_AI.landmark_recorder import LandmarkRecording
+
+        yield from LandmarkRecording(args.recording)
+        return
+
+    # OpenCV is only needed for live cameras and videos; --recording runs without it
+    import cv2
+
+    from core_AI.ai_processor import CameraProcessor
+    from core_AI.capture_profile import CaptureProfile
+
+    camera = CameraProcessor(camera_index=args.camera, video_path=args.video,
+                             flip=not args.no_flip and args.video is None,
+                             rgb_output=True, roi_tracking=args.roi,
+                             latency_budget_ms=args.latency_budget, profiler=profiler,
+                             capture_profile=CaptureProfile.parse(args.capture) if args.capture else None)
+    report = camera.capture_report
+    if report:
+        emit("capture", width=report.width, height=report.height, fps=report.fps, fourcc=report.fourcc,
+             bufferSize=report.buffer_size, measuredFps=round(report.measured_fps, 1),
+             readMs=round(report.read_ms, 2))
+    try:
+        while True:
+            image = camera.read_frame()
+            if image is None:
+                if args.video is not None:
+                    return  # End of file
+                time.sleep(0.01)  # Camera hiccup
+                continue
+            # Recorded videos are timed by their own frame clock, live cameras by the wall clock
+            if args.video is not None:
+                timestamp = camera.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            else:
+                timestamp = time.time()
+            _, landmarks = camera.process_frame(image)
+            if landmarks:
+                yield timestamp, camera.landmark_array, camera.world_landmark_array
+            else:
+                yield timestamp, None, None
+    finally:
+        camera.release_camera()
+
+
+def save_session(data_manager, detector, duration):
+    """Saves the current set the same way the GUI's Save button does."""
+    session = {
+        "workoutType": detector.workout_type,
+        "reps": detector.rep_count,
+        "duration": round(duration, 1),
+        "sessionEnded": True,
+        "postureScores": detector.rep_records.posture_scores(),
+        "repRecords": detector.rep_records.to_list(),
+        "timestamp": datetime.now().isoformat(),
+    }
+    # WorkoutDataManager prints a confirmation; keep stdout pure JSON lines
+    with contextlib.redirect_stdout(sys.stderr):
+        data_manager.save_session(session)
+    emit("session_saved", reps=detector.rep_count, duration=session["duration"])
+
+
+def run(args):
+    angles_3d = True if args.angles_3d == "all" else tuple(filter(None, args.angles_3d.split(",")))
+    angle_calc = AngleCalculator(angles_3d=angles_3d, side=args.side)
+    angle_filter = create_angle_filter(args.filter)
+    auto = args.exercise == AUTO_EXERCISE
+    classifier = ExerciseClassifier() if auto else None
+    detector = WorkoutDetector("general" if auto else args.exercise,
+                               rep_templates=RepTemplateLibrary.load(args.templates) if args.templates else None)
+    data_manager = None
+    if not args.no_save:
+        # WorkoutDataManager may print (e.g. when it upgrades an old file); keep stdout pure JSON lines
+        with contextlib.redirect_stdout(sys.stderr):
+            data_manager = WorkoutDataManager(args.storage)
+    profiler = FrameProfiler(enabled=bool(args.profile))
+
+    # Stop cleanly on SIGTERM (service managers) as well as Ctrl+C
+    stop = {"requested": False}
+    signal.signal(signal.SIGTERM, lambda *_: stop.update(requested=True))
+
+    emit("start", source=args.recording or args.video or f"camera:{args.camera}",
+         exercise=args.exercise if auto else detector.workout_type, targetReps=args.target_reps)
+
+    frames = 0
+    frames_with_pose = 0
+    first_time = None
+    set_start = None
+    wall_start = time.perf_counter()
+    try:
+        for timestamp, landmarks, world_landmarks in iter_frames(args, profiler):
+            if stop["requested"] or (args.max_frames and frames >= args.max_frames):
+                break
+            frames += 1
+            if first_time is None:
+                first_time = set_start = timestamp
+            elapsed = timestamp - first_time
+
+            if landmarks is None:
+                continue
+            frames_with_pose += 1
+
+            with profiler.stage("angles"):
+                angles, confidence = angle_calc.essential_angles(landmarks, world_landmarks)
+                # Smooth over time, using only the frames the detector will trust
+                if angle_filter is not None and confidence >= detector.min_confidence:
+                    angles = angle_filter.filter_dict(angles, timestamp)
+            if classifier is not None and confidence >= detector.min_confidence:
+                recognized = classifier.update([angles.get(key, 180) for key in ANGLE_KEYS], timestamp)
+                if recognized and recognized != detector.workout_type:
+                    if detector.rep_count > 0:
+                        # The set done so far (another exercise) ends here, like a reached target
+                        if data_manager:
+                            save_session(data_manager, detector, timestamp - set_start)
+                        set_start = timestamp
+                    switch_recognized_exercise(detector, classifier, recognized)
+                    emit("exercise", exercise=recognized, reps=detector.rep_count, time=round(elapsed, 3))
+            previous_reps = detector.rep_count
+            previous_records = detector.rep_records.count
+            with profiler.stage("detect"):
+                reps = detector.detectReps(angles, confidence, timestamp)
+                score, feedback = detector.detectPosture(angles, confidence)
+
+            if args.every and frames % args.every == 0:
+                emit("frame", frame=frames, time=round(elapsed, 3), reps=reps, postureScore=score,
+                     feedback=feedback, confidence=round(confidence, 2),
+                     angles={name: round(value, 1) for name, value in angles.items()})
+            if reps > previous_reps:
+                # Same fields as the rep's stored record (none when the rep began before a reset)
+                records = detector.rep_records
+                record = records.record_dict(records.count - 1) if records.count > previous_records else {}
+                emit("rep", reps=reps, time=round(elapsed, 3), **record)
+
+            # Same session rule as the GUI: save and start over once the target is reached
+            if reps >= args.target_reps:
+                if data_manager:
+                    save_session(data_manager, detector, timestamp - set_start)
+                detector.reset()
+                if angle_filter is not None:
+                    angle_filter.reset()
+                set_start = timestamp
+    except KeyboardInterrupt:
+        pass
+
+    if data_manager and detector.rep_count > 0 and first_time is not None:
+        save_session(data_manager, detector, timestamp - set_start)
+
+    wall = time.perf_counter() - wall_start
+    if args.profile:
+        profiler.dump(args.profile)
+    emit("end", frames=frames, framesWithPose=frames_with_pose, reps=detector.rep_count,
+         elapsed=round(wall, 3), fps=round(frames / wall, 1) if wall > 0 else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the virtual trainer without a display (JSON lines on stdout).")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--camera", type=int, default=0, help="Webcam index (default 0)")
+    source.add_argument("--video", help="Recorded video file to analyze instead of a webcam")
+    source.add_argument("--recording", help="Landmark recording (.vflm) to replay instead of running pose")
+    parser.add_argument("--exercise", default="general", help="Exercise ID from trackers/exercises/ (pushup, squat, bicep_curl, general, ...) or 'auto' to recognize it")
+    parser.add_argument("--target-reps", type=int, default=15, help="Reps per saved session (default 15)")
+    parser.add_argument("--every", type=int, default=1, help="Emit a frame event every N frames (0 = none)")
+    parser.add_argument("--max-frames", type=int, default=0, help="Stop after N frames (0 = until the source ends)")
+    parser.add_argument("--storage", default="storage/data.csv", help="Session CSV used by WorkoutDataManager")
+    parser.add_argument("--no-save", action="store_true", help="Do not write sessions to storage")
+    parser.add_argument("--no-flip", action="store_true", help="Do not mirror webcam frames")
+    parser.add_argument("--roi", action="store_true", help="Enable ROI tracking of the pose model input")
+    parser.add_argument("--latency-budget", type=float, default=None, help="Per-frame latency budget in ms (enables the governor)")
+    parser.add_argument("--capture", default="1280x720@30:MJPG",
+                        help="Webcam mode WIDTHxHEIGHT[@FPS][:FOURCC] (default 1280x720@30:MJPG, '' = driver default)")
+    parser.add_argument("--side", default="best", choices=("left", "right", "best", "fuse"),
+                        help="Body side the angles are measured on (default: the more visible one)")
+    parser.add_argument("--filter", default="one_euro", choices=("none", "one_euro", "low_pass"),
+                        help="Temporal filter applied to the angles before rep detection (default one_euro)")
+    parser.add_argument("--angles-3d", default="",
+                        help="Joint angles to compute in 3D from world landmarks: 'all' or names like LEFT_KNEE_ANGLE,LEFT_HIP_ANGLE")
+    parser.add_argument("--templates", default=DEFAULT_TEMPLATES_PATH,
+                        help="Reference reps (.npz) each rep's shape is scored against ('' = no shape scores)")
+    parser.add_argument("--profile", help="Write per-stage latency histograms (JSON) to this file on exit")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,45 @@
 import os
+import threading
 import time
 from datetime import datetime
 
+from core_AI.instrumentation import FrameProfiler, StartupTimeline
+
+# Started before the GUI imports so the timeline covers them
+startup = StartupTimeline()
+
 import customtkinter as ctk
-import cv2
-from PIL import Image, ImageTk
+from PIL import Image
 
-from core_AI.ai_processor import CameraProcessor
-from core_AI.angle_utils import AngleCalculator
 from data_manager import WorkoutDataManager
 from GUI.Gui import VirtualTrainerApp
-from trackers.workout_detector import WorkoutDetector
 
+# The AI stack (OpenCV, MediaPipe, NumPy and the trackers built on it) is only imported when the
+# Workout page is first opened, in a background thread (see warm_up_ai), so the window shows up right away
+startup.mark("GUI modules imported")
+
+# Set to False to run capture and pose inference synchronously inside the Tk loop
+USE_PIPELINE = True
+# Crop the pose model input around the athlete and downsize it (see core_AI/roi_tracker.py)
+ROI_TRACKING = True
+# Per-frame latency budget (ms); the governor adapts model complexity and frame skipping to it
+LATENCY_BUDGET_MS = 33
+# Save the landmarks of every session to storage/recordings (see core_AI/landmark_recorder.py)
+RECORD_LANDMARKS = False
+# Collect per-stage latency histograms (F3 toggles the overlay, dumped to storage/perf on exit)
+PROFILE_FRAMES = True
+# Webcam mode to request: MJPG at 720p/30 with a one-frame driver buffer (no stale frames)
+CAPTURE_SETTINGS = dict(width=1280, height=720, fps=30, fourcc="MJPG", buffer_size=1)
+# Joint angles computed in 3D from world landmarks (camera-angle independent), e.g. ("LEFT_KNEE_ANGLE",);
+# True = all joints, () = image-plane angles only (see core_AI/angle_utils.py)
+ANGLES_3D = ()
+# Body side the angles are measured on: "best" follows the more visible side, so users can face
+# either way ("left", "right", "best" or "fuse"); low-visibility frames are ignored by the detector
+ANGLE_SIDE = "best"
+# Temporal filter between the angles and the detector ("one_euro", "low_pass" or "none", see
+# core_AI/angle_filters.py). It replaces MediaPipe's own landmark smoothing, which is only kept
+# on without it.
+ANGLE_FILTER = "one_euro"
 
 # Function to recursively find a widget by its text
 def find_widget_by_text(parent, text_pattern):
@@ -60,16 +88,96 @@ def main():
     
     # Pass it to the App
     app = VirtualTrainerApp(data_manager=data_manager)
+    startup.mark("window created")
     
-    # 2. Initialize AI Components
-    try:
-        camera = CameraProcessor(camera_index=0)
-    except Exception as e:
-        print(f"Error initializing camera: {e}")
-        camera = None
-
-    angle_calc = AngleCalculator()
-    workout_detector = WorkoutDetector()
+    # 2. AI Components: created in the background the first time the Workout page is opened
+    profiler = FrameProfiler(enabled=PROFILE_FRAMES)
+    camera = None
+    pipeline = None
+    recorder = None
+    angle_calc = None
+    angle_filter = None
+    workout_detector = None
+    exercise_classifier = None  # For the "auto" exercise choice
+    # The lock makes "publish the result unless cancelled" and "cancel, take the unattached result" atomic
+    warmup = {"thread": None, "done": False, "cancelled": False, "result": None, "lock": threading.Lock()}
+
+    def warm_up_ai():
+        # Worker thread: imports the AI stack, opens the camera and loads the pose model.
+        # No Tk calls here; update_loop picks up the result on the Tk thread.
+        ai_recorder = None
+        try:
+            from core_AI.ai_processor import CameraProcessor
+            from core_AI.angle_filters import create_angle_filter
+            from core_AI.angle_utils import AngleCalculator
+            from core_AI.capture_profile import CaptureProfile
+            from trackers.exercise_classifier import ExerciseClassifier
+            from trackers.rep_templates import RepTemplateLibrary
+            from trackers.workout_detector import WorkoutDetector
+            startup.mark("AI modules imported")
+
+            if RECORD_LANDMARKS:
+                from core_AI.landmark_recorder import LandmarkRecorder
+                os.makedirs("storage/recordings", exist_ok=True)
+                # World landmarks too when some angles are 3D, so a replay computes the same angles
+                ai_recorder = LandmarkRecorder(f"storage/recordings/session_{datetime.now():%Y%m%d_%H%M%S}.vflm",
+                                               world_landmarks=bool(ANGLES_3D))
+
+            # RGB frames: one color conversion per frame, shared by MediaPipe and the display
+            ai_camera = CameraProcessor(camera_index=0, rgb_output=True, roi_tracking=ROI_TRACKING,
+                                        latency_budget_ms=LATENCY_BUDGET_MS, recorder=ai_recorder,
+                                        profiler=profiler, capture_profile=CaptureProfile(**CAPTURE_SETTINGS),
+                                        backend_options=dict(smooth_landmarks=ANGLE_FILTER == "none"))
+            startup.mark("camera opened")
+            if ai_camera.capture_report:
+                print(f"Camera: {ai_camera.capture_report.describe()}")
+
+            ai_camera.warm_up()
+            startup.mark("pose model warmed up")
+
+            # Reference reps for shape scoring (trackers/rep_templates.npz, built with batch_analysis.py)
+            result = (ai_camera, AngleCalculator(angles_3d=ANGLES_3D, side=ANGLE_SIDE),
+                      create_angle_filter(ANGLE_FILTER), ai_recorder,
+                      WorkoutDetector(rep_templates=RepTemplateLibrary.load()), ExerciseClassifier())
+            with warmup["lock"]:
+                cancelled = warmup["cancelled"]
+                if not cancelled:
+                    warmup["result"] = result
+            if cancelled:
+                # The app was closed while we were starting
+                ai_camera.release_camera()
+                if ai_recorder:
+                    ai_recorder.close()
+        except Exception as e:
+            print(f"Error initializing camera: {e}")
+            if ai_recorder:
+                ai_recorder.close()
+        finally:
+            warmup["done"] = True
+
+    def attach_ai():
+        # Tk thread: takes over what warm_up_ai() created
+        nonlocal camera, pipeline, recorder, angle_calc, angle_filter, workout_detector, exercise_classifier
+        camera, angle_calc, angle_filter, recorder, workout_detector, exercise_classifier = warmup["result"]
+
+        # Run capture/inference/render in background workers instead of the Tk loop
+        if USE_PIPELINE:
+            from core_AI.pipeline import FramePipeline
+            pipeline = FramePipeline(camera, angle_calc)
+            pipeline.start()
+
+    def start_ai_if_needed():
+        if camera is not None or app.current_page != "WorkoutPage":
+            return
+        if warmup["thread"] is None:
+            workout_page.update_mode_label("Starting camera...")
+            warmup["thread"] = threading.Thread(target=warm_up_ai, name="ai-warmup", daemon=True)
+            warmup["thread"].start()
+        elif warmup["done"]:
+            if warmup["result"] is not None:
+                attach_ai()
+            else:
+                workout_page.update_mode_label("Camera unavailable")
 
 
     # 3. Dynamic GUI Injection: Video Display on WorkoutPage
@@ -80,11 +188,26 @@ def main():
     video_label = ctk.CTkLabel(video_frame, text="")
     video_label.pack(fill="both", expand=True)
 
+    # Latency overlay (F3): per-stage mean / p95 / max in ms, drawn over the video
+    perf_label = ctk.CTkLabel(video_frame, text="", font=("Courier New", 12), justify="left",
+                              anchor="nw", fg_color="#000000", text_color="#00ff88")
+
+    def toggle_perf_overlay(event=None):
+        profiler.show_overlay = not profiler.show_overlay
+        if profiler.show_overlay:
+            perf_label.place(x=8, y=8)
+        else:
+            perf_label.place_forget()
+
+    app.bind("<F3>", toggle_perf_overlay)
+
     # 4. State Variables
     app.is_timer_running = False
     app.camera_paused = False
     app.timer_seconds = 0
     app.last_time = time.time()
+    app.last_overlay_time = 0.0
+    app.first_frame_shown = False
 
 
     # 5. Button Callbacks
@@ -101,6 +224,8 @@ def main():
             if btn: btn.configure(text="▶ Start Timer")
 
     def manual_rep_complete():
+        if workout_detector is None:
+            return
         workout_detector.rep_count += 1
         workout_page.reps_label.configure(text=f"Reps: {workout_detector.rep_count}/{workout_page.target_reps}")
         progress = min(workout_detector.rep_count / workout_page.target_reps, 1.0)
@@ -108,7 +233,10 @@ def main():
 
     def reset_workout():
         # Reset counters
-        workout_detector.reset()
+        if workout_detector is not None:
+            workout_detector.reset()
+        if angle_filter is not None:
+            angle_filter.reset()
         app.timer_seconds = 0
         app.is_timer_running = False
         
@@ -124,18 +252,24 @@ def main():
 
     
     def save_workout():
-        if workout_detector.rep_count > 0 or app.timer_seconds > 0:
+        if workout_detector is not None and (workout_detector.rep_count > 0 or app.timer_seconds > 0):
             new_session = {
-                "workoutType": workout_page.exercise_var.get(),
+                "workoutType": workout_detector.workout_type,
                 "reps": workout_detector.rep_count,
                 "duration": float(app.timer_seconds),
                 "sessionEnded": True,
-                "postureScores": [], 
+                "postureScores": workout_detector.rep_records.posture_scores(),
+                "repRecords": workout_detector.rep_records.to_list(),
                 "timestamp": datetime.now().isoformat()
             }
             data_manager.save_session(new_session)
             print("Workout Saved Manually")
 
+    def save_finished_set():
+        # "auto" recognized another exercise: the previous set is saved and a new one starts
+        save_workout()
+        app.timer_seconds = 0
+
     # 6. Bind Buttons (Recursive Search)
     btn_start = find_widget_by_text(workout_page, "Start Timer")
     if btn_start:
@@ -154,7 +288,12 @@ def main():
         btn_reset.configure(command=reset_workout)
 
     # Auto-reset on exercise change
-    workout_page.exercise_var.trace_add("write", lambda *args: reset_workout())
+    def on_exercise_change(*args):
+        if exercise_classifier is not None:
+            exercise_classifier.reset()
+        reset_workout()
+
+    workout_page.exercise_var.trace_add("write", on_exercise_change)
 
     # 7. Bind Exercise Page Buttons and Cleanup
     def select_exercise(exercise_name):
@@ -195,6 +334,95 @@ def main():
     bind_exercise_buttons()
 
     # 8. Define the Main Update Loop
+    def handle_angles(angles, confidence=1.0, timestamp=None):
+        # Smooth the angles over time, using only the frames the detector will trust
+        if angle_filter is not None and timestamp is not None and confidence >= workout_detector.min_confidence:
+            angles = angle_filter.filter_dict(angles, timestamp)
+
+        # Sync Workout Type ("auto": recognized from the movement, "general" until then)
+        exercise_classifier.sync_detector(workout_detector, workout_page.exercise_var.get(), angles, confidence,
+                                          timestamp, save_set=lambda _: save_finished_set())
+
+        # Detect Reps and Posture
+        previous_reps = workout_detector.rep_count
+        with profiler.stage("detect"):
+            reps = workout_detector.detectReps(angles, confidence, timestamp)
+            posture_score, feedback = workout_detector.detectPosture(angles, confidence)
+
+        if not app.is_timer_running:
+            # Ahmyd : toggle timer if the user reps
+            if reps:
+                toggle_timer()
+
+        # Determine Feedback Color & Priority
+        feedback_color = "#ffcc00" # Default yellow
+
+        priority = "low"
+        
+        if posture_score < 60:
+            feedback_text = f"Error: {feedback}"
+            feedback_color = "#ef4444" # Red
+            priority = "high"
+            # 80 was too high (always Warning)
+        elif posture_score < 75:
+            feedback_text = f"Warning: {feedback}"
+            feedback_color = "#ffcc00" # Yellow
+            priority = "low"
+        else:
+            feedback_text = feedback
+            feedback_color = "#00eaff" # Blue (PRIMARY)
+            priority = "low"
+
+        # Handle Rep Completion Feedback
+        if reps > previous_reps:
+            if posture_score >= 90:
+                rep_message = "Excellent! Perfect rep."
+            elif posture_score < 70:
+                rep_message = "Good, but correct your form."
+            else:
+                rep_message = "Rep completed."
+            
+            # workout_page.speak_feedback(rep_message, priority="high")
+            feedback_text = rep_message 
+        
+        # Session Complete Logic (15 Reps)
+        if reps >= 15:
+            with profiler.stage("tts"):
+                workout_page.speak_feedback("Excellent work! Session complete.", priority="high")
+            save_workout()
+            reset_workout()
+            # app.camera_paused = False 
+            # return  <-- REMOVED to keep loop alive
+            last_processed_time = time.time()  # throttling placeholder logic if needed or pass
+
+        # Trigger Voice Feedback for Errors/Warnings
+        if posture_score < 80 and reps == previous_reps:
+            with profiler.stage("tts"):
+                workout_page.speak_feedback(feedback_text, priority=priority)
+
+        # Update GUI
+        workout_page.update_gui_labels(reps, posture_score, feedback_text, feedback_color)
+
+    def show_image(img, capture_ns=None):
+        # --- CAMERA SCALE (Change this to resize the video feed) ---
+        camera_scale =1  # <--- EDIT THIS (0.5 = half, 1.0 = normal)
+        # -----------------------------------------------------------
+        
+        with profiler.stage("display"):
+            ctk_img = ctk.CTkImage(light_image=img, dark_image=img, 
+                                 size=(int(740*camera_scale), int(470*camera_scale)))
+            video_label.configure(image=ctk_img)
+            video_label.image = ctk_img
+
+        # Capture-to-display latency of this frame
+        if capture_ns is not None:
+            profiler.record_since("end_to_end", capture_ns)
+
+        if not app.first_frame_shown:
+            app.first_frame_shown = True
+            startup.mark("first frame shown")
+            print("[startup] timeline:\n" + startup.report())  # Startup is over; show where the time went
+
     def update_loop():
         current_time = time.time()
         
@@ -210,105 +438,60 @@ def main():
         else:
             app.last_time = current_time
 
+        # Start the camera and pose model the first time the Workout page is opened
+        start_ai_if_needed()
+
         # Only process AI if we are on the Workout Page
-        if app.current_page == "WorkoutPage" and camera and not app.camera_paused:
+        camera_active = app.current_page == "WorkoutPage" and camera and not app.camera_paused
+
+        if camera_active:
+            workout_page.update_mode_label(camera.get_performance_mode())
+
+        # Refresh the latency overlay twice a second
+        if profiler.show_overlay and current_time - app.last_overlay_time >= 0.5:
+            perf_label.configure(text="\n".join(profiler.summary_lines()))
+            app.last_overlay_time = current_time
+
+        if pipeline:
+            # Pipeline mode: capture/inference/render run in workers, we only consume results
+            if camera_active:
+                pipeline.resume()
+                result = pipeline.get_latest()
+                if result is not None:
+                    if result.angles:
+                        try:
+                            handle_angles(result.angles, result.confidence, result.capture_ns / 1e9)
+                        except Exception as e:
+                            print(f"Error in AI loop: {e}")
+                    show_image(result.image, result.capture_ns)
+            else:
+                pipeline.pause()
+
+        elif camera_active:
+            capture_ns = profiler.now_ns()
             frame, landmarks = camera.get_processed_frame()
             
             if frame is not None:
                 # -- AI Processing --
                 if landmarks:
                     try:
-                        lm_list = landmarks.landmark
-                        angles = angle_calc.get_essential_angles(lm_list)
-                        
-                        # Sync Workout Type
-                        dtype = workout_page.exercise_var.get()
-                        
-                        if workout_detector.workout_type != dtype:
-                             workout_detector.workout_type = dtype
-                             workout_detector.thresholds = workout_detector.workout_thresholds.get(dtype, workout_detector.workout_thresholds["general"])
-
-                        # Detect Reps (Only if timer is running)
-                        previous_reps = workout_detector.rep_count
-                        if app.is_timer_running:
-                            reps = workout_detector.detectReps(angles)
-                        else:
-                            # Ahmyd : toggle timer if the user reps
-                            reps = workout_detector.detectReps(angles)
-                            if reps:
-                                toggle_timer()
-                            
-                        posture_score, feedback = workout_detector.detectPosture(angles)
-
-                        # Determine Feedback Color & Priority
-                        feedback_color = "#ffcc00" # Default yellow
-
-                        priority = "low"
-                        
-                        if posture_score < 60:
-                            feedback_text = f"Error: {feedback}"
-                            feedback_color = "#ef4444" # Red
-                            priority = "high"
-                            # 80 was too high (always Warning)
-                        elif posture_score < 75:
-                            feedback_text = f"Warning: {feedback}"
-                            feedback_color = "#ffcc00" # Yellow
-                            priority = "low"
-                        else:
-                            feedback_text = feedback
-                            feedback_color = "#00eaff" # Blue (PRIMARY)
-                            priority = "low"
-
-                        # Handle Rep Completion Feedback
-                        if reps > previous_reps:
-                            if posture_score >= 90:
-                                rep_message = "Excellent! Perfect rep."
-                            elif posture_score < 70:
-                                rep_message = "Good, but correct your form."
-                            else:
-                                rep_message = "Rep completed."
-                            
-                            # workout_page.speak_feedback(rep_message, priority="high")
-                            feedback_text = rep_message 
-                        
-                        # Session Complete Logic (15 Reps)
-                        if reps >= 15:
-                            workout_page.speak_feedback("Excellent work! Session complete.", priority="high")
-                            save_workout()
-                            reset_workout()
-                            # app.camera_paused = False 
-                            # return  <-- REMOVED to keep loop alive
-                            last_processed_time = time.time()  # throttling placeholder logic if needed or pass
-
-                        # Trigger Voice Feedback for Errors/Warnings
-                        if posture_score < 80 and reps == previous_reps:
-                             workout_page.speak_feedback(feedback_text, priority=priority)
-
-                        # Update GUI
-                        workout_page.update_gui_labels(reps, posture_score, feedback_text, feedback_color)
-
+                        with profiler.stage("angles"):
+                            angles, confidence = angle_calc.essential_angles(camera.landmark_array,
+                                                                             camera.world_landmark_array)
+                        handle_angles(angles, confidence, capture_ns / 1e9)
 
                         # Draw Landmarks
-                        camera.mp_drawing.draw_landmarks(
-                            frame, landmarks, camera.mp_pose.POSE_CONNECTIONS,
-                             camera.mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
-                             camera.mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
-                        )
+                        with profiler.stage("draw"):
+                            camera.draw_landmarks(frame, landmarks)
                         
                     except Exception as e:
                         print(f"Error in AI loop: {e}")
 
                 # -- Video Display --
-                img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(img)
-                # --- CAMERA SCALE (Change this to resize the video feed) ---
-                camera_scale =1  # <--- EDIT THIS (0.5 = half, 1.0 = normal)
-                # -----------------------------------------------------------
-                
-                ctk_img = ctk.CTkImage(light_image=img, dark_image=img, 
-                                     size=(int(740*camera_scale), int(470*camera_scale)))
-                video_label.configure(image=ctk_img)
-                video_label.image = ctk_img
+                if not camera.rgb_output:
+                    import cv2
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                show_image(Image.fromarray(frame), capture_ns)
 
         # Schedule next update
         app.after(10, update_loop)
@@ -318,13 +501,34 @@ def main():
 
     # Handle Cleanup on Exit
     def on_closing():
+        with warmup["lock"]:
+            warmup["cancelled"] = True
+            # Warmed up but never attached (the Workout page was not opened again): release it here
+            unattached = warmup["result"] if camera is None else None
+        if pipeline:
+            pipeline.stop()
         if camera:
             camera.release_camera()
+        if recorder:
+            recorder.close()
+        if unattached is not None:
+            unattached_camera, _, _, unattached_recorder = unattached[:4]
+            unattached_camera.release_camera()
+            if unattached_recorder:
+                unattached_recorder.close()
+        if profiler.histograms:
+            perf_path = f"storage/perf/perf_{datetime.now():%Y%m%d_%H%M%S}.json"
+            try:
+                profiler.dump(perf_path)
+                print(f"Latency histograms saved to {perf_path}")
+            except OSError as e:
+                print(f"Error saving latency histograms: {e}")
         app.on_closing()
 
     app.protocol("WM_DELETE_WINDOW", on_closing)
 
     # Run App
+    app.after(0, lambda: startup.mark("window shown"))
     app.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,262 @@
+"""
+Multi-Camera Station Module
+Runs one pose worker process per camera (front, side, ...) and a coordinator
+that keeps per-camera detector state and picks or fuses the best view.
+
+Each worker publishes only its newest result into a small shared-memory slot
+(latest-frame-wins), so nothing queues up and no frames are pickled between
+processes.
+
+Usage:
+    python multi_camera.py --cameras 0 1 --exercise squat --mode fuse
+"""
+import argparse
+import json
+import multiprocessing as mp
+import time
+
+import numpy as np
+
+from core_AI.angle_utils import SIDE_MODES
+from trackers.detector_fleet import DetectorFleet
+from trackers.exercise_definitions import ANGLE_KEYS
+from trackers.workout_detector import WorkoutDetector
+
+# Shared slot layout: [sequence, timestamp, has_pose, quality, 33 x 4 landmarks, angles in ANGLE_KEYS order]
+# quality is the confidence of the angles: the visibility of the joints of the side(s) they were measured on
+_SEQ, _TIME, _HAS_POSE, _QUALITY, _LANDMARKS = 0, 1, 2, 3, 4
+_ANGLES = _LANDMARKS + 33 * 4
+SLOT_SIZE = _ANGLES + len(ANGLE_KEYS)
+
+
+def pose_worker(camera_index, slot, stop_event, camera_options, angle_side="best"):
+    """
+    Worker process body: captures from one camera, runs pose and angles, and
+    publishes the newest result into `slot`.
+
+    Args:
+        camera_index (int): Webcam index for this worker.
+        slot (multiprocessing.Array): Shared result slot (see SLOT_SIZE).
+        stop_event (multiprocessing.Event): Set by the coordinator to stop the worker.
+        camera_options (dict): Extra keyword arguments for CameraProcessor.
+        angle_side (str): Body side the angles are measured on (see angle_utils.SIDE_MODES); with
+            "best", a camera facing the athlete's right side measures the right side.
+    """
+    # Imported in the child so every process owns its OpenCV/MediaPipe state
+    from core_AI.ai_processor import CameraProcessor
+    from core_AI.angle_utils import AngleCalculator
+
+    try:
+        camera = CameraProcessor(camera_index=camera_index, **camera_options)
+    except Exception as e:
+        print(f"Camera {camera_index}: {e}")
+        return
+    angle_calc = AngleCalculator(side=angle_side)
+
+    try:
+        while not stop_event.is_set():
+            frame, landmarks = camera.get_processed_frame()
+            if frame is None:
+                time.sleep(0.01)
+                continue
+
+            timestamp = time.time()  # Wall clock: comparable across processes
+            with slot.get_lock():
+                slot[_SEQ] += 1
+                slot[_TIME] = timestamp
+                slot[_HAS_POSE] = 1.0 if landmarks else 0.0
+                if landmarks:
+                    angles, confidence = angle_calc.essential_angles(camera.landmark_array,
+                                                                     camera.world_landmark_array)
+                    slot[_QUALITY] = confidence
+                    slot[_LANDMARKS:_ANGLES] = camera.landmark_array.ravel().tolist()
+                    slot[_ANGLES:SLOT_SIZE] = [angles[key] for key in ANGLE_KEYS]
+    finally:
+        camera.release_camera()
+
+
+class MultiCameraStation:
+    """
+    Coordinates several camera workers watching the same athlete.
+
+    Each camera has its own detector state (one row of a DetectorFleet, stepped
+    together for all cameras with a new result). The station's own
+    detector is fed with the angles of the best view ("best" mode) or with a
+    visibility-weighted average of all fresh views ("fuse" mode) and provides
+    the official rep count and posture score.
+    """
+
+    def __init__(self, camera_indices, workout_type: str = "general", mode: str = "best",
+                 max_age: float = 0.25, camera_options: dict = None, angle_side: str = "best"):
+        """
+        Args:
+            camera_indices (list): Webcam indices, one worker process each.
+            workout_type (str): Exercise to detect.
+            mode (str): "best" to pick the most visible view, "fuse" to blend all views.
+            max_age (float): Results older than this (seconds) are ignored.
+            camera_options (dict, optional): Extra keyword arguments for each CameraProcessor.
+            angle_side (str): Body side each worker measures the angles on (see angle_utils.SIDE_MODES).
+        """
+        if mode not in ("best", "fuse"):
+            raise ValueError(f"Unknown mode: {mode}")
+        if angle_side not in SIDE_MODES:
+            raise ValueError(f"Unknown side mode: {angle_side} (available: {', '.join(SIDE_MODES)})")
+        self.camera_indices = list(camera_indices)
+        self.mode = mode
+        self.max_age = max_age
+        self.camera_options = camera_options or {}
+        self.angle_side = angle_side
+
+        self.detector = WorkoutDetector(workout_type)
+        self.camera_fleet = DetectorFleet(len(self.camera_indices), workout_type)
+        self.detectors = {index: self.camera_fleet.athlete(row) for row, index in enumerate(self.camera_indices)}
+        self.views = {index: None for index in self.camera_indices}  # Latest result per camera
+
+        # "spawn" gives every worker a clean interpreter (required on Windows/macOS anyway)
+        self._context = mp.get_context("spawn")
+        self._slots = {index: self._context.Array("d", SLOT_SIZE) for index in self.camera_indices}
+        self._last_seq = {index: 0 for index in self.camera_indices}
+        self._last_time = -np.inf  # Time of the last sample fed to the station detector
+        self._stop_event = self._context.Event()
+        self._processes = []
+
+    def start(self):
+        """Starts one worker process per camera."""
+        self._stop_event.clear()
+        for index in self.camera_indices:
+            process = self._context.Process(target=pose_worker, name=f"pose-camera-{index}",
+                                            args=(index, self._slots[index], self._stop_event, self.camera_options,
+                                                  self.angle_side),
+                                            daemon=True)
+            process.start()
+            self._processes.append(process)
+
+    def stop(self, timeout: float = 2.0):
+        """Stops the workers and waits for them to release their cameras."""
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def set_workout_type(self, workout_type: str):
+        """Switches the exercise for every detector (resets their state)."""
+        for detector in [self.detector, *self.detectors.values()]:
+            detector.set_workout_type(workout_type)
+            detector.reset()
+
+    def _read_slot(self, index):
+        """Copies a camera's slot if it holds a new result; returns None otherwise."""
+        slot = self._slots[index]
+        with slot.get_lock():
+            if slot[_SEQ] == self._last_seq[index]:
+                return None
+            values = slot[:]
+        self._last_seq[index] = values[_SEQ]
+        if not values[_HAS_POSE]:
+            return {"time": values[_TIME], "angles": None, "quality": 0.0}
+        return {
+            "time": values[_TIME],
+            "angles": dict(zip(ANGLE_KEYS, values[_ANGLES:SLOT_SIZE])),
+            "quality": values[_QUALITY],
+        }
+
+    def poll(self):
+        """
+        Collects new worker results, updates the per-camera detectors and the
+        station detector. The station detector is stepped only when the view it
+        reads (or, when fusing, one of them) has a new result, with that result's time.
+
+        Returns:
+            dict: The station update, or None if no camera produced a new result.
+        """
+        new = set()  # Cameras with a new result in this poll
+        rows = []
+        for row, index in enumerate(self.camera_indices):
+            view = self._read_slot(index)
+            if view is None:
+                continue
+            new.add(index)
+            self.views[index] = view
+            if view["angles"]:
+                rows.append(row)
+        if not new:
+            return None
+        if rows:
+            # One vectorized step for every camera with a new pose
+            angles = np.array([[self.views[self.camera_indices[row]]["angles"][key] for key in ANGLE_KEYS]
+                               for row in rows])
+            confidence = np.array([self.views[self.camera_indices[row]]["quality"] for row in rows])
+            self.camera_fleet.step(angles, confidence, rows=rows)
+
+        now = time.time()
+        fresh = {index: view for index, view in self.views.items()
+                 if view and view["angles"] and now - view["time"] <= self.max_age and view["quality"] > 0}
+        if not fresh:
+            # Same fields as a normal update; the posture is the last evaluation
+            return self._update(None, self.detector.rep_count, self.detector.last_score,
+                                self.detector.last_feedback, 0.0)
+
+        if self.mode == "best":
+            source = max(fresh, key=lambda index: fresh[index]["quality"])
+            used = (source,)
+            angles = fresh[source]["angles"]
+            quality = fresh[source]["quality"]
+        else:
+            source = "fused"
+            used = tuple(fresh)
+            total = sum(view["quality"] for view in fresh.values())
+            angles = {name: sum(view["angles"][name] * view["quality"] for view in fresh.values()) / total
+                      for name in ANGLE_KEYS}
+            quality = max(view["quality"] for view in fresh.values())
+
+        # Only a new sample steps the station detector: the last sample of a slower camera must not be
+        # counted again (holds, tempo and posture statistics would be skewed); it is timed by its newest view
+        timestamp = max((fresh[index]["time"] for index in used if index in new), default=None)
+        if timestamp is None or timestamp <= self._last_time:
+            return self._update(source, self.detector.rep_count, self.detector.last_score,
+                                self.detector.last_feedback, quality)
+        self._last_time = timestamp
+
+        # The view quality (visibility of the measured joints) is the angle confidence of the station detector
+        reps = self.detector.detectReps(angles, confidence=quality, timestamp=timestamp)
+        score, feedback = self.detector.detectPosture(angles, confidence=quality)
+        return self._update(source, reps, score, feedback, quality)
+
+    def _update(self, source, reps: int, score: int, feedback: str, quality: float) -> dict:
+        """The station update returned by poll()."""
+        return {
+            "source": source,
+            "reps": reps,
+            "postureScore": score,
+            "feedback": feedback,
+            "quality": round(quality, 3),
+            "cameraReps": {index: detector.rep_count for index, detector in self.detectors.items()},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track one athlete with several cameras.")
+    parser.add_argument("--cameras", type=int, nargs="+", default=[0], help="Webcam indices")
+    parser.add_argument("--exercise", default="general", help="Exercise ID from trackers/exercises/ (pushup, squat, bicep_curl, general, ...)")
+    parser.add_argument("--mode", choices=("best", "fuse"), default="best", help="Pick the best view or fuse all views")
+    parser.add_argument("--side", choices=SIDE_MODES, default="best", help="Body side each camera measures the angles on")
+    args = parser.parse_args()
+
+    station = MultiCameraStation(args.cameras, args.exercise, args.mode, angle_side=args.side)
+    station.start()
+    try:
+        while True:
+            update = station.poll()
+            if update is not None:
+                print(json.dumps(update), flush=True)
+            time.sleep(0.005)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        station.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Shared test fixtures: synthetic angle series that look like recorded sets.
+"""
+import numpy as np
+import pytest
+
+from trackers.exercise_definitions import ANGLE_KEYS
+
+# (start, depth) of each joint over one rep, in ANGLE_KEYS order; a rep goes start -> start - depth -> start
+REP_SHAPES = {
+    "pushup": ((65, 15), (168, 78), (172, 0), (174, 0)),
+    "squat": ((45, 0), (150, 0), (172, 85), (174, 88)),
+    "bicep_curl": ((12, -6), (162, 117), (175, 0), (176, 0)),
+    "general": ((30, 0), (170, 80), (175, 0), (176, 0)),
+}
+
+
+def synthetic_angles(exercise: str, seconds: float = 12.0, fps: int = 30, period: float = 2.5,
+                     noise: float = 3.0, depth: float = 1.0, seed: int = 0) -> np.ndarray:
+    """
+    (T, len(ANGLE_KEYS)) angles of a set of smooth reps with Gaussian noise.
+
+    Args:
+        exercise (str): A key of REP_SHAPES.
+        seconds, fps (float, int): Length and frame rate of the series.
+        period (float): Seconds per rep.
+        noise (float): Standard deviation of the added noise, in degrees.
+        depth (float): Scales the range of motion (below 1, some reps may not be deep enough to count).
+        seed (int): Noise seed.
+    """
+    rng = np.random.default_rng(seed)
+    times = np.arange(int(seconds * fps)) / fps
+    phase = (1.0 - np.cos(2.0 * np.pi * times / period)) / 2.0  # 0 at the start position, 1 at the bottom
+    starts, depths = np.array(REP_SHAPES[exercise], dtype=np.float64).T
+    angles = starts - depth * depths * phase[:, None]
+    assert angles.shape[1] == len(ANGLE_KEYS)
+    return angles + rng.normal(0.0, noise, angles.shape)
+
+
+@pytest.fixture
+def angle_series():
+    """The synthetic_angles() generator."""
+    return synthetic_angles
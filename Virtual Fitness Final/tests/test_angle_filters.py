@@ -0,0 +1,110 @@
+"""
+Angle Filter Tests
+The filter banks must filter every joint like its own scalar filter, driven by the frame timestamps.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from core_AI.angle_filters import LowPassFilterBank, OneEuroFilterBank, create_angle_filter
+
+
+def alpha(cutoff, dt):
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+def one_euro_reference(values, times, min_cutoff, beta, derivative_cutoff):
+    """The One-Euro filter of one signal, one sample at a time (Casiez et al., 2012)."""
+    output = [values[0]]
+    value, speed = values[0], 0.0
+    for previous_time, time, raw in zip(times, times[1:], values[1:]):
+        dt = time - previous_time
+        speed += alpha(derivative_cutoff, dt) * ((raw - value) / dt - speed)
+        value += alpha(min_cutoff + beta * abs(speed), dt) * (raw - value)
+        output.append(value)
+    return np.array(output)
+
+
+def low_pass_reference(values, times, cutoff):
+    """A first-order low-pass filter of one signal."""
+    output = [values[0]]
+    for previous_time, time, raw in zip(times, times[1:], values[1:]):
+        output.append(output[-1] + alpha(cutoff, time - previous_time) * (raw - output[-1]))
+    return np.array(output)
+
+
+def noisy_signals(frames=120, joints=4, seed=0):
+    """(frames, joints) noisy sine waves, and irregular frame times (15 to 60 FPS)."""
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.uniform(1 / 60, 1 / 15, frames))
+    phases = rng.uniform(0, 2 * np.pi, joints)
+    values = 120 + 40 * np.sin(2 * np.pi * 0.5 * times[:, None] + phases) + rng.normal(0, 3, (frames, joints))
+    return values, times
+
+
+def run(bank, values, times):
+    return np.array([bank.filter(row, time) for row, time in zip(values, times)])
+
+
+def test_one_euro_matches_scalar_filters():
+    values, times = noisy_signals()
+    bank = OneEuroFilterBank(min_cutoff=1.2, beta=0.04, derivative_cutoff=1.5)
+    filtered = run(bank, values, times)
+    for joint in range(values.shape[1]):
+        expected = one_euro_reference(values[:, joint].tolist(), times.tolist(), 1.2, 0.04, 1.5)
+        np.testing.assert_allclose(filtered[:, joint], expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("order", (1, 3))
+def test_low_pass_matches_cascaded_scalar_filters(order):
+    values, times = noisy_signals(seed=1)
+    filtered = run(LowPassFilterBank(cutoff_hz=3.0, order=order), values, times)
+    for joint in range(values.shape[1]):
+        expected = values[:, joint]
+        for _ in range(order):
+            expected = low_pass_reference(expected.tolist(), times.tolist(), 3.0)
+        np.testing.assert_allclose(filtered[:, joint], expected, rtol=1e-12)
+
+
+def test_smoothing_follows_time_not_frames():
+    # The same step seen at 30, 60 and 120 FPS is followed at nearly the same pace
+    remaining = []
+    for fps in (30, 60, 120):
+        times = np.arange(fps) / fps
+        values = np.where(times[:, None] < 0.1, 90.0, 95.0)
+        filtered = run(LowPassFilterBank(), values, times)
+        remaining.append(95.0 - filtered[np.searchsorted(times, 0.2 - 1e-9)][0])
+    assert 0.2 < remaining[0] < 2.0  # Still catching up with the step
+    np.testing.assert_allclose(remaining, remaining[0], rtol=0.1)
+
+
+@pytest.mark.parametrize("name", ("one_euro", "low_pass"))
+def test_gaps_and_missing_frames_restart_the_filter(name):
+    bank = create_angle_filter(name)
+    bank.filter(np.array([90.0]), 0.0)
+    smoothed = bank.filter(np.array([170.0]), 1 / 30)
+    assert 90.0 < smoothed[0] < 170.0
+    assert bank.filter(np.array([150.0]), 1 / 30)[0] == smoothed[0]  # Repeated timestamp: no new step
+
+    assert bank.filter(np.array([170.0]), 2.0)[0] == 170.0  # Longer than max_gap
+    assert bank.filter(np.array([170.0]), 1.0)[0] == 170.0  # Time went backwards
+    assert np.isnan(bank.filter(np.array([np.nan]), 1.1)[0])
+    assert bank.filter(np.array([60.0]), 1.2)[0] == 60.0  # First frame after a frame without a pose
+
+
+def test_filter_dict_keeps_the_keys():
+    bank = LowPassFilterBank()
+    bank.filter_dict({"KNEE_ANGLE": 90.0, "HIP_ANGLE": 100.0}, 0.0)
+    filtered = bank.filter_dict({"HIP_ANGLE": 100.0, "KNEE_ANGLE": 170.0}, 1 / 30)
+    assert list(filtered) == ["KNEE_ANGLE", "HIP_ANGLE"]
+    assert filtered["HIP_ANGLE"] == pytest.approx(100.0)
+    assert 90.0 < filtered["KNEE_ANGLE"] < 170.0
+
+
+def test_create_angle_filter():
+    assert create_angle_filter("none") is None
+    assert isinstance(create_angle_filter("low_pass", cutoff_hz=2.0, order=2), LowPassFilterBank)
+    with pytest.raises(ValueError):
+        create_angle_filter("kalman")
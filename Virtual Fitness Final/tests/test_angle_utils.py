@@ -0,0 +1,72 @@
+"""
+Angle Utils Tests
+The vectorized angle paths must give the same angles as the per-joint calculate_angle().
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from core_AI.angle_utils import JOINT_TRIPLETS, SIDE_MODES, AngleCalculator, batch_joint_angles, joint_angles
+
+
+def random_landmarks(rng, frames=None):
+    """(33, 4) or (frames, 33, 4) landmarks: x, y, z in [0, 1] and a visibility."""
+    shape = (33, 4) if frames is None else (frames, 33, 4)
+    return rng.uniform(0.0, 1.0, size=shape)
+
+
+def reference_angles(calculator, landmarks):
+    """Every configured joint angle through calculate_angle(), one joint at a time."""
+    points = [SimpleNamespace(x=x, y=y) for x, y in landmarks[:, :2]]
+    return np.array([calculator.calculate_angle(points[a], points[b], points[c])
+                     for _, (a, b, c) in calculator.triplets])
+
+
+def test_compute_matches_calculate_angle():
+    rng = np.random.default_rng(0)
+    calculator = AngleCalculator()
+    for _ in range(200):
+        landmarks = random_landmarks(rng)
+        np.testing.assert_allclose(calculator.compute(landmarks), reference_angles(calculator, landmarks),
+                                   atol=1e-9)
+
+
+def test_compute_batch_matches_compute():
+    rng = np.random.default_rng(1)
+    calculator = AngleCalculator()
+    landmarks = random_landmarks(rng, frames=50)
+    landmarks[7] = np.nan  # A frame without a pose
+
+    angles = calculator.compute_batch(landmarks, chunk_size=16)
+    assert angles.shape == (50, len(JOINT_TRIPLETS))
+    assert np.isnan(angles[7]).all()
+    for frame in (0, 15, 16, 49):
+        np.testing.assert_allclose(angles[frame], calculator.compute(landmarks[frame]), atol=1e-4)
+
+
+def test_3d_angles_match_arccos():
+    rng = np.random.default_rng(2)
+    points = rng.uniform(-1.0, 1.0, size=(100, 33, 3))
+    indices = np.array([joint for _, joint in JOINT_TRIPLETS])
+
+    ba = points[:, indices[:, 0]] - points[:, indices[:, 1]]
+    bc = points[:, indices[:, 2]] - points[:, indices[:, 1]]
+    cosine = (ba * bc).sum(axis=-1) / (np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1))
+    expected = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+    np.testing.assert_allclose(joint_angles(points, indices), expected, atol=1e-6)
+    np.testing.assert_allclose(batch_joint_angles(points, indices, dims=3, chunk_size=32), expected, atol=1e-4)
+
+
+@pytest.mark.parametrize("side", SIDE_MODES)
+def test_essential_batch_matches_essential_angles(side):
+    rng = np.random.default_rng(3)
+    calculator = AngleCalculator(side=side)
+    landmarks = random_landmarks(rng, frames=40)
+
+    angles, confidence = calculator.essential_batch(landmarks, chunk_size=16)
+    for frame in range(len(landmarks)):
+        expected, expected_confidence = calculator.essential_angles(landmarks[frame])
+        np.testing.assert_allclose(angles[frame], [expected[key] for key in calculator.essential_keys], atol=1e-3)
+        assert confidence[frame] == pytest.approx(expected_confidence, abs=1e-6)
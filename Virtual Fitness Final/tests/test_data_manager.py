@@ -0,0 +1,48 @@
+"""
+Data Manager Tests
+Sessions saved with their rep records read back, and files from older versions gain the new columns.
+"""
+import csv
+import json
+
+from data_manager import WorkoutDataManager
+
+OLD_HEADER = ["id", "workoutType", "reps", "duration", "sessionEnded", "postureScores", "timestamp"]
+
+
+def test_save_and_load(tmp_path):
+    manager = WorkoutDataManager(str(tmp_path / "storage" / "data.csv"))
+    assert manager.load_sessions() == []
+
+    records = [{"start": 0.5, "end": 2.0, "duration": 1.5, "postureMean": None}]
+    manager.save_session({"workoutType": "squat", "reps": 1, "duration": 12, "sessionEnded": True,
+                          "postureScores": [85.0, None], "timestamp": "2025-01-01 10:00:00",
+                          "repRecords": records})
+    manager.save_session({"workoutType": "pushup", "reps": 0})
+
+    first, second = manager.load_sessions()
+    assert first["id"] == "0" and second["id"] == "1"
+    assert first["postureScores"] == "85.0;"
+    assert json.loads(first["repRecords"]) == records
+    assert second["repRecords"] == "" and second["postureScores"] == ""
+
+
+def test_old_files_are_upgraded(tmp_path, capsys):
+    path = tmp_path / "data.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(OLD_HEADER)
+        writer.writerow(["0", "squat", "5", "30", "True", "80.0;90.0", "2024-12-31 09:00:00"])
+
+    manager = WorkoutDataManager(str(path))
+    assert "repRecords" in capsys.readouterr().err
+    (old,) = manager.load_sessions()
+    assert old["reps"] == "5" and old["postureScores"] == "80.0;90.0" and old["repRecords"] == ""
+
+    manager.save_session({"workoutType": "pushup", "reps": 2, "repRecords": []})
+    assert [session["id"] for session in manager.load_sessions()] == ["0", "1"]
+    with open(path, newline="", encoding="utf-8") as f:
+        assert next(csv.reader(f)) == manager.fieldnames
+
+    WorkoutDataManager(str(path))  # Already current: left alone
+    assert capsys.readouterr().err == ""
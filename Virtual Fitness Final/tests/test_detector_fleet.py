@@ -0,0 +1,96 @@
+"""
+Detector Fleet Tests
+Every row of a DetectorFleet must follow the same rep counts, posture scores and
+feedback as its own WorkoutDetector fed the same frames.
+"""
+import numpy as np
+
+from trackers.detector_fleet import DetectorFleet
+from trackers.exercise_definitions import ANGLE_KEYS
+from trackers.workout_detector import WorkoutDetector
+
+EXERCISES = ("pushup", "squat", "bicep_curl", "general")
+
+
+def make_athletes(angle_series, size):
+    """(T, N, K) angles and the exercise of each athlete; athletes differ in exercise, depth and noise."""
+    exercises = [EXERCISES[row % len(EXERCISES)] for row in range(size)]
+    series = [angle_series(exercise, seconds=15, period=2.0 + 0.2 * row, noise=2.0 + row % 5,
+                           depth=0.85 + 0.05 * (row % 4), seed=row)
+              for row, exercise in enumerate(exercises)]
+    return np.stack(series, axis=1), exercises
+
+
+def assert_same_state(fleet, detectors):
+    for row, detector in enumerate(detectors):
+        assert fleet.workout_type(row) == detector.workout_type
+        assert fleet.rep_count[row] == detector.rep_count
+        assert fleet.in_rep[row] == detector.in_rep
+        assert fleet.last_score[row] == detector.last_score
+        assert fleet.feedback_messages[fleet.last_feedback[row]] == detector.last_feedback
+        assert fleet.skipped_frames[row] == detector.skipped_frames
+
+
+def test_step_matches_detectors(angle_series):
+    rng = np.random.default_rng(0)
+    angles, exercises = make_athletes(angle_series, size=12)
+    angles[rng.random(angles.shape[:2]) < 0.05] = np.nan  # Streams that did not deliver a frame
+    confidence = rng.uniform(0.2, 1.0, angles.shape[:2])
+
+    fleet = DetectorFleet(len(exercises))
+    detectors = [WorkoutDetector(exercise) for exercise in exercises]
+    for row, exercise in enumerate(exercises):
+        fleet.set_workout_type(exercise, [row])
+
+    for frame in range(len(angles)):
+        counts, scores, codes = fleet.step(angles[frame], confidence[frame])
+        for row, detector in enumerate(detectors):
+            if np.isnan(angles[frame, row]).any():
+                continue
+            angle_data = dict(zip(ANGLE_KEYS, angles[frame, row].tolist()))
+            detector.detectReps(angle_data, confidence=confidence[frame, row])
+            score, feedback = detector.detectPosture(angle_data, confidence=confidence[frame, row])
+            assert scores[row] == score
+            assert fleet.feedback_text(codes[row:row + 1]) == [feedback]
+        assert counts.tolist() == [detector.rep_count for detector in detectors]
+    assert counts.sum() > 0
+    assert_same_state(fleet, detectors)
+
+
+def test_rows_step_only_their_athletes(angle_series):
+    angles, exercises = make_athletes(angle_series, size=6)
+    fleet = DetectorFleet(len(exercises), workout_type="squat")
+    detectors = [WorkoutDetector("squat") for _ in exercises]
+
+    for frame in range(len(angles)):
+        rows = np.arange(frame % 2, len(exercises), 2)  # Half of the athletes per frame
+        fleet.step(angles[frame, rows], rows=rows)
+        for row in rows.tolist():
+            angle_data = dict(zip(ANGLE_KEYS, angles[frame, row].tolist()))
+            detectors[row].detectReps(angle_data)
+            detectors[row].detectPosture(angle_data)
+        if frame == len(angles) // 2:
+            fleet.set_workout_type("pushup", [1, 4])
+            detectors[1].set_workout_type("pushup")
+            detectors[4].set_workout_type("pushup")
+    assert_same_state(fleet, detectors)
+
+
+def test_athlete_view_matches_detector(angle_series):
+    angles = angle_series("bicep_curl", seconds=15, noise=5.0, seed=3)
+    fleet = DetectorFleet(3)
+    view = fleet.athlete(1)
+    detector = WorkoutDetector()
+    view.set_workout_type("bicep_curl")
+    detector.set_workout_type("bicep_curl")
+
+    for row in angles:
+        angle_data = dict(zip(ANGLE_KEYS, row.tolist()))
+        assert view.detectReps(angle_data) == detector.detectReps(angle_data)
+        assert view.detectPosture(angle_data) == detector.detectPosture(angle_data)
+    assert detector.rep_count > 0
+    assert fleet.rep_count[[0, 2]].tolist() == [0, 0]  # The other athletes are untouched
+
+    view.reset()
+    detector.reset()
+    assert view.get_current_state()["rep_count"] == detector.get_current_state()["rep_count"] == 0
@@ -0,0 +1,121 @@
+"""
+Exercise Classifier Tests
+Recognition of the synthetic sets, and the detector switch that follows it: the
+finished set is saved once and only the frames after its last rep are replayed.
+"""
+import numpy as np
+
+from trackers.exercise_classifier import ExerciseClassifier, switch_recognized_exercise
+from trackers.exercise_definitions import ANGLE_KEYS, AUTO_EXERCISE, DEFAULT_EXERCISE
+from trackers.workout_detector import WorkoutDetector
+
+FPS = 30
+
+
+def feed(detector, angles, times):
+    """Feeds frames to a detector the way the app does: detectReps() then detectPosture()."""
+    for row, timestamp in zip(angles.tolist(), times):
+        angle_data = dict(zip(ANGLE_KEYS, row))
+        detector.detectReps(angle_data, timestamp=timestamp)
+        detector.detectPosture(angle_data)
+
+
+def assert_same_detector(detector, expected):
+    assert detector.workout_type == expected.workout_type
+    assert detector.rep_count == expected.rep_count
+    assert detector.in_rep == expected.in_rep
+    assert (detector.last_score, detector.last_feedback) == (expected.last_score, expected.last_feedback)
+    assert detector.rep_records.active == expected.rep_records.active
+    assert detector.rep_records.to_list() == expected.rep_records.to_list()
+
+
+def curls_then_squats(angle_series):
+    """A curl set followed by squats, with the frame times of both."""
+    angles = np.concatenate((angle_series("bicep_curl", seconds=10, noise=2.0, seed=1),
+                             angle_series("squat", seconds=5, noise=2.0, seed=2)))
+    return angles, np.arange(len(angles)) / FPS
+
+
+def test_recognizes_exercises(angle_series):
+    for exercise in ("pushup", "squat", "bicep_curl"):
+        classifier = ExerciseClassifier()
+        for row in angle_series(exercise, seconds=8, noise=2.0, seed=3):
+            classifier.update(row)
+        assert classifier.current == exercise
+
+    classifier = ExerciseClassifier()
+    for _ in range(8 * FPS):
+        classifier.update([20.0, 170.0, 175.0, 176.0])  # Standing still
+    assert classifier.current is None
+
+
+def test_switch_saves_the_set_once_and_replays_the_frames_after_it(angle_series):
+    angles, times = curls_then_squats(angle_series)
+    classifier = ExerciseClassifier()
+    detector = WorkoutDetector("bicep_curl")
+    for row, timestamp in zip(angles, times):
+        classifier.update(row, timestamp)
+    feed(detector, angles, times)
+    reps = detector.rep_count
+    assert reps > 0
+    last_end = detector.rep_records.records["end"][-1]
+
+    saved = []
+    switch_recognized_exercise(detector, classifier, "squat",
+                               save_set=lambda finished: saved.append((finished.workout_type, finished.rep_count)))
+    assert saved == [("bicep_curl", reps)]
+
+    # Same state as selecting squats by hand right after the curl set's last rep
+    window = len(angles) - classifier.window
+    replayed = times[window:] > last_end
+    expected = WorkoutDetector("squat")
+    feed(expected, angles[window:][replayed], times[window:][replayed])
+    assert expected.rep_count > 0
+    assert_same_detector(detector, expected)
+
+
+def test_switch_without_timestamps(angle_series):
+    angles, times = curls_then_squats(angle_series)
+
+    # After a set, frames without times cannot be placed after its last rep: none are replayed
+    classifier = ExerciseClassifier()
+    detector = WorkoutDetector("bicep_curl")
+    for row in angles:
+        classifier.update(row)
+    feed(detector, angles, times)
+    switch_recognized_exercise(detector, classifier, "squat")
+    assert_same_detector(detector, WorkoutDetector("squat"))
+
+    # Without a set to save, the whole window is replayed, untimed
+    classifier = ExerciseClassifier()
+    detector = WorkoutDetector()
+    for row in angles:
+        classifier.update(row)
+    saved = []
+    switch_recognized_exercise(detector, classifier, "squat", save_set=saved.append)
+    expected = WorkoutDetector("squat")
+    feed(expected, angles[-classifier.window:], [None] * classifier.window)
+    assert expected.rep_count > 0
+    assert_same_detector(detector, expected)
+    assert saved == []
+
+
+def test_sync_detector_follows_the_choice(angle_series):
+    angles, times = curls_then_squats(angle_series)
+    classifier = ExerciseClassifier()
+    detector = WorkoutDetector()
+    saved = []
+    for row, timestamp in zip(angles, times):
+        angle_data = dict(zip(ANGLE_KEYS, row.tolist()))
+        classifier.sync_detector(detector, AUTO_EXERCISE, angle_data, timestamp=timestamp,
+                                 save_set=lambda finished: saved.append((finished.workout_type, finished.rep_count)))
+        detector.detectReps(angle_data, timestamp=timestamp)
+        detector.detectPosture(angle_data)
+        if not saved:
+            assert detector.workout_type in (DEFAULT_EXERCISE, "bicep_curl")
+    assert [workout_type for workout_type, _ in saved] == ["bicep_curl"]
+    assert detector.workout_type == "squat"
+    assert detector.rep_count > 0
+
+    classifier.sync_detector(detector, "pushup", {})
+    assert detector.workout_type == "pushup"
@@ -0,0 +1,45 @@
+"""
+Frame Buffer Tests
+A leased frame buffer must never be handed out again until it is released.
+"""
+from core_AI.frame_buffers import FrameBufferPool
+from core_AI.pipeline import LatestFrameQueue
+
+
+def test_leased_slots_are_skipped():
+    pool = FrameBufferPool(3)
+    assert [pool.next_slot() for _ in range(4)] == [0, 1, 2, 0]
+    assert pool.lease() == 0
+    assert [pool.next_slot() for _ in range(3)] == [1, 2, 1]
+
+    pool.release(0)
+    assert pool.next_slot() == 2
+    assert pool.next_slot() == 0
+
+
+def test_ring_grows_instead_of_overwriting_a_leased_frame():
+    pool = FrameBufferPool(2)
+    frames = []
+    for _ in range(3):
+        slot = pool.next_slot()
+        frames.append(pool.get(slot, "raw", (2, 2, 3)))
+        pool.lease()
+    assert pool.slots == 3
+    assert len({id(frame) for frame in frames}) == 3
+
+    for slot in range(3):
+        pool.release(slot)
+    assert pool.next_slot() == 0  # Once released, the slots are reused in ring order
+
+
+def test_queue_reports_dropped_items():
+    dropped = []
+    queue = LatestFrameQueue(1, on_drop=dropped.append)
+    queue.put("a")
+    queue.put("b")  # Replaces "a"
+    assert dropped == ["a"]
+    assert queue.get_nowait() == "b"  # Consumed items are not dropped
+
+    queue.put("c")
+    queue.clear()
+    assert dropped == ["a", "c"]
@@ -0,0 +1,75 @@
+"""
+Kinematics Tests
+Velocities, accelerations and phase durations of known motions, at fixed and variable frame rates.
+"""
+import numpy as np
+import pytest
+
+from trackers.kinematics import EXTENDING, FLEXING, HOLDING, KinematicsTracker
+
+NAMES = ("elbow", "knee")
+
+
+def irregular_times(seconds, seed=0):
+    """Frame times between 15 and 60 FPS."""
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.uniform(1 / 60, 1 / 15, int(seconds * 60)))
+    return times[times < seconds]
+
+
+def test_constant_velocity_at_a_variable_frame_rate():
+    tracker = KinematicsTracker(NAMES)
+    rates = np.array([-40.0, 25.0])  # deg/s
+    for time in irregular_times(2.0):
+        tracker.update(150.0 + rates * time, time)
+    np.testing.assert_allclose(tracker.velocity, rates, rtol=1e-9)
+    np.testing.assert_allclose(tracker.acceleration, 0.0, atol=1e-9)
+    assert tracker.phase.tolist() == [FLEXING, EXTENDING]
+
+
+def test_constant_acceleration():
+    tracker = KinematicsTracker(NAMES, window=5)
+    accelerations = np.array([30.0, -12.0])  # deg/s^2
+    for time in np.arange(0, 2.0, 1 / 30):
+        tracker.update(100.0 + accelerations / 2 * time ** 2, time)
+    # At a steady frame rate, finite differences over the window are exact for a parabola
+    np.testing.assert_allclose(tracker.acceleration, accelerations, rtol=1e-9)
+
+
+def test_phase_durations_of_a_rep():
+    # Lowering 180 -> 90 degrees in 1.2 s, a 0.5 s pause, lifting back up in 0.6 s, then still
+    times = np.arange(0, 3.5, 1 / 30)
+    angles = np.interp(times, [0.0, 0.3, 1.5, 2.0, 2.6, 3.5], [180, 180, 90, 90, 180, 180])
+    tracker = KinematicsTracker(NAMES)
+    phases = []
+    for time, angle in zip(times, angles):
+        tracker.update([angle, 170.0], time)
+        phases.append(int(tracker.phase[0]))
+    assert [phase for index, phase in enumerate(phases) if index == 0 or phase != phases[index - 1]] == \
+        [HOLDING, FLEXING, HOLDING, EXTENDING, HOLDING]
+    elbow = tracker.joint("elbow")
+    lag = (tracker.window - 1) / 30  # A phase is seen to start and end within one window of frames
+    assert elbow["last_flexion"] == pytest.approx(1.2, abs=lag)
+    assert elbow["last_extension"] == pytest.approx(0.6, abs=lag)
+    assert np.isnan(tracker.joint("knee")["last_flexion"])  # The knee never moved
+
+
+def test_small_movements_do_not_count_as_phases():
+    tracker = KinematicsTracker(NAMES, min_range=15.0)
+    times = np.arange(0, 3.0, 1 / 30)
+    for time in times:
+        tracker.update([150.0 + 5.0 * np.sin(2 * np.pi * time), 170.0], time)  # +-5 degrees, fast enough to move
+    assert np.isnan(tracker.last_flexion[0]) and np.isnan(tracker.last_extension[0])
+
+
+def test_gaps_and_repeated_frames():
+    tracker = KinematicsTracker(NAMES)
+    for time in np.arange(0, 0.5, 1 / 30):
+        tracker.update([150.0 - 60.0 * time, 170.0], time)
+    velocity = tracker.velocity.copy()
+    tracker.update([0.0, 0.0], time)  # Repeated timestamp: ignored
+    np.testing.assert_array_equal(tracker.velocity, velocity)
+
+    tracker.update([120.0, 170.0], time + 2.0)  # Longer than max_gap: the history starts over
+    tracker.update([121.0, 170.0], time + 2.0 + 1 / 30)
+    np.testing.assert_allclose(tracker.velocity, [30.0, 0.0])
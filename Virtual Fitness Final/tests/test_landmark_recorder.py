@@ -0,0 +1,89 @@
+"""
+Landmark Recorder Tests
+Frames written by LandmarkRecorder must read back the same through the LandmarkRecording memory map.
+"""
+import struct
+
+import numpy as np
+import pytest
+
+from core_AI.angle_utils import AngleCalculator
+from core_AI.landmark_recorder import HEADER_SIZE, MAGIC, LandmarkRecorder, LandmarkRecording, record_dtype
+
+
+def random_frames(count, seed=0):
+    """(count, 33, 4) landmarks and world landmarks, with visibilities in [0.5, 1]."""
+    rng = np.random.default_rng(seed)
+    landmarks = rng.uniform(0.0, 1.0, (count, 33, 4)).astype(np.float32)
+    world = rng.uniform(-1.0, 1.0, (count, 33, 4)).astype(np.float32)
+    landmarks[:, :, 3] = world[:, :, 3] = rng.uniform(0.5, 1.0, (count, 33))
+    return landmarks, world
+
+
+@pytest.mark.parametrize("precision, tolerance", (("float16", 1e-3), ("float32", 0.0)))
+def test_round_trip(tmp_path, precision, tolerance):
+    path = str(tmp_path / "session.vflm")
+    landmarks, _ = random_frames(10)
+    with LandmarkRecorder(path, precision=precision, buffer_frames=4) as recorder:  # Several block writes
+        for frame in range(10):
+            recorder.append(None if frame == 3 else landmarks[frame], 100.0 + frame / 30.0)
+
+    recording = LandmarkRecording(path)
+    assert len(recording) == 10
+    assert not recording.has_world_landmarks and recording.world_landmarks is None
+    np.testing.assert_array_equal(recording.timestamps, 100.0 + np.arange(10) / 30.0)
+    assert recording[3] == (100.1, None, None)
+    for frame, (timestamp, frame_landmarks, world) in enumerate(recording):
+        if frame == 3:
+            continue
+        assert timestamp == 100.0 + frame / 30.0
+        np.testing.assert_allclose(frame_landmarks, landmarks[frame], atol=tolerance)
+        assert world is None
+
+
+def test_world_landmarks_round_trip(tmp_path):
+    path = str(tmp_path / "session.vflm")
+    landmarks, world = random_frames(6, seed=1)
+    with LandmarkRecorder(path, world_landmarks=True) as recorder:
+        for frame in range(6):
+            recorder.append(landmarks[frame], frame / 30.0, None if frame == 2 else world[frame])
+
+    recording = LandmarkRecording(path)
+    assert recording.has_world_landmarks
+    np.testing.assert_allclose(recording.world_landmarks[0], world[0], atol=1e-3)
+    assert recording[2][2] is None  # A frame whose backend gave no world landmarks
+    np.testing.assert_allclose(recording[4][2], world[4], atol=1e-3)
+
+    # 3D angles of a replay are those of the recorded world landmarks
+    angle_calc = AngleCalculator(angles_3d=True)
+    angles = recording.joint_angles(angle_calc)
+    expected = angle_calc.compute(recording[4][1], recording[4][2])
+    np.testing.assert_allclose(angles[4], expected, atol=1e-3)
+
+
+def test_version_1_files_are_read(tmp_path):
+    path = tmp_path / "old.vflm"
+    landmarks, _ = random_frames(3, seed=2)
+    records = np.zeros(3, dtype=record_dtype(2))
+    records["timestamp"] = [0.0, 0.5, 1.0]
+    records["landmarks"] = landmarks
+    path.write_bytes(struct.pack("<4sHHHH4x", MAGIC, 1, 33, 4, 2) + records.tobytes())
+
+    recording = LandmarkRecording(str(path))
+    assert len(recording) == 3 and not recording.has_world_landmarks
+    np.testing.assert_allclose(recording[1][1], landmarks[1], atol=1e-3)
+
+
+def test_partial_last_record_is_ignored(tmp_path):
+    path = str(tmp_path / "crashed.vflm")
+    landmarks, _ = random_frames(5, seed=3)
+    with LandmarkRecorder(path) as recorder:
+        for frame in range(5):
+            recorder.append(landmarks[frame], float(frame))
+    with open(path, "r+b") as f:
+        f.truncate(HEADER_SIZE + 4 * record_dtype(2).itemsize + 100)  # Cut off mid-record
+
+    assert len(LandmarkRecording(path)) == 4
+    with open(path, "r+b") as f:
+        f.truncate(HEADER_SIZE)
+    assert len(LandmarkRecording(path)) == 0
@@ -0,0 +1,69 @@
+"""
+Latency Governor Tests
+Level changes of the governor under known inference latencies: when it steps down,
+when it steps back up, and how it stops trying an upgrade that does not hold.
+"""
+from core_AI.latency_governor import DEFAULT_LEVELS, LatencyGovernor
+
+
+def run(governor, latency, frames):
+    """
+    Runs inference on every frame; latency(level) gives its duration in ms.
+
+    Returns:
+        list: (frame, new level) of every change.
+    """
+    changes = []
+    for frame in range(1, frames + 1):
+        governor.tick()
+        if governor.record(latency(governor.level)):
+            changes.append((frame, governor.level))
+    return changes
+
+
+def test_waits_for_a_full_window():
+    governor = LatencyGovernor(window=30)
+    assert run(governor, lambda level: 100.0, 29) == []
+    assert governor.record(100.0)  # 30th sample: far over budget
+    assert governor.level == 2 and len(governor.samples) == 0  # The window refills at the new level
+
+
+def test_steps_down_until_within_budget():
+    # Inference costs 60 ms at any level: only skipping frames brings it under 33 ms per frame
+    governor = LatencyGovernor(target_ms=33.0, window=10)
+    assert run(governor, lambda level: 60.0, 100) == [(10, 2), (20, 3)]
+    assert (governor.model_complexity, governor.inference_interval) == (0, 2)
+
+
+def test_no_switching_inside_the_hysteresis_band():
+    # 25 ms fits the 33 ms budget, but not comfortably enough (< 0.6 * 33 ms) to step up
+    governor = LatencyGovernor(target_ms=33.0, start_level=2)
+    assert run(governor, lambda level: 25.0, 1000) == []
+
+
+def test_steps_up_after_the_cooldown():
+    governor = LatencyGovernor(target_ms=33.0, start_level=3, cooldown_frames=60)
+    assert run(governor, lambda level: 15.0, 400) == [(60, 2), (120, 1), (180, 0)]
+
+
+def test_failed_upgrades_back_off():
+    # The heaviest model is over budget, the next one is well under it
+    governor = LatencyGovernor(target_ms=33.0, start_level=1, window=30, cooldown_frames=60)
+    changes = run(governor, lambda level: 50.0 if level == 0 else 15.0, 1200)
+    frames = [frame for frame, _ in changes]
+    # Each undone upgrade doubles the wait before the next attempt: 60, 120, 240, 480 frames
+    assert [level for _, level in changes] == [0, 1] * 4
+    assert [later - earlier for earlier, later in zip(frames[1::2], frames[2::2])] == [120, 240, 480]
+
+
+def test_level_for_and_describe():
+    assert LatencyGovernor.level_for(2) == 0
+    assert LatencyGovernor.level_for(0) == 2
+    assert LatencyGovernor.level_for(5) == 0
+    assert LatencyGovernor.level_for(1, levels=((0, 1), (1, 2))) == 1
+
+    governor = LatencyGovernor(levels=DEFAULT_LEVELS, start_level=4)
+    assert governor.describe() == "Model 0, every 3 frames"
+    governor.record(12.4)
+    assert governor.describe() == "Model 0, every 3 frames (12 ms)"
+    assert LatencyGovernor(start_level=1).describe() == "Model 1, every frame"
@@ -0,0 +1,91 @@
+"""
+Rep Counter Tests
+count_reps() must find the same reps as feeding every frame to WorkoutDetector.detectReps().
+"""
+import numpy as np
+import pytest
+
+from trackers.exercise_definitions import ANGLE_KEYS, IN_REP, OUT_OF_REP, get_exercise
+from trackers.rep_counter import _condition_mask, _count_with_loop, count_reps
+from trackers.workout_detector import WorkoutDetector
+
+EXERCISES = ("pushup", "squat", "bicep_curl", "general")
+
+
+def detector_reps(angles, workout_type, confidence=None):
+    """(count, start frames, end frames, in_rep) of a series fed frame by frame to a WorkoutDetector."""
+    detector = WorkoutDetector(workout_type)
+    starts, ends = [], []
+    start = -1
+    for frame, row in enumerate(angles):
+        previous_count, previous_in_rep = detector.rep_count, detector.in_rep
+        detector.detectReps(dict(zip(ANGLE_KEYS, row.tolist())),
+                            confidence=1.0 if confidence is None else float(confidence[frame]))
+        if detector.in_rep and not previous_in_rep:
+            start = frame
+        if detector.rep_count > previous_count:
+            starts.append(start)
+            ends.append(frame)
+    return detector.rep_count, starts, ends, detector.in_rep
+
+
+def assert_same_reps(result, expected):
+    count, starts, ends, in_rep = expected
+    assert result.count == count
+    assert result.starts.tolist() == starts
+    assert result.ends.tolist() == ends
+    assert result.in_rep == in_rep
+
+
+@pytest.mark.parametrize("exercise", EXERCISES)
+@pytest.mark.parametrize("seed", range(3))
+def test_count_matches_detector(angle_series, exercise, seed):
+    angles = angle_series(exercise, seconds=20, noise=6.0, depth=0.9, seed=seed)
+    result = count_reps(angles, exercise)
+    assert result.count > 0
+    assert_same_reps(result, detector_reps(angles, exercise))
+
+
+@pytest.mark.parametrize("exercise", EXERCISES)
+def test_missing_and_untrusted_frames_are_ignored(angle_series, exercise):
+    rng = np.random.default_rng(4)
+    angles = angle_series(exercise, seconds=20, seed=4)
+    angles[rng.random(len(angles)) < 0.1] = np.nan  # Frames without a pose
+    confidence = rng.uniform(0.0, 1.0, len(angles))
+
+    result = count_reps(angles, exercise, confidence=confidence)
+    assert_same_reps(result, detector_reps(angles, exercise, confidence))
+
+
+def test_column_order_follows_keys(angle_series):
+    angles = angle_series("squat", seed=5)
+    order = [3, 1, 0, 2]
+    shuffled = count_reps(angles[:, order], "squat", keys=tuple(ANGLE_KEYS[i] for i in order))
+    assert shuffled.ends.tolist() == count_reps(angles, "squat").ends.tolist()
+
+
+def test_chunks_continue_with_in_rep(angle_series):
+    angles = angle_series("pushup", seconds=30, seed=6)
+    whole = count_reps(angles, "pushup")
+
+    ends, in_rep = [], False
+    for start in range(0, len(angles), 37):  # Chunk edges fall inside reps
+        chunk = count_reps(angles[start:start + 37], "pushup", in_rep=in_rep)
+        ends.extend((chunk.ends + start).tolist())
+        in_rep = chunk.in_rep
+    assert ends == whole.ends.tolist()
+    assert in_rep == whole.in_rep
+
+
+@pytest.mark.parametrize("exercise", EXERCISES)
+def test_loop_fallback_matches_vectorized_pass(angle_series, exercise):
+    angles = angle_series(exercise, seconds=20, noise=6.0, seed=7)
+    transitions = get_exercise(exercise).transitions
+    enter = _condition_mask(angles, transitions[OUT_OF_REP][0])
+    exit_ = _condition_mask(angles, transitions[IN_REP][0])
+
+    starts, ends, in_rep = _count_with_loop(enter, exit_, False)
+    result = count_reps(angles, exercise)
+    assert starts.tolist() == result.starts.tolist()
+    assert ends.tolist() == result.ends.tolist()
+    assert in_rep == result.in_rep
@@ -0,0 +1,69 @@
+"""
+Rep Records Tests
+Saved rep times are relative to the set's first frame, and missing values become None.
+"""
+import json
+
+import numpy as np
+import pytest
+
+from trackers.rep_records import RepRecordBuffer
+
+JOINTS = ("ELBOW_ANGLE", "KNEE_ANGLE")
+
+
+def record_rep(buffer, start, end, angles, scores, **finish):
+    buffer.begin(start, angles[0])
+    for row in angles[1:]:
+        buffer.update(row)
+    for score in scores:
+        buffer.add_posture(score)
+    return buffer.finish(end, **finish)
+
+
+def test_times_are_relative_to_the_first_frame():
+    buffer = RepRecordBuffer(JOINTS)
+    buffer.mark_origin(5000.0)  # e.g. a perf_counter() reading
+    buffer.mark_origin(5001.0)  # Later frames do not move the origin
+    record_rep(buffer, 5002.5, 5004.0, [[160.0, 170.0], [70.0, 168.0], [158.0, 171.0]], [80.0, 90.0],
+               eccentric=0.8, concentric=0.7, shape_score=70.0)
+
+    (record,) = buffer.to_list()
+    assert record["start"] == 2.5 and record["end"] == 4.0 and record["duration"] == 1.5
+    assert record["rom"] == {"ELBOW_ANGLE": [70.0, 160.0], "KNEE_ANGLE": [168.0, 171.0]}
+    assert record["timeUnderTension"] == pytest.approx(1.5)
+    assert (record["postureMean"], record["postureMin"]) == (85.0, 80.0)
+    assert record["quality"] == 77.5  # Posture and shape blended
+    assert buffer.posture_scores() == [85.0]
+
+
+def test_missing_values_become_none():
+    buffer = RepRecordBuffer(JOINTS, capacity=1)
+    # Untimed frames and no posture, tempo or shape scores
+    buffer.mark_origin(0.0)
+    record_rep(buffer, None, None, [[160.0, 170.0]], [])
+    record = buffer.to_list()[0]
+    for key in ("start", "end", "duration", "eccentric", "concentric", "timeUnderTension",
+                "postureMean", "postureMin", "shapeScore", "quality"):
+        assert record[key] is None, key
+    json.dumps(buffer.to_list(), allow_nan=False)  # Valid JSON for the repRecords column
+
+    # Without an origin (no timestamped frame yet) times cannot be placed, only durations
+    buffer = RepRecordBuffer(JOINTS)
+    record_rep(buffer, 10.0, 11.25, [[160.0, 170.0]], [90.0])
+    record = buffer.to_list()[0]
+    assert record["start"] is None and record["end"] is None and record["duration"] == 1.25
+
+
+def test_clear_starts_a_new_set():
+    buffer = RepRecordBuffer(JOINTS, capacity=1)  # Grows as reps are added
+    buffer.mark_origin(100.0)
+    for rep in range(3):
+        record_rep(buffer, 101.0 + rep, 101.5 + rep, [[160.0, 170.0]], [90.0])
+    assert [record["start"] for record in buffer.to_list()] == [1.0, 2.0, 3.0]
+
+    buffer.clear()
+    assert buffer.to_list() == [] and np.isnan(buffer.origin)
+    buffer.mark_origin(200.0)
+    record_rep(buffer, 200.5, 201.0, [[160.0, 170.0]], [90.0])
+    assert buffer.to_list()[0]["start"] == 0.5
@@ -0,0 +1,104 @@
+"""
+Rep Templates Tests
+The vectorized, early-abandoning DTW search must find the same distances and
+nearest references as a brute-force dynamic program.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from trackers.exercise_definitions import ANGLE_KEYS
+from trackers.rep_counter import count_reps
+from trackers.rep_templates import RepTemplateLibrary, dtw_distances, envelope, lb_keogh, resample
+from trackers.workout_detector import WorkoutDetector
+
+
+def brute_force_dtw(query, reference, band):
+    """Squared DTW distance under a Sakoe-Chiba band, the textbook O(L^2) table."""
+    length = len(query)
+    table = np.full((length + 1, length + 1), np.inf)
+    table[0, 0] = 0.0
+    for i in range(1, length + 1):
+        for j in range(max(1, i - band), min(length, i + band) + 1):
+            cost = ((query[i - 1] - reference[j - 1]) ** 2).sum()
+            table[i, j] = cost + min(table[i - 1, j - 1], table[i - 1, j], table[i, j - 1])
+    return table[length, length]
+
+
+def rep_cycles(angles, exercise):
+    """Counted reps of a series, from their enter frame to their exit frame."""
+    reps = count_reps(angles, exercise)
+    return [angles[start:end + 1] for start, end in zip(reps.starts, reps.ends) if start >= 0]
+
+
+@pytest.mark.parametrize("band", (1, 3, 8))
+def test_dtw_matches_brute_force(band):
+    rng = np.random.default_rng(band)
+    query = rng.normal(0.0, 10.0, (32, 3))
+    references = rng.normal(0.0, 10.0, (20, 32, 3))
+
+    expected = [brute_force_dtw(query, reference, band) for reference in references]
+    np.testing.assert_allclose(dtw_distances(query, references, band), expected, rtol=1e-12)
+
+
+def test_early_abandoning_only_drops_references_that_cannot_win():
+    rng = np.random.default_rng(0)
+    query = rng.normal(0.0, 10.0, (32, 2))
+    references = query + rng.normal(0.0, 1.0, (30, 32, 2)) * rng.uniform(0.5, 8.0, (30, 1, 1))
+    band = 3
+    expected = np.array([brute_force_dtw(query, reference, band) for reference in references])
+    best_so_far = float(np.median(expected))
+
+    lower, upper = envelope(references, band)
+    contributions = lb_keogh(query, lower, upper)
+    assert (contributions.sum(axis=1) <= expected + 1e-9).all()  # A lower bound
+
+    for tail_bounds in (None, contributions):
+        distances = dtw_distances(query, references, band, best_so_far, tail_bounds)
+        kept = np.isfinite(distances)
+        np.testing.assert_allclose(distances[kept], expected[kept], rtol=1e-12)
+        assert (expected[~kept] >= best_so_far).all()
+        assert kept[expected < best_so_far].all()
+
+
+def test_nearest_matches_brute_force(angle_series):
+    library = RepTemplateLibrary(chunk=4)
+    for seed in range(10):
+        library.add_series("squat", angle_series("squat", seconds=15, noise=2.0, depth=1.0 + 0.01 * seed,
+                                                 period=2.0 + 0.1 * seed, seed=seed))
+    assert library.count("squat") > library.chunk
+
+    columns = library.columns("squat")
+    templates = library.templates("squat")[:, :, columns]
+    queries = (rep_cycles(angle_series("squat", seconds=10, noise=2.0, seed=20), "squat")
+               + rep_cycles(angle_series("squat", seconds=10, noise=8.0, period=1.5, seed=21), "squat"))
+    assert queries
+    for rep in queries:
+        query = resample(rep, library.length)[:, columns]
+        expected = [brute_force_dtw(query, template, library.band) for template in templates]
+        distance, index = library.nearest("squat", rep)
+        assert distance == pytest.approx(min(expected), rel=1e-12)
+        assert expected[index] == pytest.approx(min(expected), rel=1e-12)
+
+
+def test_detector_cycles_match_reference_cycles(angle_series, tmp_path):
+    # A set scored against references cut from itself must score 100 on every rep with a whole cycle
+    angles = angle_series("pushup", seconds=15, noise=2.0, seed=30)
+    library = RepTemplateLibrary()
+    added = library.add_series("pushup", angles)
+    assert added > 0
+
+    path = str(tmp_path / "templates.npz")
+    library.save(path)
+    detector = WorkoutDetector("pushup", rep_templates=RepTemplateLibrary.load(path))
+    for frame, row in enumerate(angles):
+        detector.detectReps(dict(zip(ANGLE_KEYS, row.tolist())), timestamp=frame / 30.0)
+    shape_scores = [score for score in detector.rep_records.records["shape_score"].tolist() if not math.isnan(score)]
+    assert len(shape_scores) == added
+    assert shape_scores == pytest.approx([100.0] * added, abs=1e-3)
+
+
+def test_score_without_references_is_nan(angle_series):
+    rep = rep_cycles(angle_series("squat", seconds=10, seed=40), "squat")[0]
+    assert math.isnan(RepTemplateLibrary().score("squat", rep))
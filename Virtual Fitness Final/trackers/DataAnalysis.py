@@ -63,4 +63,5 @@ def testing():
     print("=" * 50)
     print(df_squat_today[['id','workoutType','time_friendly','reps','duration']])
 
-testing()
\ No newline at end of file
+if __name__ == "__main__":
+    testing()
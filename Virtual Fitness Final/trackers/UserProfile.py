@@ -32,4 +32,5 @@ def test():
   user = UserProfile("Youssef Beshnack", 20, 73.2, "Male", 3000, 2000)
   user.saveUser()
 
-test()
\ No newline at end of file
+if __name__ == "__main__":
+  test()
@@ -137,4 +137,5 @@ def test():
     print(WorkoutSession.all_sessions)
     # print(WorkoutSession.all_sessions)
 
-test()
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,265 @@
+"""
+Detector Fleet Module
+Rep and posture detection for many athletes at once (e.g. a whole gym floor
+behind one aggregation server).
+
+Instead of one WorkoutDetector object per athlete, DetectorFleet keeps the
+state of N athletes in numpy arrays (struct of arrays) and advances all of
+them for a (N, 4) matrix of angle vectors in one vectorized step:
+
+    fleet = DetectorFleet(200, "squat")
+    reps, scores, feedback_codes = fleet.step(angles, confidence)
+    fleet.feedback_text(feedback_codes)  # Messages, when they are displayed
+
+Athletes can do different exercises; the exercise definitions (see
+exercise_definitions.py) are compiled into per-exercise threshold tables that
+are gathered by each athlete's exercise index.
+
+fleet.athlete(i) returns a view with the single-athlete WorkoutDetector API
+(detectReps, detectPosture, reset, ...), so existing code can run on a fleet
+row unchanged. Tempo coaching and rep records need per-athlete timestamps and
+stay with WorkoutDetector.
+"""
+import numpy as np
+
+from trackers.exercise_definitions import ANGLE_KEYS, IN_REP, JOINTS, OUT_OF_REP, get_exercise_definitions
+
+
+def _condition_bounds(conditions: tuple) -> tuple:
+    """((column, low, high), ...) -> (low, high) arrays over JOINTS; several conditions on a joint intersect."""
+    low = np.full(len(JOINTS), -np.inf)
+    high = np.full(len(JOINTS), np.inf)
+    for column, condition_low, condition_high in conditions:
+        low[column] = max(low[column], condition_low)
+        high[column] = min(high[column], condition_high)
+    return low, high
+
+
+class DetectorFleet:
+    """
+    WorkoutDetector state for N athletes, advanced with vectorized steps.
+
+    Rows whose angles contain NaN are treated as "no frame for this athlete"
+    and left untouched, so athletes can be stepped together even when some
+    streams have not delivered a new frame.
+    """
+
+    def __init__(self, size: int, workout_type: str = "general", min_confidence: float = 0.5):
+        """
+        Args:
+            size (int): Number of athletes.
+            workout_type (str): Initial exercise of every athlete.
+            min_confidence (float): Frames with a lower angle confidence are ignored (see WorkoutDetector).
+        """
+        self.size = size
+        self.min_confidence = min_confidence
+
+        # Exercise tables: one row per definition
+        self.exercises = tuple(get_exercise_definitions().values())
+        self.exercise_index = {exercise.id: index for index, exercise in enumerate(self.exercises)}
+        bounds = [(_condition_bounds(exercise.transitions[OUT_OF_REP][0]),
+                   _condition_bounds(exercise.transitions[IN_REP][0])) for exercise in self.exercises]
+        # (E, 2 states, J) bounds of the condition that leaves each state
+        self._low = np.array([[enter[0], exit_[0]] for enter, exit_ in bounds])
+        self._high = np.array([[enter[1], exit_[1]] for enter, exit_ in bounds])
+
+        # Feedback codes: 0 = "", then each exercise's default feedback and correction messages
+        self.feedback_messages = [""]
+        self._default_code = np.zeros(len(self.exercises), dtype=np.int32)
+        self._correction_base = np.zeros(len(self.exercises), dtype=np.int32)
+        for index, exercise in enumerate(self.exercises):
+            self._default_code[index] = len(self.feedback_messages)
+            self.feedback_messages.append(exercise.feedback)
+            self._correction_base[index] = len(self.feedback_messages)
+            self.feedback_messages.extend(exercise.messages)
+
+        # Per-athlete state
+        self.exercise = np.zeros(size, dtype=np.int32)
+        self.rep_count = np.zeros(size, dtype=np.int64)
+        self.in_rep = np.zeros(size, dtype=bool)
+        self.last_score = np.full(size, 100, dtype=np.int64)
+        self.last_feedback = np.zeros(size, dtype=np.int32)
+        self.skipped_frames = np.zeros(size, dtype=np.int64)
+        self.set_workout_type(workout_type)
+
+    # Configuration =================================================================================
+    def _exercise_id(self, workout_type: str) -> int:
+        """Index of an exercise; unknown types fall back to "general", like WorkoutDetector."""
+        index = self.exercise_index.get(workout_type.lower())
+        return self.exercise_index["general"] if index is None else index
+
+    def set_workout_type(self, workout_type: str, rows=None):
+        """Switches athletes (all by default) to another exercise; rep counts are kept."""
+        rows = slice(None) if rows is None else rows
+        self.exercise[rows] = self._exercise_id(workout_type)
+        self.in_rep[rows] = False
+
+    def workout_type(self, row: int) -> str:
+        return self.exercises[self.exercise[row]].id
+
+    def reset(self, rows=None):
+        """Resets the rep counters and state of athletes (all by default)."""
+        rows = slice(None) if rows is None else rows
+        self.rep_count[rows] = 0
+        self.in_rep[rows] = False
+        self.last_score[rows] = 100
+        self.last_feedback[rows] = 0
+        self.skipped_frames[rows] = 0
+
+    # Vectorized steps ==============================================================================
+    def _accepted(self, angles: np.ndarray, confidence, rows, count_skipped: bool = True) -> np.ndarray:
+        """Mask of the angle rows that have a frame and pass the confidence gate."""
+        has_frame = ~np.isnan(angles).any(axis=1)
+        if confidence is None:
+            return has_frame
+        # Written so that a NaN confidence is rejected too
+        trusted = np.asarray(confidence) >= self.min_confidence
+        if count_skipped:
+            # Like WorkoutDetector, skipped frames are counted by the rep update only
+            self.skipped_frames[rows[has_frame & ~trusted]] += 1
+        return has_frame & trusted
+
+    def update_reps(self, angles: np.ndarray, confidence=None, rows=None, accepted=None) -> np.ndarray:
+        """
+        detectReps() for many athletes.
+
+        Args:
+            angles (np.ndarray): (n, len(JOINTS)) angles in JOINTS order, one row per athlete in `rows`.
+            confidence (np.ndarray, optional): (n,) angle confidence.
+            rows (np.ndarray, optional): Athlete indices of the angle rows (default: every athlete, in order).
+            accepted (np.ndarray, optional): Precomputed gate (used by step()).
+
+        Returns:
+            np.ndarray: (N,) rep counts of the whole fleet.
+        """
+        rows = np.arange(self.size) if rows is None else np.asarray(rows)
+        if accepted is None:
+            accepted = self._accepted(angles, confidence, rows)
+        rows = rows[accepted]
+        values = angles[accepted]
+
+        # Bounds of the condition that leaves each athlete's current state
+        exercise = self.exercise[rows]
+        state = self.in_rep[rows].astype(np.intp)
+        low = self._low[exercise, state]
+        high = self._high[exercise, state]
+        transition = ((values >= low) & (values <= high)).all(axis=1)
+
+        # enter: out -> in; exit: in -> out and one more rep
+        self.rep_count[rows[transition & (state == IN_REP)]] += 1
+        self.in_rep[rows[transition]] ^= True
+        return self.rep_count
+
+    def update_posture(self, angles: np.ndarray, confidence=None, rows=None, accepted=None) -> tuple:
+        """
+        detectPosture() for many athletes (same arguments as update_reps()).
+
+        Returns:
+            tuple: ((N,) last posture scores, (N,) last feedback codes) of the whole fleet.
+        """
+        rows = np.arange(self.size) if rows is None else np.asarray(rows)
+        if accepted is None:
+            accepted = self._accepted(angles, confidence, rows, count_skipped=False)
+        rows = rows[accepted]
+        values = angles[accepted]
+
+        # The posture rules differ per exercise: one vectorized pass per exercise present
+        exercise = self.exercise[rows]
+        for index in np.unique(exercise).tolist():
+            group = exercise == index
+            group_rows = rows[group]
+            scores, corrections = self.exercises[index].evaluate_posture_batch(values[group],
+                                                                              self.in_rep[group_rows])
+            self.last_score[group_rows] = scores
+            self.last_feedback[group_rows] = np.where(corrections >= 0, self._correction_base[index] + corrections,
+                                                      self._default_code[index])
+        return self.last_score, self.last_feedback
+
+    def step(self, angles: np.ndarray, confidence=None, rows=None) -> tuple:
+        """
+        One frame for many athletes: update_reps() then update_posture(), as a
+        WorkoutDetector user calls detectReps() then detectPosture().
+
+        Returns:
+            tuple: (rep counts, posture scores, feedback codes), each (N,) for the whole fleet.
+        """
+        angles = np.asarray(angles, dtype=np.float64)
+        rows = np.arange(self.size) if rows is None else np.asarray(rows)
+        accepted = self._accepted(angles, confidence, rows)
+        self.update_reps(angles, rows=rows, accepted=accepted)
+        scores, feedback = self.update_posture(angles, rows=rows, accepted=accepted)
+        return self.rep_count, scores, feedback
+
+    def feedback_text(self, codes) -> list:
+        """Feedback messages of a feedback code array."""
+        return [self.feedback_messages[code] for code in np.asarray(codes).tolist()]
+
+    def athlete(self, row: int) -> "AthleteView":
+        """Single-athlete WorkoutDetector API for one row of the fleet."""
+        return AthleteView(self, row)
+
+
+class AthleteView:
+    """
+    One athlete of a DetectorFleet behind the WorkoutDetector interface.
+    Every call advances only this athlete's row.
+    """
+
+    def __init__(self, fleet: DetectorFleet, row: int):
+        self.fleet = fleet
+        self.row = row
+        self._rows = np.array([row])
+
+    @property
+    def workout_type(self) -> str:
+        return self.fleet.workout_type(self.row)
+
+    @property
+    def min_confidence(self) -> float:
+        return self.fleet.min_confidence
+
+    @property
+    def rep_count(self) -> int:
+        return int(self.fleet.rep_count[self.row])
+
+    @rep_count.setter
+    def rep_count(self, value: int):
+        self.fleet.rep_count[self.row] = value
+
+    @property
+    def in_rep(self) -> bool:
+        return bool(self.fleet.in_rep[self.row])
+
+    @property
+    def last_feedback(self) -> str:
+        return self.fleet.feedback_messages[self.fleet.last_feedback[self.row]]
+
+    def _angle_row(self, angle_data: dict) -> np.ndarray:
+        return np.array([[angle_data.get(key, 180) for key in ANGLE_KEYS]], dtype=np.float64)
+
+    def set_workout_type(self, workout_type: str):
+        self.fleet.set_workout_type(workout_type, self._rows)
+
+    def detectReps(self, angle_data: dict, confidence: float = 1.0, timestamp: float = None) -> int:
+        """See WorkoutDetector.detectReps (timestamp is accepted for compatibility and ignored)."""
+        if angle_data:
+            self.fleet.update_reps(self._angle_row(angle_data), [confidence], self._rows)
+        return self.rep_count
+
+    def detectPosture(self, angle_data: dict, confidence: float = 1.0) -> tuple[int, str]:
+        """See WorkoutDetector.detectPosture."""
+        if not angle_data:
+            return 0, "No data."
+        self.fleet.update_posture(self._angle_row(angle_data), [confidence], self._rows)
+        return int(self.fleet.last_score[self.row]), self.last_feedback
+
+    def reset(self):
+        self.fleet.reset(self._rows)
+
+    def get_current_state(self) -> dict:
+        return {
+            "workout_type": self.workout_type,
+            "rep_count": self.rep_count,
+            "in_rep": self.in_rep,
+            "last_feedback": self.last_feedback
+        }
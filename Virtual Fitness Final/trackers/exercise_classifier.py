@@ -0,0 +1,262 @@
+"""
+Exercise Classifier Module
+Recognizes the exercise being performed from the angle stream, for the
+"auto" exercise choice.
+
+Nearest-centroid classification over a sliding window: the features are the
+mean and the standard deviation of every joint angle over the last `window`
+frames, kept up to date incrementally (running sums over a ring buffer, so a
+frame costs the same whatever the window size). The centroids are the
+signatures of the exercise definitions (see exercise_definitions.py) and can
+be refined from labelled recordings with train().
+
+The recognized exercise only changes when the same candidate wins `hold`
+evaluations in a row, clearly ahead of the runner-up, so the detector's
+thresholds do not flip back and forth during a set.
+"""
+import numpy as np
+
+from trackers.exercise_definitions import ANGLE_KEYS, AUTO_EXERCISE, DEFAULT_EXERCISE, JOINTS, get_exercise_definitions
+
+# Feature = (mean, std) of each joint; distances are measured in these units (degrees)
+MEAN_SCALE = 20.0
+STD_SCALE = 10.0
+
+
+class ExerciseClassifier:
+    """
+    Online nearest-centroid exercise recognition.
+
+    Usage:
+        classifier = ExerciseClassifier()
+        exercise = classifier.update(angle_vector)  # Every frame; None until an exercise is recognized
+    """
+
+    def __init__(self, window: int = 90, interval: int = 5, hold: int = 6, min_motion: float = 8.0,
+                 max_distance: float = 2.0, margin: float = 0.7):
+        """
+        Args:
+            window (int): Frames the features are computed over (~3 s at 30 FPS, one or two reps).
+            interval (int): Frames between two classifications.
+            hold (int): Consecutive wins a new exercise needs before it is selected.
+            min_motion (float): Smallest angle standard deviation (degrees, on any joint) that
+                counts as exercising; still windows are not classified.
+            max_distance (float): Windows farther than this from every centroid are not classified.
+            margin (float): The best distance must be below margin x the runner-up's.
+        """
+        self.window = window
+        self.interval = interval
+        self.hold = hold
+        self.min_motion = min_motion
+        self.max_distance = max_distance
+        self.margin = margin
+
+        definitions = [definition for definition in get_exercise_definitions().values() if definition.signature]
+        self.labels = tuple(definition.id for definition in definitions)
+        # (E, 2J) centroids: joint means then joint standard deviations (NaN = not part of the signature)
+        self.centroids = np.array([definition.signature[0] + definition.signature[1]
+                                   for definition in definitions], dtype=np.float64).reshape(len(definitions), -1)
+        self._scale = np.concatenate((np.full(len(JOINTS), MEAN_SCALE), np.full(len(JOINTS), STD_SCALE)))
+        self._used = ~np.isnan(self.centroids)
+        self._trained = np.zeros(len(definitions))  # Training windows averaged into each centroid
+
+        self._buffer = np.zeros((window, len(JOINTS)))
+        self._times = np.full(window, np.nan)  # Frame timestamps (NaN when not given)
+        self._sum = np.zeros(len(JOINTS))
+        self._sum_squares = np.zeros(len(JOINTS))
+        self.reset()
+
+    def reset(self):
+        """Forgets the window and the recognized exercise."""
+        self._head = 0
+        self._count = 0
+        self._frames = 0
+        self._sum[:] = 0.0
+        self._sum_squares[:] = 0.0
+        self.current = None
+        self._candidate = None
+        self._streak = 0
+
+    def update(self, values, timestamp: float = None) -> str:
+        """
+        Adds one frame and, every `interval` frames, classifies the window.
+
+        Args:
+            values: Angle vector in JOINTS order.
+            timestamp (float, optional): Frame time in seconds, kept for window_times().
+
+        Returns:
+            str: The recognized exercise ID, or None while nothing has been recognized.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if np.isnan(values).any():
+            return self.current
+        head = self._head
+        if self._count == self.window:
+            # The oldest frame leaves the window
+            old = self._buffer[head]
+            self._sum -= old
+            self._sum_squares -= old * old
+        else:
+            self._count += 1
+        self._buffer[head] = values
+        self._times[head] = np.nan if timestamp is None else timestamp
+        self._sum += values
+        self._sum_squares += values * values
+        self._head = (head + 1) % self.window
+        if self._head == 0:
+            # Recompute the running sums once per lap so rounding errors cannot accumulate
+            self._sum[:] = self._buffer.sum(axis=0)
+            self._sum_squares[:] = (self._buffer * self._buffer).sum(axis=0)
+
+        self._frames += 1
+        if self._frames % self.interval == 0 and self._count >= self.window // 2:
+            self._vote(self.classify())
+        return self.current
+
+    def features(self) -> np.ndarray:
+        """(2J,) joint means and standard deviations over the current window."""
+        count = max(self._count, 1)
+        mean = self._sum / count
+        variance = np.maximum(self._sum_squares / count - mean * mean, 0.0)
+        return np.concatenate((mean, np.sqrt(variance)))
+
+    def distances(self, features: np.ndarray) -> np.ndarray:
+        """(E,) mean squared scaled distance of a feature vector to every centroid (over its signature joints)."""
+        difference = np.where(self._used, (features - self.centroids) / self._scale, 0.0)
+        return (difference * difference).sum(axis=1) / self._used.sum(axis=1)
+
+    def classify(self):
+        """
+        Classifies the current window.
+
+        Returns:
+            str: Exercise ID of the nearest centroid, or None when the window is still,
+            too far from every centroid, or ambiguous.
+        """
+        features = self.features()
+        if not len(self.labels) or features[len(JOINTS):].max() < self.min_motion:
+            return None
+        distances = self.distances(features)
+        order = np.argsort(distances)
+        best = distances[order[0]]
+        if best > self.max_distance:
+            return None
+        if len(order) > 1 and best > self.margin * distances[order[1]]:
+            return None
+        return self.labels[order[0]]
+
+    def _vote(self, label):
+        """Switches the recognized exercise once the same label has won `hold` times in a row."""
+        if label is None or label == self.current:
+            self._candidate = None
+            self._streak = 0
+            return
+        if label == self._candidate:
+            self._streak += 1
+        else:
+            self._candidate = label
+            self._streak = 1
+        if self._streak >= self.hold:
+            self.current = label
+            self._candidate = None
+            self._streak = 0
+
+    def window_angles(self) -> np.ndarray:
+        """(n, J) angles of the current window, oldest first."""
+        if self._count < self.window:
+            return self._buffer[:self._count].copy()
+        return np.roll(self._buffer, -self._head, axis=0)
+
+    def window_times(self) -> np.ndarray:
+        """(n,) timestamps of the window_angles() rows (NaN where none was given)."""
+        if self._count < self.window:
+            return self._times[:self._count].copy()
+        return np.roll(self._times, -self._head)
+
+    def train(self, exercise_id: str, angles: np.ndarray, step: int = 15):
+        """
+        Moves a centroid toward labelled data: the features of every window of
+        `angles` (sliding by `step` frames) are averaged into it. Joints outside
+        the signature are left out, as in classification.
+
+        Args:
+            exercise_id (str): Label of the recording.
+            angles (np.ndarray): (T, J) angles in JOINTS order.
+            step (int): Frames between two training windows.
+        """
+        row = self.labels.index(exercise_id)
+        angles = np.asarray(angles, dtype=np.float64)
+        for start in range(0, max(len(angles) - self.window, 0) + 1, step):
+            window = angles[start:start + self.window]
+            window = window[~np.isnan(window).any(axis=1)]
+            if len(window) < self.window // 2:
+                continue
+            features = np.concatenate((window.mean(axis=0), window.std(axis=0)))
+            self._trained[row] += 1
+            used = self._used[row]
+            self.centroids[row, used] += (features[used] - self.centroids[row, used]) / (self._trained[row] + 1)
+
+    def sync_detector(self, detector, choice: str, angles: dict, confidence: float = 1.0, timestamp: float = None,
+                      save_set=None):
+        """
+        Keeps a WorkoutDetector on the selected exercise, once per frame before detectReps().
+        With the "auto" choice, the frame feeds the classifier and the detector follows the
+        recognized exercise (DEFAULT_EXERCISE until one is recognized).
+
+        Args:
+            detector (WorkoutDetector): Detector to keep in sync.
+            choice (str): Selected exercise ID, or AUTO_EXERCISE.
+            angles (dict): The frame's angles (AngleCalculator.essential_angles format).
+            confidence (float): The frame's angle confidence; untrusted frames are not classified.
+            timestamp (float, optional): Frame time in seconds.
+            save_set (callable, optional): See switch_recognized_exercise().
+        """
+        if choice != AUTO_EXERCISE:
+            if detector.workout_type != choice:
+                detector.set_workout_type(choice)
+            return
+        if confidence >= detector.min_confidence:
+            self.update([angles.get(key, 180) for key in ANGLE_KEYS], timestamp)
+        if self.current and self.current != detector.workout_type:
+            switch_recognized_exercise(detector, self, self.current, save_set)
+        elif not self.current and detector.workout_type != DEFAULT_EXERCISE:
+            detector.set_workout_type(DEFAULT_EXERCISE)
+
+
+def switch_recognized_exercise(detector, classifier: ExerciseClassifier, exercise_id: str, save_set=None):
+    """
+    Points a WorkoutDetector at a newly recognized exercise.
+
+    A set with reps is never dropped: save_set(detector) is called with it before
+    the detector starts over (e.g. a pushup set followed by squats). Then the
+    classifier's window is replayed through the detector, so the reps done while
+    the exercise was being recognized are counted, with their rep records and posture
+    scores (as if the exercise had been selected by hand), and a rep still in
+    progress keeps its record open. After a saved set, only the frames
+    following its last rep are replayed (none when the frames have no timestamps).
+
+    Args:
+        detector (WorkoutDetector): Detector to switch (updated in place).
+        classifier (ExerciseClassifier): Classifier that recognized the exercise.
+        exercise_id (str): The recognized exercise.
+        save_set (callable, optional): Saves the finished set; without it, callers save the set
+            themselves before switching.
+    """
+    angles = classifier.window_angles()
+    times = classifier.window_times()
+    replay = np.ones(len(angles), dtype=bool)
+    if detector.rep_count > 0:
+        if save_set is not None:
+            save_set(detector)
+        # Frames up to the end of the set's last rep belong to it (NaN compares False: nothing replayed)
+        ends = detector.rep_records.records["end"]
+        replay = times > (ends[-1] if len(ends) else np.nan)
+    detector.set_workout_type(exercise_id)
+    detector.reset()
+    # The window only holds trusted frames, so they all pass the detector's confidence gate
+    for row, timestamp in zip(angles[replay].tolist(), times[replay].tolist()):
+        angle_data = dict(zip(ANGLE_KEYS, row))
+        detector.detectReps(angle_data, timestamp=None if timestamp != timestamp else timestamp)
+        detector.detectPosture(angle_data)
+
@@ -0,0 +1,352 @@
+"""
+Exercise Definitions Module
+Loads the exercises described in trackers/exercises/*.json and compiles them
+into the tables WorkoutDetector runs every frame.
+
+A definition names its joints ("shoulder", "elbow", "hip", "knee"); compiling
+turns every name into a column of the per-frame angle vector, the rep phases
+into a two-state transition table and the posture rules into rule objects, so
+the per-frame work is index lookups and comparisons only.
+
+Definition format (see the shipped files for complete examples):
+    {
+      "id": "squat",                       # Exercise ID (dropdown value, WorkoutDetector type)
+      "order": 2,                          # Position in the GUI lists
+      "category": "🦵 Lower Body", "color": "primary", "description": "...",
+      "signature": {"knee": [132, 28], "hip": [128, 28]},  # Optional, see below
+      "tempo": {"joint": "knee", "flexion_is_eccentric": true},
+      "rep": {
+        "enter": [{"joint": "knee", "min": 70, "max": 110}, ...],  # All must hold to enter the rep
+        "exit": [{"joint": "knee", "min": 160}, ...]               # All must hold to count it
+      },
+      "posture": {
+        "feedback": "Excellent form.",     # Message when no rule asks for a correction
+        "rules": [{"type": "above", "joint": "knee", "limit": 110, "scale": 0.5,
+                   "max_deduction": 25, "in_rep": true, "feedback": [[10, "Go deeper."]]}]
+      }
+    }
+
+The gap between "enter" and "exit" is the hysteresis: a joint hovering near
+one threshold cannot count reps.
+
+Posture rule types (deductions are capped at max_deduction):
+    below:    joint < limit            -> scale * (limit - joint)
+    above:    joint > limit            -> scale * (joint - limit)
+    abs_diff: |joint a - joint b| > limit -> scale * |joint a - joint b|
+    outside:  per joint outside [min, max] -> a fixed deduction
+Feedback tiers are [threshold, message] pairs, checked from the first: the
+first tier the deduction exceeds gives the message. Only the first rule that
+produces a message sets the feedback (the first error wins).
+
+The signature gives, per characteristic joint, the typical [mean, standard
+deviation] of its angle over a few reps. Exercises with a signature can be
+recognized automatically (see exercise_classifier.py); joints left out do
+not count.
+"""
+import glob
+import json
+import math
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Joints a definition can refer to, in the order of the detector's angle vector
+JOINTS = ("shoulder", "elbow", "hip", "knee")
+# AngleCalculator output key of each joint
+ANGLE_KEYS = ("SHOULDER_ANGLE", "ELBOW_ANGLE", "HIP_ANGLE", "KNEE_ANGLE")
+
+EXERCISES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exercises")
+DEFAULT_EXERCISE = "general"
+# Exercise choice that lets exercise_classifier.py recognize the exercise
+AUTO_EXERCISE = "auto"
+
+# Rep state machine: state 0 = waiting for the rep to start, 1 = in the rep
+OUT_OF_REP = 0
+IN_REP = 1
+
+
+def _column(joint: str) -> int:
+    if joint not in JOINTS:
+        raise ValueError(f"Unknown joint: {joint} (available: {', '.join(JOINTS)})")
+    return JOINTS.index(joint)
+
+
+def _feedback_tiers(tiers) -> tuple:
+    """[[threshold, message], ...] -> ((threshold, message), ...), highest threshold first."""
+    return tuple(sorted(((float(threshold), message) for threshold, message in tiers), reverse=True))
+
+
+class PostureRule:
+    """
+    A compiled posture rule: deduction(values) measures, message(deduction) explains.
+    The *_batch variants do the same for a (N, len(JOINTS)) matrix of angle vectors.
+    """
+    __slots__ = ("in_rep", "max_deduction", "tiers")
+
+    def __init__(self, spec: dict):
+        self.in_rep = bool(spec.get("in_rep", False))  # Only checked while a rep is in progress
+        self.max_deduction = float(spec.get("max_deduction", math.inf))
+        self.tiers = _feedback_tiers(spec.get("feedback", ()))
+
+    def deduction(self, values: list) -> float:
+        raise NotImplementedError
+
+    def message(self, deduction: float):
+        """The message of the first tier the deduction exceeds, or None."""
+        for threshold, message in self.tiers:
+            if deduction > threshold:
+                return message
+        return None
+
+    def deduction_batch(self, values: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def tier_batch(self, deductions: np.ndarray) -> np.ndarray:
+        """Index in self.tiers of each deduction's message (-1 for none)."""
+        tiers = np.full(len(deductions), -1)
+        # Last tier first, so the first matching tier is written last and wins
+        for index in range(len(self.tiers) - 1, -1, -1):
+            tiers[deductions > self.tiers[index][0]] = index
+        return tiers
+
+
+class BelowRule(PostureRule):
+    __slots__ = ("column", "limit", "scale")
+
+    def __init__(self, spec: dict):
+        super().__init__(spec)
+        self.column = _column(spec["joint"])
+        self.limit = float(spec["limit"])
+        self.scale = float(spec.get("scale", 1.0))
+
+    def deduction(self, values):
+        angle = values[self.column]
+        if angle < self.limit:
+            return min(self.max_deduction, (self.limit - angle) * self.scale)
+        return 0
+
+    def deduction_batch(self, values):
+        angles = values[:, self.column]
+        return np.where(angles < self.limit, np.minimum(self.max_deduction, (self.limit - angles) * self.scale), 0.0)
+
+
+class AboveRule(BelowRule):
+    __slots__ = ()
+
+    def deduction(self, values):
+        angle = values[self.column]
+        if angle > self.limit:
+            return min(self.max_deduction, (angle - self.limit) * self.scale)
+        return 0
+
+    def deduction_batch(self, values):
+        angles = values[:, self.column]
+        return np.where(angles > self.limit, np.minimum(self.max_deduction, (angles - self.limit) * self.scale), 0.0)
+
+
+class AbsDiffRule(PostureRule):
+    __slots__ = ("first", "second", "limit", "scale")
+
+    def __init__(self, spec: dict):
+        super().__init__(spec)
+        self.first, self.second = (_column(joint) for joint in spec["joints"])
+        self.limit = float(spec["limit"])
+        self.scale = float(spec.get("scale", 1.0))
+
+    def deduction(self, values):
+        difference = abs(values[self.first] - values[self.second])
+        if difference > self.limit:
+            return min(self.max_deduction, difference * self.scale)
+        return 0
+
+    def deduction_batch(self, values):
+        differences = np.abs(values[:, self.first] - values[:, self.second])
+        return np.where(differences > self.limit, np.minimum(self.max_deduction, differences * self.scale), 0.0)
+
+
+class OutsideRule(PostureRule):
+    __slots__ = ("columns", "low", "high", "fixed")
+
+    def __init__(self, spec: dict):
+        super().__init__(spec)
+        self.columns = tuple(_column(joint) for joint in spec.get("joints", JOINTS))
+        self.low = float(spec.get("min", -math.inf))
+        self.high = float(spec.get("max", math.inf))
+        self.fixed = float(spec["deduction"])
+
+    def deduction(self, values):
+        outside = sum(1 for column in self.columns if not self.low <= values[column] <= self.high)
+        return min(self.max_deduction, outside * self.fixed)
+
+    def deduction_batch(self, values):
+        angles = values[:, self.columns]
+        outside = (~((angles >= self.low) & (angles <= self.high))).sum(axis=1)
+        return np.minimum(self.max_deduction, outside * self.fixed)
+
+
+# Registry of the "type" values of posture rules
+POSTURE_RULES = {
+    "below": BelowRule,
+    "above": AboveRule,
+    "abs_diff": AbsDiffRule,
+    "outside": OutsideRule,
+}
+
+
+def _conditions(specs: list) -> tuple:
+    """[{"joint", "min", "max"}, ...] -> ((column, low, high), ...)"""
+    return tuple((_column(spec["joint"]), float(spec.get("min", -math.inf)), float(spec.get("max", math.inf)))
+                 for spec in specs)
+
+
+@dataclass
+class ExerciseDefinition:
+    """An exercise compiled for WorkoutDetector."""
+    id: str
+    order: int
+    category: str
+    color: str
+    description: str
+    transitions: tuple       # Indexed by rep state: (conditions, next state, reps added)
+    rules: tuple             # PostureRule objects, in evaluation order
+    feedback: str            # Message when no rule asks for a correction
+    tempo_column: int        # Column of the joint that paces the rep
+    flexion_is_eccentric: bool
+    signature: tuple = None  # (means, stds) over JOINTS, NaN for joints left out; None if not recognizable
+    # Every correction message of the rules, and where each rule's tiers start in it
+    messages: tuple = field(init=False)
+    message_offsets: tuple = field(init=False)
+
+    def __post_init__(self):
+        offsets = []
+        messages = []
+        for rule in self.rules:
+            offsets.append(len(messages))
+            messages.extend(message for _, message in rule.tiers)
+        self.messages = tuple(messages)
+        self.message_offsets = tuple(offsets)
+
+    def evaluate_posture(self, values: list, in_rep: bool) -> tuple:
+        """
+        Runs the posture rules on one angle vector.
+
+        Returns:
+            tuple: (score 0-100, correction message or None)
+        """
+        score = 100
+        correction = None
+        for rule in self.rules:
+            if rule.in_rep and not in_rep:
+                continue
+            deduction = rule.deduction(values)
+            if deduction:
+                score -= deduction
+                if correction is None:
+                    correction = rule.message(deduction)
+        return max(0, int(score)), correction
+
+    def evaluate_posture_batch(self, values: np.ndarray, in_rep: np.ndarray) -> tuple:
+        """
+        evaluate_posture() for N angle vectors at once.
+
+        Args:
+            values (np.ndarray): (N, len(JOINTS)) angles.
+            in_rep (np.ndarray): (N,) rep state of each vector.
+
+        Returns:
+            tuple: ((N,) scores, (N,) index of the correction in self.messages, -1 for none)
+        """
+        scores = np.full(len(values), 100.0)
+        corrections = np.full(len(values), -1)
+        for rule, offset in zip(self.rules, self.message_offsets):
+            deductions = rule.deduction_batch(values)
+            if rule.in_rep:
+                deductions = np.where(in_rep, deductions, 0.0)
+            scores -= deductions
+            tiers = rule.tier_batch(deductions)
+            first = (corrections < 0) & (tiers >= 0)
+            corrections[first] = offset + tiers[first]
+        # int() truncates toward zero before clamping, as in evaluate_posture()
+        return np.maximum(0, scores.astype(np.int64)), corrections
+
+
+def compile_definition(data: dict) -> ExerciseDefinition:
+    """
+    Compiles one parsed definition file.
+
+    Raises:
+        ValueError: If the definition refers to an unknown joint or rule type, or misses a field.
+    """
+    try:
+        rules = []
+        for spec in data["posture"].get("rules", ()):
+            if spec["type"] not in POSTURE_RULES:
+                raise ValueError(f"Unknown posture rule type: {spec['type']} "
+                                 f"(available: {', '.join(POSTURE_RULES)})")
+            rules.append(POSTURE_RULES[spec["type"]](spec))
+        tempo = data.get("tempo", {})
+        signature = None
+        if data.get("signature"):
+            means = [math.nan] * len(JOINTS)
+            stds = [math.nan] * len(JOINTS)
+            for joint, (mean, std) in data["signature"].items():
+                means[_column(joint)] = float(mean)
+                stds[_column(joint)] = float(std)
+            signature = (tuple(means), tuple(stds))
+        return ExerciseDefinition(
+            id=data["id"].lower(),
+            order=int(data.get("order", 0)),
+            category=data.get("category", ""),
+            color=data.get("color", "primary"),
+            description=data.get("description", ""),
+            transitions=(
+                (_conditions(data["rep"]["enter"]), IN_REP, 0),
+                (_conditions(data["rep"]["exit"]), OUT_OF_REP, 1),
+            ),
+            rules=tuple(rules),
+            feedback=data["posture"]["feedback"],
+            tempo_column=_column(tempo.get("joint", "elbow")),
+            flexion_is_eccentric=bool(tempo.get("flexion_is_eccentric", True)),
+            signature=signature,
+        )
+    except KeyError as e:
+        raise ValueError(f"Missing field: {e}") from None
+
+
+def load_exercise_definitions(directory: str = EXERCISES_DIR) -> dict:
+    """
+    Loads and compiles every *.json definition of a directory.
+
+    Returns:
+        dict: {exercise ID: ExerciseDefinition}, in display order.
+
+    Raises:
+        ValueError: If a file is invalid (the message names the file).
+    """
+    definitions = []
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                definitions.append(compile_definition(json.load(f)))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid exercise definition {path}: {e}") from None
+    definitions.sort(key=lambda definition: (definition.order, definition.id))
+    return {definition.id: definition for definition in definitions}
+
+
+_definitions = None
+
+
+def get_exercise_definitions() -> dict:
+    """The shipped definitions, loaded once per process."""
+    global _definitions
+    if _definitions is None:
+        _definitions = load_exercise_definitions()
+    return _definitions
+
+
+def get_exercise(exercise_id: str) -> ExerciseDefinition:
+    """The definition of an exercise, or the general one for unknown IDs."""
+    definitions = get_exercise_definitions()
+    return definitions.get(exercise_id.lower()) or definitions[DEFAULT_EXERCISE]
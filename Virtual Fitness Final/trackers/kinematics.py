@@ -0,0 +1,150 @@
+"""
+Kinematics Module
+Incremental angular velocity, acceleration, movement phase and tempo per joint.
+
+KinematicsTracker keeps a small ring buffer of timestamped angle vectors and
+updates every joint at once with a fixed amount of numpy work per frame, so
+the cost does not grow with the length of the session. Velocities are finite
+differences over the buffer (not frame to frame), which keeps them usable at
+low or variable frame rates.
+"""
+import numpy as np
+
+# Movement phase of a joint: its angle is closing, not changing, or opening.
+# Whether flexing is the eccentric or the concentric part of a rep depends on the exercise.
+FLEXING = -1
+HOLDING = 0
+EXTENDING = 1
+
+
+class KinematicsTracker:
+    """
+    Tracks the motion of a fixed set of joints.
+
+    Per joint, after every update():
+        velocity (deg/s), acceleration (deg/s^2), phase (FLEXING / HOLDING / EXTENDING),
+        phase_time (s spent in the current phase), last_flexion / last_extension
+        (duration in s of the most recent completed flexing / extending phase, NaN until one ends).
+
+    Phases that cover less than min_range degrees (jitter, small adjustments)
+    do not replace the last durations.
+    """
+
+    def __init__(self, names: tuple, window: int = 5, velocity_threshold: float = 20.0,
+                 min_range: float = 15.0, max_gap: float = 0.5):
+        """
+        Args:
+            names (tuple): Joint names, in the order of the vectors passed to update().
+            window (int): Number of samples the velocity and acceleration are taken over.
+            velocity_threshold (float): Speed (deg/s) above which a joint counts as moving;
+                it must fall below half of it to count as holding again.
+            min_range (float): Smallest angle change (degrees) of a phase that counts for tempo.
+            max_gap (float): After a gap longer than this (seconds) the history is dropped.
+        """
+        self.names = tuple(names)
+        self.index = {name: column for column, name in enumerate(self.names)}
+        self.window = max(2, window)
+        self.velocity_threshold = velocity_threshold
+        self.min_range = min_range
+        self.max_gap = max_gap
+
+        joints = len(self.names)
+        self._times = np.zeros(self.window)
+        self._angles = np.zeros((self.window, joints))
+        self._velocities = np.zeros((self.window, joints))
+        self.velocity = np.zeros(joints)
+        self.acceleration = np.zeros(joints)
+        self.phase = np.zeros(joints, dtype=np.int8)
+        self.last_flexion = np.full(joints, np.nan)
+        self.last_extension = np.full(joints, np.nan)
+        self._phase_start = np.zeros(joints)
+        self._phase_start_angle = np.zeros(joints)
+        self.reset()
+
+    def reset(self):
+        """Drops the history (e.g. when the exercise changes or the pose was lost)."""
+        self._head = 0     # Slot the next sample is written to
+        self._count = 0    # Number of valid samples in the buffer
+        self._last_time = None
+        self.velocity[:] = 0.0
+        self.acceleration[:] = 0.0
+        self.phase[:] = HOLDING
+        self.last_flexion[:] = np.nan
+        self.last_extension[:] = np.nan
+        self._phase_start[:] = 0.0
+        self._phase_start_angle[:] = 0.0
+
+    def update(self, angles, timestamp: float):
+        """
+        Adds one frame.
+
+        Args:
+            angles: (J,) angles in degrees, in the order of `names`.
+            timestamp (float): Frame time in seconds.
+        """
+        if self._last_time is not None:
+            dt = timestamp - self._last_time
+            if dt == 0:
+                return  # Repeated frame
+            if dt < 0 or dt > self.max_gap:
+                self.reset()
+
+        head = self._head
+        self._times[head] = timestamp
+        self._angles[head] = angles
+        self._last_time = timestamp
+        if self._count:
+            # Oldest sample still in the window (the slot that will be overwritten next, once full)
+            oldest = (head + 1) % self.window if self._count >= self.window else head - self._count
+            span = timestamp - self._times[oldest]
+            np.subtract(self._angles[head], self._angles[oldest], out=self.velocity)
+            self.velocity /= span
+            if self._count >= 2:
+                # The first velocity of a history is not a measurement: no acceleration from it
+                np.subtract(self.velocity, self._velocities[oldest], out=self.acceleration)
+                self.acceleration /= span
+        else:
+            self._phase_start[:] = timestamp
+            self._phase_start_angle[:] = self._angles[head]
+        self._velocities[head] = self.velocity
+        self._head = (head + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+
+        self._update_phase(timestamp, self._angles[head])
+
+    def _update_phase(self, timestamp: float, angles: np.ndarray):
+        """Phase changes with hysteresis; a completed movement phase stores its duration."""
+        speed = np.abs(self.velocity)
+        moving = speed > self.velocity_threshold
+        # Keep moving in the same direction until the speed clearly drops
+        keep = (self.phase != HOLDING) & (speed > self.velocity_threshold / 2) & \
+            (np.sign(self.velocity) == self.phase)
+        phase = np.where(moving, np.sign(self.velocity), HOLDING).astype(np.int8)
+        phase[keep] = self.phase[keep]
+
+        changed = phase != self.phase
+        if changed.any():
+            duration = timestamp - self._phase_start
+            counted = changed & (np.abs(angles - self._phase_start_angle) >= self.min_range)
+            ended_flexion = counted & (self.phase == FLEXING)
+            ended_extension = counted & (self.phase == EXTENDING)
+            self.last_flexion[ended_flexion] = duration[ended_flexion]
+            self.last_extension[ended_extension] = duration[ended_extension]
+            self._phase_start[changed] = timestamp
+            self._phase_start_angle[changed] = angles[changed]
+            self.phase[:] = phase
+
+    def phase_time(self, timestamp: float) -> np.ndarray:
+        """Seconds each joint has spent in its current phase."""
+        return timestamp - self._phase_start
+
+    def joint(self, name: str) -> dict:
+        """Current values of one joint (for display and debugging)."""
+        column = self.index[name]
+        return {
+            "velocity": float(self.velocity[column]),
+            "acceleration": float(self.acceleration[column]),
+            "phase": int(self.phase[column]),
+            "last_flexion": float(self.last_flexion[column]),
+            "last_extension": float(self.last_extension[column]),
+        }
@@ -0,0 +1,115 @@
+"""
+Rep Counter Module
+Counts reps over a whole angle time series at once, for archived recordings.
+
+It runs the same compiled transition table as WorkoutDetector (see
+exercise_definitions.py) and returns the same count, but as numpy passes
+over a (T, K) angle matrix instead of one detectReps() call per frame:
+
+    1. One boolean mask per phase: frames where every "enter" condition holds,
+       frames where every "exit" condition holds.
+    2. As long as no frame satisfies both, the state after each frame is the
+       last event seen so far (enter -> in a rep, exit -> not in a rep), which
+       is a forward fill of the event indices.
+    3. A rep is counted on every exit event whose previous state was "in a rep".
+
+Frames where both masks hold would make the state depend on the previous
+frame (enter if out, exit if in); those series fall back to a loop over the
+event frames only.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from trackers.exercise_definitions import ANGLE_KEYS, IN_REP, OUT_OF_REP, get_exercise
+
+
+@dataclass
+class RepCount:
+    """Reps found in a series; frame indices refer to the rows of the angle matrix."""
+    count: int
+    starts: np.ndarray   # Frame of each counted rep's "enter" event (-1 if it began in an earlier chunk)
+    ends: np.ndarray     # Frame of each counted rep's "exit" event (where it was counted)
+    in_rep: bool         # State after the last frame (pass it on to continue with the next chunk)
+
+
+def _condition_mask(values: np.ndarray, conditions: tuple) -> np.ndarray:
+    """Frames where every (column, low, high) condition holds; NaN never does."""
+    mask = np.ones(len(values), dtype=bool)
+    for column, low, high in conditions:
+        column_values = values[:, column]
+        mask &= (column_values >= low) & (column_values <= high)
+    return mask
+
+
+def _angle_matrix(angles: np.ndarray, keys: tuple) -> np.ndarray:
+    """(T, K) angles with the given column keys -> (T, len(ANGLE_KEYS)), missing joints at 180 like detectReps."""
+    values = np.full((len(angles), len(ANGLE_KEYS)), 180.0, dtype=np.float64)
+    for column, key in enumerate(ANGLE_KEYS):
+        if key in keys:
+            values[:, column] = angles[:, keys.index(key)]
+    return values
+
+
+def _count_with_loop(enter: np.ndarray, exit_: np.ndarray, in_rep: bool):
+    """State machine over the event frames only (used when enter and exit overlap)."""
+    starts = []
+    ends = []
+    start = -1  # A rep in progress at the start began in an earlier chunk
+    for frame in np.flatnonzero(enter | exit_).tolist():
+        if in_rep:
+            if exit_[frame]:
+                in_rep = False
+                starts.append(start)
+                ends.append(frame)
+        elif enter[frame]:
+            in_rep = True
+            start = frame
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64), in_rep
+
+
+def count_reps(angles: np.ndarray, workout_type: str, keys: tuple = ANGLE_KEYS, confidence: np.ndarray = None,
+               min_confidence: float = 0.5, in_rep: bool = False) -> RepCount:
+    """
+    Counts the reps of an angle time series.
+
+    Args:
+        angles (np.ndarray): (T, K) angles in degrees; rows with NaN (no pose) are ignored.
+        workout_type (str): Exercise ID (see trackers/exercises/).
+        keys (tuple): Angle key of each column (e.g. AngleCalculator.essential_keys).
+        confidence (np.ndarray, optional): (T,) angle confidence; rows below min_confidence
+            are ignored, as WorkoutDetector skips them.
+        min_confidence (float): See WorkoutDetector.
+        in_rep (bool): State before the first frame (RepCount.in_rep of the previous chunk).
+
+    Returns:
+        RepCount: Same count as feeding every row to WorkoutDetector.detectReps().
+    """
+    exercise = get_exercise(workout_type)
+    values = _angle_matrix(np.asarray(angles, dtype=np.float64), tuple(keys))
+    (enter_conditions, _, _), (exit_conditions, _, _) = (exercise.transitions[OUT_OF_REP],
+                                                         exercise.transitions[IN_REP])
+    enter = _condition_mask(values, enter_conditions)
+    exit_ = _condition_mask(values, exit_conditions)
+    if confidence is not None:
+        trusted = np.asarray(confidence) >= min_confidence
+        enter &= trusted
+        exit_ &= trusted
+
+    if not len(values):
+        return RepCount(0, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), in_rep)
+    if (enter & exit_).any():
+        starts, ends, in_rep = _count_with_loop(enter, exit_, in_rep)
+        return RepCount(len(ends), starts, ends, in_rep)
+
+    # State after each frame = kind of the last event at or before it (the initial state before any)
+    frames = np.arange(len(values))
+    last_event = np.maximum.accumulate(np.where(enter | exit_, frames, -1))
+    state = np.where(last_event >= 0, enter[last_event], in_rep)
+    previous_state = np.concatenate(([in_rep], state[:-1]))
+
+    ends = np.flatnonzero(previous_state & exit_)
+    # Each rep started at the last out -> in transition before its exit (-1: before this chunk)
+    rep_starts = np.append(-1, np.flatnonzero(~previous_state & enter))
+    starts = rep_starts[np.searchsorted(rep_starts, ends, side="right") - 1]
+    return RepCount(len(ends), starts, ends, bool(state[-1]))
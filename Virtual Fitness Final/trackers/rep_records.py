@@ -0,0 +1,212 @@
+"""
+Rep Records Module
+One compact record per completed rep: when it happened, the range of motion
+of every tracked joint, its tempo, its posture scores and, when reference reps
+are available, how closely its movement matched them (see rep_templates.py).
+
+Records live in a preallocated numpy structured array. While a rep is in
+progress, the running minimum/maximum angles and posture statistics are
+updated in place and the angle trajectory of the rep cycle is appended to a
+preallocated buffer, so the frame loop allocates nothing; a row is written
+only when the rep is counted.
+"""
+import numpy as np
+
+# Share of the shape score in a rep's quality score (the rest is its mean posture score)
+SHAPE_WEIGHT = 0.5
+
+
+def rep_record_dtype(num_joints: int) -> np.dtype:
+    """NumPy dtype of one rep record for num_joints tracked joints."""
+    return np.dtype([
+        ("start", "<f8"),                       # Timestamp of the frame that entered the rep (s)
+        ("end", "<f8"),                         # Timestamp of the frame that counted it (s)
+        ("min_angle", "<f4", (num_joints,)),    # Smallest angle of each joint during the rep
+        ("max_angle", "<f4", (num_joints,)),    # Largest angle of each joint during the rep
+        ("eccentric", "<f4"),                   # Lowering phase duration (s), NaN if not measured
+        ("concentric", "<f4"),                  # Lifting phase duration (s), NaN if not measured
+        ("posture_mean", "<f4"),                # Mean posture score over the rep's frames
+        ("posture_min", "<f4"),                 # Lowest posture score during the rep
+        ("shape_score", "<f4"),                 # Match with the reference reps (0-100), NaN without references
+        ("quality", "<f4"),                     # Posture mean blended with the shape score
+    ])
+
+
+class RepRecordBuffer:
+    """
+    Collects rep records for one set.
+
+    Usage (WorkoutDetector does this):
+        buffer.begin(timestamp, angles)   # rep entered
+        buffer.update(angles)             # every frame while in the rep
+        buffer.add_posture(score)
+        buffer.restart_cycle(angles)      # every frame at the starting position (see trajectory)
+        buffer.extend_cycle(angles)       # every other frame
+        buffer.trajectory                 # angles of the rep cycle so far, for shape scoring
+        buffer.finish(timestamp, eccentric, concentric, shape_score)   # rep counted
+        buffer.records                    # structured array of the completed reps
+    """
+
+    def __init__(self, joints: tuple, capacity: int = 64, trajectory_frames: int = 256,
+                 max_trajectory_frames: int = 4096):
+        """
+        Args:
+            joints (tuple): Names of the tracked joints (order of the angle vectors).
+            capacity (int): Initial number of records; the buffer doubles when full.
+            trajectory_frames (int): Initial frames of the rep cycle buffer; it doubles when full.
+            max_trajectory_frames (int): Longest rep cycle kept; beyond it the oldest half is dropped
+                (e.g. a long pause away from the starting position).
+        """
+        self.joints = tuple(joints)
+        self.dtype = rep_record_dtype(len(self.joints))
+        self._records = np.zeros(max(1, capacity), dtype=self.dtype)
+        self.count = 0
+        # Timestamp of the set's first frame: saved rep times are relative to it, since the
+        # frame clock (e.g. perf_counter) has an arbitrary origin that changes between runs
+        self.origin = np.nan
+
+        # Running values of the rep in progress
+        self._start = np.nan
+        self._min = np.zeros(len(self.joints))
+        self._max = np.zeros(len(self.joints))
+        self._posture_total = 0.0
+        self._posture_frames = 0
+        self._posture_min = np.nan
+        self._trajectory = np.zeros((max(1, trajectory_frames), len(self.joints)))
+        self._frames = 0
+        self.max_trajectory_frames = max_trajectory_frames
+        self.active = False
+
+    def mark_origin(self, timestamp: float):
+        """Sets the set's time origin from its first timestamped frame (later calls do nothing)."""
+        if self.origin != self.origin:
+            self.origin = timestamp
+
+    def begin(self, timestamp: float, angles):
+        """Starts the record of a new rep from its first frame."""
+        self._start = np.nan if timestamp is None else timestamp
+        self._min[:] = angles
+        self._max[:] = angles
+        self._posture_total = 0.0
+        self._posture_frames = 0
+        self._posture_min = np.nan
+        self.active = True
+
+    def update(self, angles):
+        """Extends the range of motion of the rep in progress with one frame."""
+        np.minimum(self._min, angles, out=self._min)
+        np.maximum(self._max, angles, out=self._max)
+
+    def restart_cycle(self, angles):
+        """Starts the rep cycle trajectory over from a frame at the starting position."""
+        self._trajectory[0] = angles
+        self._frames = 1
+
+    def extend_cycle(self, angles):
+        """Appends one frame to the rep cycle trajectory."""
+        if self._frames == len(self._trajectory):
+            if self._frames >= self.max_trajectory_frames:
+                half = self._frames // 2
+                self._trajectory[:self._frames - half] = self._trajectory[half:self._frames]
+                self._frames -= half
+            else:
+                self._trajectory = np.concatenate((self._trajectory, np.zeros_like(self._trajectory)))
+        self._trajectory[self._frames] = angles
+        self._frames += 1
+
+    def add_posture(self, score: float):
+        """Adds one frame's posture score to the rep in progress."""
+        self._posture_total += score
+        self._posture_frames += 1
+        # NaN (no score yet) compares False
+        if not score >= self._posture_min:
+            self._posture_min = score
+
+    @property
+    def trajectory(self) -> np.ndarray:
+        """
+        (frames, joints) angles of the current rep cycle: from the last frame at the starting
+        position (lowering phase included) to now. A view, valid until the next cycle call.
+        """
+        return self._trajectory[:self._frames]
+
+    def finish(self, timestamp: float, eccentric: float = np.nan, concentric: float = np.nan,
+               shape_score: float = np.nan) -> int:
+        """
+        Writes the record of the rep in progress. Its quality is the mean posture score,
+        blended with the shape score (SHAPE_WEIGHT) when the rep could be matched.
+
+        Returns:
+            int: Index of the new record.
+        """
+        if self.count == len(self._records):
+            self._records = np.concatenate((self._records, np.zeros(len(self._records), dtype=self.dtype)))
+        record = self._records[self.count]
+        record["start"] = self._start
+        record["end"] = np.nan if timestamp is None else timestamp
+        record["min_angle"] = self._min
+        record["max_angle"] = self._max
+        record["eccentric"] = eccentric
+        record["concentric"] = concentric
+        posture = self._posture_total / self._posture_frames if self._posture_frames else np.nan
+        record["posture_mean"] = posture
+        record["posture_min"] = self._posture_min
+        record["shape_score"] = shape_score
+        if np.isnan(shape_score):
+            record["quality"] = posture
+        elif np.isnan(posture):
+            record["quality"] = shape_score
+        else:
+            record["quality"] = (1.0 - SHAPE_WEIGHT) * posture + SHAPE_WEIGHT * shape_score
+        self.count += 1
+        self.active = False
+        return self.count - 1
+
+    def clear(self):
+        """Drops every record and the rep cycle (keeps the allocated memory)."""
+        self.count = 0
+        self.origin = np.nan
+        self._frames = 0
+        self.active = False
+
+    @property
+    def records(self) -> np.ndarray:
+        """Structured array of the completed reps (a view, valid until the next finish())."""
+        return self._records[:self.count]
+
+    def posture_scores(self) -> list:
+        """Mean posture score of every rep (rounded; None where no score was recorded)."""
+        return [None if np.isnan(score) else round(float(score), 1) for score in self.records["posture_mean"]]
+
+    def quality_scores(self) -> list:
+        """Quality score of every rep (posture and shape, see finish()), rounded like posture_scores()."""
+        return [None if np.isnan(score) else round(float(score), 1) for score in self.records["quality"]]
+
+    def to_list(self) -> list:
+        """
+        Records as JSON-ready dicts (NaN becomes None), for saving with the session.
+        Their start/end times are seconds since the set's first frame (see mark_origin()).
+        """
+        return [self.record_dict(index) for index in range(self.count)]
+
+    def record_dict(self, index: int) -> dict:
+        """One record as a JSON-ready dict (NaN becomes None), in the to_list() format."""
+        def value(number, digits):
+            number = float(number)
+            return None if np.isnan(number) else round(number, digits)
+
+        record = self.records[index]
+        return {
+            "start": value(record["start"] - self.origin, 3),
+            "end": value(record["end"] - self.origin, 3),
+            "duration": value(record["end"] - record["start"], 3),
+            "rom": {joint: [value(low, 1), value(high, 1)]
+                    for joint, low, high in zip(self.joints, record["min_angle"], record["max_angle"])},
+            "eccentric": value(record["eccentric"], 2),
+            "concentric": value(record["concentric"], 2),
+            "timeUnderTension": value(record["eccentric"] + record["concentric"], 2),
+            "postureMean": value(record["posture_mean"], 1),
+            "postureMin": value(record["posture_min"], 1),
+            "shapeScore": value(record["shape_score"], 1),
+            "quality": value(record["quality"], 1),
+        }
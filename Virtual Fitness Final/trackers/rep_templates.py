@@ -0,0 +1,350 @@
+"""
+Rep Templates Module
+Scores the shape of a whole rep by comparing its angle trajectory with a
+library of reference reps, using dynamic time warping (DTW).
+
+Posture rules judge single frames; a rep can pass every rule and still be
+badly shaped (bouncing out of the bottom, a half rep finished with a jerk).
+DTW measures how far the rep's trajectory is from the closest reference rep
+once both are aligned in time, so a slower or faster rep is not penalized
+for its tempo, only for its path.
+
+A rep's trajectory is its whole cycle: from the last frame at the starting
+position (where the exercise's rep exit conditions hold) to the frame that
+counts it, so both the lowering and the lifting phase are compared. For
+exercises whose enter threshold is at the bottom (pushup, squat), the
+counted rep itself only covers the way back up. Trajectories are resampled
+to `length` points and compared on the joints of the exercise's signature
+(all joints when it has none). To keep libraries of
+hundreds of references real-time, the nearest reference is searched the way
+the UCR suite does it:
+
+    1. LB_Keogh lower bound of every reference at once: distance of the rep
+       to each reference's band envelope, one vectorized numpy pass.
+    2. DTW (Sakoe-Chiba band) on the references in increasing bound order,
+       first the few most promising ones, whose best distance then prunes
+       every reference with a higher bound from the second pass.
+    3. Each DTW abandons early once its running minimum, plus the LB_Keogh
+       contributions of the rows still to come, exceeds the best distance.
+
+Usage:
+    library = RepTemplateLibrary.load("rep_templates.npz")
+    library.add_series("squat", angles)       # Reference reps from a good set
+    score = library.score("squat", trajectory)  # 0-100, NaN without references
+"""
+import math
+import os
+
+import numpy as np
+
+from trackers.exercise_definitions import ANGLE_KEYS, IN_REP, JOINTS, get_exercise
+from trackers.rep_counter import count_reps
+
+DEFAULT_TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rep_templates.npz")
+
+
+def resample(trajectory: np.ndarray, length: int) -> np.ndarray:
+    """(n, J) trajectory -> (length, J), linearly interpolated over the rep's normalized time."""
+    trajectory = np.asarray(trajectory, dtype=np.float64)
+    if len(trajectory) == 1:
+        return np.repeat(trajectory, length, axis=0)
+    source = np.linspace(0.0, 1.0, len(trajectory))
+    target = np.linspace(0.0, 1.0, length)
+    return np.stack([np.interp(target, source, trajectory[:, column])
+                     for column in range(trajectory.shape[1])], axis=1)
+
+
+def envelope(series: np.ndarray, band: int) -> tuple:
+    """
+    Running (lower, upper) envelope of a (..., L, J) series over a window of +-band points,
+    the bounds LB_Keogh compares against.
+    """
+    length = series.shape[-2]
+    lower = series.copy()
+    upper = series.copy()
+    for shift in range(1, band + 1):
+        if shift >= length:
+            break
+        # Point i sees points i - shift and i + shift
+        np.minimum(lower[..., shift:, :], series[..., :-shift, :], out=lower[..., shift:, :])
+        np.minimum(lower[..., :-shift, :], series[..., shift:, :], out=lower[..., :-shift, :])
+        np.maximum(upper[..., shift:, :], series[..., :-shift, :], out=upper[..., shift:, :])
+        np.maximum(upper[..., :-shift, :], series[..., shift:, :], out=upper[..., :-shift, :])
+    return lower, upper
+
+
+def lb_keogh(query: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    LB_Keogh contributions of a query against one or many envelopes.
+
+    Args:
+        query (np.ndarray): (L, J) resampled trajectory.
+        lower, upper (np.ndarray): (N, L, J) envelopes of the references.
+
+    Returns:
+        np.ndarray: (N, L) squared distance of each query point to each envelope; the row
+        sums are lower bounds of the banded DTW distances.
+    """
+    above = np.maximum(query - upper, 0.0)
+    below = np.maximum(lower - query, 0.0)
+    excess = above + below  # At most one of them is non-zero
+    return (excess * excess).sum(axis=-1)
+
+
+def dtw_distances(query: np.ndarray, references: np.ndarray, band: int, best_so_far: float = math.inf,
+                  contributions: np.ndarray = None) -> np.ndarray:
+    """
+    Squared DTW distances of a series to many references under a Sakoe-Chiba band, with
+    early abandoning. Each row of the recursion is one numpy pass over the band cells of
+    every reference still in the race.
+
+    Args:
+        query (np.ndarray): (L, J) series.
+        references (np.ndarray): (N, L, J) series of the same length.
+        band (int): Largest time shift (in points) the warping path may take.
+        best_so_far (float): Distance to beat; references that cannot beat it are abandoned.
+        contributions (np.ndarray, optional): (N, L) LB_Keogh contributions of the query
+            against each reference (see lb_keogh()), which tighten the early abandoning.
+
+    Returns:
+        np.ndarray: (N,) distances, inf for abandoned references.
+    """
+    count, length = references.shape[:2]
+    # The references are the last axis throughout, so every step below works on contiguous rows
+    # Point-to-point costs of the band cells only: (L, 2 * band + 1, N), cell k of row i is j = i - band + k
+    offsets = np.arange(-band, band + 1)
+    cells = np.clip(np.arange(length)[:, np.newaxis] + offsets, 0, length - 1)
+    difference = query[:, np.newaxis, :, np.newaxis] - np.ascontiguousarray(references.transpose(1, 2, 0))[cells]
+    cost = np.einsum("ikjn,ikjn->ikn", difference, difference)
+    # tail[i] = lower bound of what rows i.. will still add
+    tail = np.zeros((length + 1, count))
+    if contributions is not None:
+        tail[:-1] = np.cumsum(contributions.T[::-1], axis=0)[::-1]
+
+    # Cell j of a row is stored at j + 1; index 0 is the (infinite) cell left of j = 0,
+    # except before the first row, where it is the path's origin
+    previous = np.full((length + 1, count), np.inf)
+    previous[0] = 0.0
+    alive = np.arange(count)  # References still being computed
+    for i in range(length):
+        low = max(0, i - band)
+        high = min(length - 1, i + band)
+        row_cost = cost[i, low - i + band:high - i + band + 1]
+        # Best predecessor from the row above (diagonal or vertical step)
+        above = np.minimum(previous[low:high + 1], previous[low + 1:high + 2])
+        # Horizontal steps chain within the row: D[j] = min over k <= j of above[k] + cost[k..j],
+        # i.e. a running minimum over the row's cumulative cost
+        cumulative = np.cumsum(row_cost, axis=0)
+        row = np.full((length + 1, len(alive)), np.inf)
+        row[low + 1:high + 2] = cumulative + np.minimum.accumulate(above - (cumulative - row_cost), axis=0)
+        # Abandoned references are dropped from the remaining rows
+        hopeless = row[low + 1:high + 2].min(axis=0) + tail[i + 1] >= best_so_far
+        if hopeless.any():
+            keep = ~hopeless
+            alive = alive[keep]
+            if not len(alive):
+                break
+            row = row[:, keep]
+            cost = cost[:, :, keep]
+            tail = tail[:, keep]
+        previous = row
+
+    distances = np.full(count, np.inf)
+    if len(alive):
+        distances[alive] = previous[length]
+    return distances
+
+
+class RepTemplateLibrary:
+    """
+    Reference reps per exercise, stored resampled with their LB_Keogh envelopes.
+
+    Each exercise's references live in preallocated (capacity, length, J) arrays
+    that double when full, so adding references does not copy on every call.
+    """
+
+    def __init__(self, length: int = 32, band: float = 0.1, max_rms: float = 25.0, chunk: int = 8):
+        """
+        Args:
+            length (int): Points every rep trajectory is resampled to.
+            band (float): Sakoe-Chiba band as a fraction of length (how much timing may differ).
+            max_rms (float): RMS angle difference (degrees) that scores 0; identical shapes score 100.
+            chunk (int): References in the first DTW pass (see nearest()).
+        """
+        self.length = length
+        self.band = max(1, int(round(band * length)))
+        self.max_rms = max_rms
+        self.chunk = chunk
+        self._templates = {}  # exercise ID -> (capacity, L, J) array
+        self._lower = {}
+        self._upper = {}
+        self._counts = {}
+
+    def __len__(self):
+        return sum(self._counts.values())
+
+    def count(self, exercise_id: str) -> int:
+        """Number of references of an exercise."""
+        return self._counts.get(exercise_id, 0)
+
+    def templates(self, exercise_id: str) -> np.ndarray:
+        """(N, length, J) references of an exercise (a view)."""
+        if exercise_id not in self._templates:
+            return np.empty((0, self.length, len(JOINTS)))
+        return self._templates[exercise_id][:self.count(exercise_id)]
+
+    @staticmethod
+    def columns(exercise_id: str) -> np.ndarray:
+        """JOINTS columns a rep's shape is compared on: the exercise's signature joints, else all."""
+        signature = get_exercise(exercise_id).signature
+        if not signature:
+            return np.arange(len(JOINTS))
+        return np.flatnonzero(~np.isnan(np.asarray(signature[0], dtype=np.float64)))
+
+    # Building ======================================================================================
+    def add(self, exercise_id: str, trajectory: np.ndarray):
+        """
+        Adds one reference rep.
+
+        Args:
+            exercise_id (str): Exercise of the rep.
+            trajectory (np.ndarray): (n, J) angles in JOINTS order from the rep's start to its end.
+        """
+        trajectory = np.asarray(trajectory, dtype=np.float64)
+        if not len(trajectory) or np.isnan(trajectory).any():
+            return
+        template = resample(trajectory, self.length)
+        count = self.count(exercise_id)
+        if exercise_id not in self._templates:
+            shape = (8, self.length, len(JOINTS))
+            self._templates[exercise_id] = np.zeros(shape)
+            self._lower[exercise_id] = np.zeros(shape)
+            self._upper[exercise_id] = np.zeros(shape)
+        elif count == len(self._templates[exercise_id]):
+            for arrays in (self._templates, self._lower, self._upper):
+                arrays[exercise_id] = np.concatenate((arrays[exercise_id], np.zeros_like(arrays[exercise_id])))
+        lower, upper = envelope(template, self.band)
+        self._templates[exercise_id][count] = template
+        self._lower[exercise_id][count] = lower
+        self._upper[exercise_id][count] = upper
+        self._counts[exercise_id] = count + 1
+
+    def add_series(self, exercise_id: str, angles: np.ndarray, keys: tuple = ANGLE_KEYS,
+                   confidence: np.ndarray = None, min_confidence: float = 0.5) -> int:
+        """
+        Adds every complete rep cycle of an angle time series (e.g. a recording of a
+        well-performed set), split with the batch rep counter so references cover the same
+        frames as WorkoutDetector's rep cycles: from the last trusted frame at the starting
+        position before the rep to the frame that counts it.
+
+        Args:
+            exercise_id (str): Exercise performed in the series.
+            angles (np.ndarray): (T, K) angles; rows with NaN (no pose) are skipped.
+            keys (tuple): Angle key of each column; must include every ANGLE_KEYS entry.
+            confidence (np.ndarray, optional): (T,) angle confidence; frames below
+                min_confidence are skipped, as WorkoutDetector skips them.
+            min_confidence (float): See WorkoutDetector.
+
+        Returns:
+            int: Number of reference reps added.
+        """
+        angles = np.asarray(angles, dtype=np.float64)
+        keys = tuple(keys)
+        values = angles[:, [keys.index(key) for key in ANGLE_KEYS]]
+        reps = count_reps(values, exercise_id, ANGLE_KEYS, confidence, min_confidence)
+        used = ~np.isnan(values).any(axis=1)
+        if confidence is not None:
+            used &= np.asarray(confidence) >= min_confidence
+        # Frames at the starting position: every exit condition of the rep holds
+        at_start = used.copy()
+        for column, low, high in get_exercise(exercise_id).transitions[IN_REP][0]:
+            at_start &= (values[:, column] >= low) & (values[:, column] <= high)
+        starting_frames = np.flatnonzero(at_start)
+
+        added = 0
+        for start, end in zip(reps.starts.tolist(), reps.ends.tolist()):
+            # Last frame at the starting position before the rep was entered
+            before = np.searchsorted(starting_frames, max(start, 0)) - 1
+            if start < 0 or before < 0:
+                continue  # The cycle began before the series
+            cycle_start = starting_frames[before]
+            self.add(exercise_id, values[cycle_start:end + 1][used[cycle_start:end + 1]])
+            added += 1
+        return added
+
+    # Matching ======================================================================================
+    def nearest(self, exercise_id: str, trajectory: np.ndarray) -> tuple:
+        """
+        Finds the reference closest to a rep.
+
+        Args:
+            exercise_id (str): Exercise of the rep.
+            trajectory (np.ndarray): (n, J) angles in JOINTS order from the rep's start to its end.
+
+        Returns:
+            tuple: (squared DTW distance, reference index), (inf, -1) without references.
+        """
+        count = self.count(exercise_id)
+        trajectory = np.asarray(trajectory, dtype=np.float64)
+        if not count or not len(trajectory):
+            return math.inf, -1
+        columns = self.columns(exercise_id)
+        query = resample(trajectory, self.length)[:, columns]
+        templates = self._templates[exercise_id][:count, :, columns]
+        contributions = lb_keogh(query, self._lower[exercise_id][:count, :, columns],
+                                 self._upper[exercise_id][:count, :, columns])
+        bounds = contributions.sum(axis=1)
+
+        order = np.argsort(bounds, kind="stable")
+        best = math.inf
+        best_index = -1
+        # Two passes: the references with the lowest bounds give a best distance to beat, then every
+        # reference whose bound is still below it goes through a single vectorized pass
+        for candidates in (order[:self.chunk], order[self.chunk:]):
+            candidates = candidates[bounds[candidates] < best]
+            if not len(candidates):
+                break
+            distances = dtw_distances(query, templates[candidates], self.band, best, contributions[candidates])
+            closest = int(np.argmin(distances))
+            if distances[closest] < best:
+                best = float(distances[closest])
+                best_index = int(candidates[closest])
+        return best, best_index
+
+    def score(self, exercise_id: str, trajectory: np.ndarray) -> float:
+        """
+        Shape score of a rep: 100 for a reference's exact path, 0 at max_rms degrees RMS
+        difference (per aligned point and joint) from the nearest reference.
+
+        Returns:
+            float: Score in [0, 100], NaN when the exercise has no references.
+        """
+        distance, index = self.nearest(exercise_id, trajectory)
+        if index < 0:
+            return math.nan
+        # A warping path has at least `length` steps
+        rms = math.sqrt(distance / (self.length * len(self.columns(exercise_id))))
+        return max(0.0, 100.0 * (1.0 - rms / self.max_rms))
+
+    # Storage =======================================================================================
+    def save(self, path: str = DEFAULT_TEMPLATES_PATH):
+        """Writes the references (not the envelopes, which are recomputed) to a .npz file."""
+        arrays = {f"templates_{exercise_id}": self.templates(exercise_id) for exercise_id in self._templates}
+        np.savez_compressed(path, length=self.length, band=self.band, max_rms=self.max_rms, **arrays)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TEMPLATES_PATH) -> "RepTemplateLibrary":
+        """
+        Reads a library written by save(); a missing file gives an empty library
+        (shape scores are then NaN and do not affect rep quality).
+        """
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            library = cls(int(data["length"]), max_rms=float(data["max_rms"]))
+            library.band = int(data["band"])
+            for name in data.files:
+                if name.startswith("templates_"):
+                    for template in data[name]:
+                        library.add(name[len("templates_"):], template)
+        return library
@@ -2,7 +2,16 @@
 WorkoutDetector Module
 Analyzes joint angle data to detect workout repetitions and evaluate posture quality.
 Receives input from core_AI and outputs metrics to WorkoutSession.
+
+The exercises themselves (rep thresholds, posture rules, feedback) are data:
+see trackers/exercises/ and trackers/exercise_definitions.py.
 """
+import math
+
+from trackers.exercise_definitions import ANGLE_KEYS, IN_REP, JOINTS, get_exercise
+from trackers.kinematics import EXTENDING, FLEXING, KinematicsTracker
+from trackers.rep_records import RepRecordBuffer
+
 
 class WorkoutDetector:
     """
@@ -19,51 +28,60 @@ class WorkoutDetector:
     Output:
         - detectReps(angle_data): Returns rep count (int)
         - detectPosture(angle_data): Returns tuple(posture score (int, 0-100), feedback (str))
+
+    Both accept an optional confidence (0-1, see AngleCalculator.essential_angles).
+    Frames below min_confidence are skipped: they cannot start or finish a rep,
+    and detectPosture repeats the last evaluation.
+
+    When detectReps also gets frame timestamps, self.kinematics tracks joint
+    velocities and movement phases, and detectPosture coaches the tempo of
+    the last rep (see tempo()).
+
+    Every counted rep also leaves a record in self.rep_records (range of motion,
+    tempo, posture; see trackers/rep_records.py). With a RepTemplateLibrary, the
+    trajectory of the whole rep cycle (from the starting position, lowering phase
+    included) is also matched against reference reps and its shape score goes
+    into the record's quality (see trackers/rep_templates.py).
     """
     
-    def __init__(self, workout_type: str = "general"):
+    def __init__(self, workout_type: str = "general", min_confidence: float = 0.5,
+                 min_eccentric: float = 1.0, rep_templates=None):
         """
         Initialize the WorkoutDetector with specific workout parameters.
         
         Args:
             workout_type (str): Type of workout to detect (e.g., "pushup", "squat", "bicep_curl")
+            min_confidence (float): Frames with a lower angle confidence are ignored.
+            min_eccentric (float): Shortest lowering phase (seconds) before the tempo is coached (0 = off).
+            rep_templates (RepTemplateLibrary, optional): Reference reps the shape of each rep is scored against.
         """
-        self.workout_type = workout_type.lower()
+        self.min_confidence = min_confidence
         self.rep_count = 0
         self.in_rep = False  # Tracks if currently in a repetition
-        self.previous_angles = None
+        self.last_score = 100
         self.last_feedback = ""
-        
-        # Define threshold ranges for different workout types
-        self.workout_thresholds = {
-            "pushup": {
-                "elbow_down": (70, 110),   # Elbow angle when down
-                "elbow_up": (160, 180),    # Elbow angle when up
-                "hip_min": 160,             # Hip should stay relatively straight
-                "shoulder_min": 30
-            },
-            "squat": {
-                "knee_down": (70, 110),    # Knee angle when squatting
-                "knee_up": (160, 180),     # Knee angle when standing
-                "hip_down": (70, 110),     # Hip angle when squatting
-                "hip_up": (160, 180)       # Hip angle when standing
-            },
-            "bicep_curl": {
-                "elbow_down": (150, 180),  # Arm extended
-                "elbow_up": (30, 60),  # Arm curled
-                "shoulder_stable": (150, 180)  # Shoulder should stay stable
-            },
-            "general": {
-                "elbow_down": (70, 110),
-                "elbow_up": (160, 180),
-                "knee_down": (70, 110),
-                "knee_up": (160, 180)
-            }
-        }
+        self.skipped_frames = 0  # Frames ignored for low confidence
+        self.min_eccentric = min_eccentric
+        self.kinematics = KinematicsTracker(JOINTS)
+        self.rep_records = RepRecordBuffer(JOINTS)
+        self.rep_templates = rep_templates
+        self.last_shape_score = math.nan  # Shape score of the last counted rep
+        self.set_workout_type(workout_type)
+
+    def set_workout_type(self, workout_type: str):
+        """
+        Switches to another exercise (unknown types fall back to "general").
+        The rep count is kept; call reset() to start over.
+        """
+        self.exercise = get_exercise(workout_type)
+        self.workout_type = self.exercise.id
+        self.in_rep = False
 
-        self.thresholds = self.workout_thresholds.get(self.workout_type, self.workout_thresholds["general"])
+    def _angle_vector(self, angle_data: dict) -> list:
+        """Angles in JOINTS order (missing joints count as straight)."""
+        return [angle_data.get(key, 180) for key in ANGLE_KEYS]
 
-    def detectReps(self, angle_data: dict) -> int:
+    def detectReps(self, angle_data: dict, confidence: float = 1.0, timestamp: float = None) -> int:
         """
         Detects and counts repetitions based on joint angle data.
         
@@ -75,234 +93,146 @@ class WorkoutDetector:
                     'HIP_ANGLE': float,
                     'KNEE_ANGLE': float
                 }
+            confidence (float): How reliable the angles are (0-1); low-confidence frames are skipped.
+            timestamp (float, optional): Frame time in seconds; feeds the kinematics (velocity, tempo).
         
         Returns:
             int: Current repetition count
         """
         if not angle_data:
             return self.rep_count
-        
-        # Convert to lowercase keys for internal processing
-        normalized_data = {
-            'shoulder': angle_data.get('SHOULDER_ANGLE', 180),
-            'elbow': angle_data.get('ELBOW_ANGLE', 180),
-            'hip': angle_data.get('HIP_ANGLE', 180),
-            'knee': angle_data.get('KNEE_ANGLE', 180)
-        }
-        
-        # Workout-specific rep detection logic
-        if self.workout_type == "pushup":
-            self.rep_count = self._detect_pushup_rep(normalized_data)
-        elif self.workout_type == "squat":
-            self.rep_count = self._detect_squat_rep(normalized_data)
-        elif self.workout_type == "bicep_curl":
-            self.rep_count = self._detect_bicep_curl_rep(normalized_data)
+
+        # Written so that a NaN confidence is rejected too
+        if not confidence >= self.min_confidence:
+            self.skipped_frames += 1
+            return self.rep_count
+
+        values = self._angle_vector(angle_data)
+
+        # One row of the exercise's transition table: the exit conditions while in a rep, else the enter ones
+        conditions, next_state, reps_added = self.exercise.transitions[self.in_rep]
+        transition = all(low <= values[column] <= high for column, low, high in conditions)
+        if transition:
+            self.in_rep = next_state == IN_REP
+            self.rep_count += reps_added
+
+        if timestamp is not None:
+            self.kinematics.update(values, timestamp)
+            self.rep_records.mark_origin(timestamp)
+
+        # Rep cycle for the shape score: restarted at every frame at the starting position (where the
+        # rep's exit conditions hold) and extended otherwise, so it spans the whole rep, lowering included
+        counted = transition and reps_added
+        if not self.in_rep and not counted and self._at_start(values):
+            self.rep_records.restart_cycle(values)
         else:
-            self.rep_count = self._detect_general_rep(normalized_data)
-        
-        # Store current angles for next frame comparison
-        self.previous_angles = normalized_data.copy()
-        
+            self.rep_records.extend_cycle(values)
+
+        # Rep record: opened when the rep is entered, extended every frame, written when it is counted
+        if self.in_rep:
+            if transition:
+                self.rep_records.begin(timestamp, values)
+            else:
+                self.rep_records.update(values)
+        elif counted and self.rep_records.active:
+            self.rep_records.update(values)
+            tempo = self._rep_tempo(timestamp)
+            self.last_shape_score = self._shape_score()
+            self.rep_records.finish(timestamp, tempo["eccentric"], tempo["concentric"], self.last_shape_score)
+        if counted:
+            # The counting frame is at the starting position: the next cycle starts from it
+            self.rep_records.restart_cycle(values)
+
         return self.rep_count
     
-    def detectPosture(self, angle_data: dict) -> tuple[int, str]:
+    def detectPosture(self, angle_data: dict, confidence: float = 1.0) -> tuple[int, str]:
         """
         Evaluates posture quality based on joint angle data.
         
         Args:
             angle_data (dict): Dictionary containing joint angles from AngleCalculator
+            confidence (float): How reliable the angles are (0-1); low-confidence frames
+                repeat the last evaluation.
         
         Returns:
             tuple[int, str]: Posture score (0-100) and specific feedback message.
         """
         if not angle_data:
             return 0, "No data."
-        
-        # Convert to lowercase keys for internal processing
-        normalized_data = {
-            'shoulder': angle_data.get('SHOULDER_ANGLE', 180),
-            'elbow': angle_data.get('ELBOW_ANGLE', 180),
-            'hip': angle_data.get('HIP_ANGLE', 180),
-            'knee': angle_data.get('KNEE_ANGLE', 180)
-        }
-        
-        # Workout-specific posture evaluation
-        if self.workout_type == "pushup":
-            score, feedback = self._evaluate_pushup_posture(normalized_data)
-        elif self.workout_type == "squat":
-            score, feedback = self._evaluate_squat_posture(normalized_data)
-        elif self.workout_type == "bicep_curl":
-            score, feedback = self._evaluate_bicep_curl_posture(normalized_data)
-        else:
-            score, feedback = self._evaluate_general_posture(normalized_data)
-            
-        self.last_feedback = feedback
-        return score, feedback
-    
-    # Private helper methods for push-up detection
-    def _detect_pushup_rep(self, angle_data: dict) -> int:
-        """Detects push-up repetitions based on elbow angle."""
-        elbow = angle_data.get('elbow', 180)
-
-        # Check if in down position (elbow bent)
-        if not self.in_rep and self.thresholds["elbow_down"][0] <= elbow <= self.thresholds["elbow_down"][1]:
-            self.in_rep = True
 
-        # Check if returned to up position (elbow extended)
-        elif self.in_rep and elbow >= self.thresholds["elbow_up"][0]:
-            self.in_rep = False
-            self.rep_count += 1
-
-        return self.rep_count
+        if not confidence >= self.min_confidence:
+            return self.last_score, self.last_feedback
 
-    def _evaluate_pushup_posture(self, angle_data: dict) -> tuple[int, str]:
-        """Evaluates push-up posture quality and generates specific feedback."""
-        score = 100
-        feedback = "Excellent form. Keep focusing."
-        
-        hip = angle_data.get('hip', 180)
-        shoulder = angle_data.get('shoulder', 180)
-        
-        # Deduct points for improper hip alignment (sagging or piking)
-        if hip < self.thresholds["hip_min"]:
-            deduction = min(30, (self.thresholds["hip_min"] - hip) / 2)
-            score -= deduction
-            if deduction > 15:
-                 feedback = "Tighten your core and glutes to stabilize your back!"
-            elif deduction > 5:
-                feedback = "Keep your body straight like a plank."
-        
-        # Deduct points for improper shoulder position
-        if shoulder < self.thresholds["shoulder_min"]:
-            deduction = min(20, (self.thresholds["shoulder_min"] - shoulder) / 2)
-            score -= deduction
-             # Only update feedback if it's the primary error
-            if deduction > 10 and feedback == "Excellent form. Keep focusing.":
-                 feedback = "Lift your chest, don't let your shoulders collapse."
-        
-        return max(0, int(score)), feedback
-    
-    # Private helper methods for squat detection
-    def _detect_squat_rep(self, angle_data: dict) -> int:
-        """Detects squat repetitions based on knee and hip angles."""
-        knee = angle_data.get('knee', 180)
-        hip = angle_data.get('hip', 180)
-
-        # Check if in down position (squatting)
-        if not self.in_rep and (
-            self.thresholds["knee_down"][0] <= knee <= self.thresholds["knee_down"][1] and
-            self.thresholds["hip_down"][0] <= hip <= self.thresholds["hip_down"][1]
-        ):
-            self.in_rep = True
-
-        # Check if returned to standing position
-        elif self.in_rep and knee >= self.thresholds["knee_up"][0] and hip >= self.thresholds["hip_up"][0]:
-            self.in_rep = False
-            self.rep_count += 1
-
-        return self.rep_count
-
-    def _evaluate_squat_posture(self, angle_data: dict) -> tuple[int, str]:
-        """Evaluates squat posture quality."""
-        score = 100
-        feedback = "Excellent form. Keep your balance."
-        
-        knee = angle_data.get('knee', 180)
-        hip = angle_data.get('hip', 180)
-        
-        # Check for proper depth and form
+        score, correction = self.exercise.evaluate_posture(self._angle_vector(angle_data), self.in_rep)
+        # Form corrections first, then the tempo cue
+        feedback = correction or self._tempo_feedback() or self.exercise.feedback
         if self.in_rep:
-            # Deduct points if not squatting deep enough
-            if knee > self.thresholds["knee_down"][1]:
-                deduction = min(25, (knee - self.thresholds["knee_down"][1]) / 2)
-                score -= deduction
-                if deduction > 10:
-                    feedback = "Go deeper. Push your hips back."
-            
-            # Deduct points if hip-knee coordination is off
-            angle_diff = abs(knee - hip)
-            if angle_diff > 30:
-                deduction = min(20, angle_diff / 2)
-                score -= deduction
-                if deduction > 10 and feedback == "Excellent form. Keep your balance.":
-                     feedback = "Watch for back arching! Keep your chest up."
-        
-        return max(0, int(score)), feedback
-    
-    # Private helper methods for bicep curl detection
-    def _detect_bicep_curl_rep(self, angle_data: dict) -> int:
-        """Detects bicep curl repetitions based on elbow angle."""
-        elbow = angle_data.get('elbow', 180)
-
-        # Check if in curled position (elbow bent)
-        if not self.in_rep and self.thresholds["elbow_up"][0] <= elbow <= self.thresholds["elbow_up"][1]:
-            self.in_rep = True
+            self.rep_records.add_posture(score)
 
-        # Check if returned to extended position
-        elif self.in_rep and elbow >= self.thresholds["elbow_down"][0]:
-            self.in_rep = False
-            self.rep_count += 1
+        self.last_score = score
+        self.last_feedback = feedback
+        return score, feedback
 
-        return self.rep_count
+    # Tempo (needs timestamps, see detectReps)
+    def tempo(self) -> dict:
+        """
+        Durations of the last completed phases of the exercise's primary joint.
 
-    def _evaluate_bicep_curl_posture(self, angle_data: dict) -> tuple[int, str]:
-        """Evaluates bicep curl posture quality."""
-        score = 100
-        feedback = "Excellent form. Good muscle isolation."
-        
-        shoulder = angle_data.get('shoulder', 180)
-        elbow = angle_data.get('elbow', 180)
-        
-        # Deduct points for shoulder movement (should stay stable)
-        if shoulder < self.thresholds["shoulder_stable"][0]:
-            deduction = min(30, (self.thresholds["shoulder_stable"][0] - shoulder) / 2)
-            score -= deduction
-            if deduction > 15:
-                 feedback = "Don't swing your shoulder! Keep your upper arm steady."
-        
-        # Deduct points for incomplete range of motion
-        if self.in_rep and elbow > self.thresholds["elbow_up"][1]:
-            deduction = min(20, (elbow - self.thresholds["elbow_up"][1]) / 2)
-            score -= deduction
-            if deduction > 10 and feedback == "Excellent form. Good muscle isolation.":
-                 feedback = "Squeeze up more. Complete the rep."
-        
-        return max(0, int(score)), feedback
-    
-    # General detection methods (fallback)
-    def _detect_general_rep(self, angle_data: dict) -> int:
-        """Generic rep detection for undefined workout types."""
-        # Simple detection based on primary joint movement
-        primary_angle = angle_data.get('elbow') or angle_data.get('knee', 180)
-        
-        if not self.in_rep and primary_angle <= 110:
-            self.in_rep = True
-        elif self.in_rep and primary_angle >= 160:
-            self.in_rep = False
-            self.rep_count += 1
-        
-        return self.rep_count
-    
-    def _evaluate_general_posture(self, angle_data: dict) -> tuple[int, str]:
-        """Generic posture evaluation."""
-        # Basic posture check - penalize extreme angles
-        score = 100
-        feedback = "Good general movement."
-        
-        for joint, angle in angle_data.items():
-            if angle < 30:  # Too bent
-                score -= 10
-            elif angle > 190:  # Hyperextended
-                score -= 10
-        
-        return max(0, int(score)), feedback
+        Returns:
+            dict: {"eccentric": seconds, "concentric": seconds}; NaN until such a phase was seen.
+        """
+        column = self.exercise.tempo_column
+        flexion = float(self.kinematics.last_flexion[column])
+        extension = float(self.kinematics.last_extension[column])
+        if self.exercise.flexion_is_eccentric:
+            return {"eccentric": flexion, "concentric": extension}
+        return {"eccentric": extension, "concentric": flexion}
+
+    def _rep_tempo(self, timestamp: float) -> dict:
+        """
+        tempo() for the rep being counted: its concentric phase can still be under
+        way when the exit threshold is crossed, in which case it is timed up to now.
+        """
+        tempo = self.tempo()
+        if timestamp is None:
+            return tempo
+        column = self.exercise.tempo_column
+        concentric_phase = EXTENDING if self.exercise.flexion_is_eccentric else FLEXING
+        if self.kinematics.phase[column] == concentric_phase:
+            tempo["concentric"] = float(self.kinematics.phase_time(timestamp)[column])
+        return tempo
+
+    def _at_start(self, values: list) -> bool:
+        """Whether a frame is at the exercise's starting position (the rep's exit conditions hold)."""
+        conditions = self.exercise.transitions[IN_REP][0]
+        return all(low <= values[column] <= high for column, low, high in conditions)
+
+    def _shape_score(self) -> float:
+        """Shape score of the rep cycle being counted against the reference reps (NaN without references)."""
+        if self.rep_templates is None:
+            return math.nan
+        return self.rep_templates.score(self.workout_type, self.rep_records.trajectory)
+
+    def _tempo_feedback(self):
+        """Coaching message for a rushed lowering phase, or None."""
+        if not self.min_eccentric:
+            return None
+        eccentric = self.tempo()["eccentric"]
+        # NaN (no phase yet) compares False
+        if eccentric < self.min_eccentric:
+            return "Slow down. Control the lowering phase."
+        return None
 
     def reset(self):
         """Resets the rep counter and state for a new workout session."""
         self.rep_count = 0
         self.in_rep = False
-        self.previous_angles = None
+        self.last_score = 100
         self.last_feedback = ""
+        self.skipped_frames = 0
+        self.last_shape_score = math.nan
+        self.kinematics.reset()
+        self.rep_records.clear()
 
     def get_current_state(self) -> dict:
         """